@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class ActivitiesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'activities'
+
+    def ready(self):
+        from .signals import connect_signals
+        connect_signals()
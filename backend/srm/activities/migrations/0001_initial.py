@@ -0,0 +1,31 @@
+# Generated by Django 5.1.7 on 2026-10-18 13:25
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=50)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('event', models.CharField(choices=[('created', 'Created'), ('status_changed', 'Status Changed')], max_length=20)),
+                ('action', models.CharField(max_length=255)),
+                ('user', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(blank=True, max_length=20)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['created_at', 'id'], name='activity_feed_idx'), models.Index(fields=['source', 'object_id'], name='activity_object_idx')],
+            },
+        ),
+    ]
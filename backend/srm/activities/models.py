@@ -0,0 +1,30 @@
+from django.db import models
+from django.utils import timezone
+
+class ActivityEvent(models.Model):
+    """Append-only record of creates and status changes across the apps."""
+    EVENTS = (
+        ('created', 'Created'),
+        ('status_changed', 'Status Changed'),
+    )
+    source = models.CharField(max_length=50)
+    object_id = models.PositiveBigIntegerField()
+    event = models.CharField(max_length=20, choices=EVENTS)
+    action = models.CharField(max_length=255)
+    user = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=20, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='activity_feed_idx'),
+            models.Index(fields=['source', 'object_id'], name='activity_object_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.pk:
+            raise ValueError("Activity events are append-only")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.action} ({self.created_at})"
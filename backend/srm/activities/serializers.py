@@ -0,0 +1,9 @@
+from rest_framework import serializers
+from .models import ActivityEvent
+
+class ActivityEventSerializer(serializers.ModelSerializer):
+    date = serializers.DateTimeField(source='created_at', read_only=True)
+
+    class Meta:
+        model = ActivityEvent
+        fields = ['id', 'source', 'object_id', 'event', 'action', 'user', 'status', 'date']
@@ -0,0 +1,77 @@
+from django.db.models.signals import pre_save, post_save
+from srm.signals import bulk_saved
+from resources.models import ResourceRequest
+from labs.models import Lab, LabBooking
+from library.models import Book, BorrowRecord
+from store.models import InventoryItem
+from .models import ActivityEvent
+
+def _teacher_name(instance):
+    return instance.teacher.get_full_name() or instance.teacher.username
+
+def _borrow_status(instance):
+    return 'returned' if instance.returned else 'borrowed'
+
+# model: (status field or None, describe, user, status)
+TRACKED = {
+    ResourceRequest: (
+        'status',
+        lambda i: f"Resource request: {i.quantity} x {i.resource_name}",
+        _teacher_name,
+        lambda i: i.status,
+    ),
+    LabBooking: (
+        'status',
+        lambda i: f"Lab booking: {i.lab} on {i.date}",
+        _teacher_name,
+        lambda i: i.status,
+    ),
+    BorrowRecord: (
+        'returned',
+        lambda i: f"Book {_borrow_status(i)}: {i.book.title}",
+        lambda i: i.borrower_name,
+        _borrow_status,
+    ),
+    Lab: (None, lambda i: f"{i} added", lambda i: '', lambda i: ''),
+    Book: (None, lambda i: f"Book added: {i.title}", lambda i: '', lambda i: ''),
+    InventoryItem: (None, lambda i: f"Inventory item added: {i.name}", lambda i: '', lambda i: ''),
+}
+
+def _remember_old_status(sender, instance, **kwargs):
+    status_field = TRACKED[sender][0]
+    if instance.pk:
+        instance._activity_old_status = sender.objects.filter(pk=instance.pk).values_list(status_field, flat=True).first()
+
+def _event(sender, instance, event):
+    _status_field, describe, user, status = TRACKED[sender]
+    return ActivityEvent(
+        source=sender._meta.label_lower,
+        object_id=instance.pk,
+        event=event,
+        action=describe(instance)[:255],
+        user=user(instance)[:255],
+        status=status(instance),
+    )
+
+def _record_activity(sender, instance, created, **kwargs):
+    status_field = TRACKED[sender][0]
+    if created:
+        event = 'created'
+    elif status_field and getattr(instance, '_activity_old_status', None) != getattr(instance, status_field):
+        event = 'status_changed'
+    else:
+        return
+    _event(sender, instance, event).save()
+
+def _bulk_saved(sender, instances=(), created=False, **kwargs):
+    # Bulk updates only report rows whose status actually changed
+    if sender in TRACKED and (created or TRACKED[sender][0]):
+        event = 'created' if created else 'status_changed'
+        ActivityEvent.objects.bulk_create([_event(sender, instance, event) for instance in instances])
+
+def connect_signals():
+    for model, (status_field, *_rest) in TRACKED.items():
+        if status_field:
+            pre_save.connect(_remember_old_status, sender=model, dispatch_uid=f'activity_pre_save_{model.__name__}')
+        post_save.connect(_record_activity, sender=model, dispatch_uid=f'activity_save_{model.__name__}')
+    bulk_saved.connect(_bulk_saved, dispatch_uid='activities_bulk_saved')
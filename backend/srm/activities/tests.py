@@ -0,0 +1,81 @@
+import base64
+import json
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from resources.models import ResourceRequest
+from users.models import User
+from .models import ActivityEvent
+
+
+def cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+class ActivityFeedTests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create(username='teacher', role='teacher')
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='librarian', role='librarian'))
+
+    def feed(self, url='/api/activities/recent/', params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_creates_and_status_changes_are_recorded(self):
+        request = ResourceRequest.objects.create(
+            teacher=self.teacher, resource_type='stationery', resource_name='Pens', quantity=3,
+        )
+        request.description = 'Blue'
+        request.save()
+        request.status = 'fulfilled'
+        request.save()
+
+        results = self.feed()['results']
+        self.assertEqual([row['event'] for row in results], ['status_changed', 'created'])
+        self.assertEqual(results[0]['status'], 'fulfilled')
+        self.assertEqual(results[0]['action'], 'Resource request: 3 x Pens')
+        self.assertEqual(results[0]['user'], 'teacher')
+
+        event = ActivityEvent.objects.get(event='created')
+        event.action = 'Edited'
+        with self.assertRaises(ValueError):
+            event.save()
+
+    def test_cursor_walks_the_feed_newest_first(self):
+        now = timezone.now()
+        # Shared timestamps make the id the tie-breaker
+        ActivityEvent.objects.bulk_create([
+            ActivityEvent(source='labs.lab', object_id=index, event='created', action=f'Lab {index}',
+                          created_at=now - timedelta(minutes=index // 2))
+            for index in range(5)
+        ])
+        expected = list(ActivityEvent.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+        seen, url, params = [], '/api/activities/recent/', {'page_size': 2}
+        while url:
+            data = self.feed(url, params)
+            seen += [row['id'] for row in data['results']]
+            url, params = data['next'], None
+        self.assertEqual(seen, expected)
+
+        filtered = self.feed(params={'source': 'labs.lab', 'count': 'true'})
+        self.assertEqual(len(filtered['results']), 5)
+        self.assertEqual(self.feed(params={'source': 'library.book'})['results'], [])
+
+    def test_bad_cursors_are_not_found(self):
+        for value in ['not base64!', cursor(['2026-11-02T09:00:00Z']), cursor(['yesterday', 1]),
+                      cursor(['2026-11-02T09:00:00Z', 'one']), cursor({'a': 1}), cursor(None)]:
+            response = self.client.get('/api/activities/recent/', {'cursor': value})
+            self.assertEqual(response.status_code, 404, value)
+            self.assertEqual(response.data['detail'], 'Invalid cursor')
+        self.assertEqual(self.client.get('/api/library/books/', {'cursor': cursor(['x', 1])}).status_code, 404)
+
+    def test_only_librarians_and_admins_read_the_feed(self):
+        self.client.force_authenticate(self.teacher)
+        for params in [None, {'format': 'csv'}, {'format': 'ndjson'}]:
+            self.assertEqual(self.client.get('/api/activities/recent/', params).status_code, 403, params)
+        self.client.force_authenticate(User.objects.create(username='admin', role='admin'))
+        self.assertEqual(self.client.get('/api/activities/recent/', {'format': 'csv'}).status_code, 200)
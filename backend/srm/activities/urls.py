@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import RecentActivitiesView
+
+urlpatterns = [
+    path('recent/', RecentActivitiesView.as_view(), name='recent-activities'),
+]
@@ -0,0 +1,20 @@
+from rest_framework import generics, permissions
+from rest_framework.response import Response
+from srm.export import ExportMixin
+from django_filters.rest_framework import DjangoFilterBackend
+from .models import ActivityEvent
+from .serializers import ActivityEventSerializer
+
+class RecentActivitiesView(ExportMixin, generics.ListAPIView):
+    queryset = ActivityEvent.objects.all()
+    serializer_class = ActivityEventSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['source', 'event']
+    export_roles = ('librarian', 'admin')
+
+    def list(self, request, *args, **kwargs):
+        # The feed covers every app, so it is as private as its export
+        if request.user.role not in self.export_roles:
+            return Response({"detail": "Not authorized"}, status=403)
+        return super().list(request, *args, **kwargs)
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from admin_dashboard.stats import refresh_all
+
+class Command(BaseCommand):
+    help = 'Rebuild the admin dashboard stats snapshot from the raw tables'
+
+    def handle(self, *args, **options):
+        stats = refresh_all()
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {len(stats)} stats sections"))
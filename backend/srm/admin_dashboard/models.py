@@ -1,3 +1,16 @@
 from django.db import models
 
-# Create your models here.
+class StatsSnapshot(models.Model):
+    section = models.CharField(max_length=50, unique=True)
+    data = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.section} stats ({self.updated_at})"
+
+class TableVersion(models.Model):
+    table = models.CharField(max_length=100, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.table} v{self.version}"
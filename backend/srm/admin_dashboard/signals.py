@@ -0,0 +1,86 @@
+from collections import Counter
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from srm.signals import bulk_saved
+from labs.models import Lab
+from .stats import SECTION_MODELS, apply_delta, row_delta, schedule_refresh, section_fields
+from .versions import bump_version
+
+# Tables whose change versions feed the dashboard ETag
+VERSIONED_MODELS = list(SECTION_MODELS) + [Lab]
+
+def _row(instance, fields):
+    return {field: getattr(instance, field) for field in fields}
+
+def _adjust(model, delta):
+    """Apply ``delta`` to the model's section, or aggregate the section
+    again on commit when delta is None or there is no snapshot yet.
+
+    The table version only moves once the snapshot holds the change, so
+    the dashboard never pairs a new ETag with old stats.
+    """
+    section = SECTION_MODELS[model]
+    if delta is not None and apply_delta(section, delta):
+        bump_version(model)
+    else:
+        schedule_refresh(section, then=lambda: bump_version(model))
+
+# Old row of a save that could not lock it
+UNLOCKED = object()
+
+def _remember_old_row(sender, instance, using=None, **kwargs):
+    # The stored row, not the in-memory one, is what the snapshot counted.
+    # It stays locked until commit, so a concurrent write of the same row
+    # waits and then reads this one's result instead of the same old values.
+    if instance.pk:
+        if not transaction.get_connection(using).in_atomic_block:
+            # An autocommit save cannot hold the lock up to its UPDATE
+            instance._stats_old_row = UNLOCKED
+            return
+        fields = section_fields(SECTION_MODELS[sender])
+        instance._stats_old_row = (
+            sender.objects.using(using).select_for_update().filter(pk=instance.pk).values(*fields).first()
+        )
+
+def _row_saved(sender, instance, **kwargs):
+    section = SECTION_MODELS[sender]
+    old = getattr(instance, '_stats_old_row', None)
+    if old is UNLOCKED:
+        _adjust(sender, None)
+        return
+    _adjust(sender, row_delta(section, old, _row(instance, section_fields(section))))
+
+def _row_deleted(sender, instance, **kwargs):
+    section = SECTION_MODELS[sender]
+    old = getattr(instance, '_stats_old_row', None)
+    _adjust(sender, None if old is UNLOCKED else row_delta(section, old, None))
+
+def _bump_version(sender, **kwargs):
+    bump_version(sender)
+
+def _bulk_saved(sender, instances=(), created=False, previous=None, **kwargs):
+    if sender in SECTION_MODELS:
+        section = SECTION_MODELS[sender]
+        # Without the old values the table is aggregated again
+        delta = None
+        if created or previous is not None:
+            fields = section_fields(section)
+            delta = Counter()
+            for instance in instances:
+                new = _row(instance, fields)
+                old = None if created else {**new, **previous.get(instance.pk, {})}
+                delta.update(row_delta(section, old, new))
+        _adjust(sender, delta)
+    elif sender in VERSIONED_MODELS:
+        _bump_version(sender)
+
+def connect_signals():
+    for model in SECTION_MODELS:
+        pre_save.connect(_remember_old_row, sender=model, dispatch_uid=f'admin_stats_pre_save_{model.__name__}')
+        post_save.connect(_row_saved, sender=model, dispatch_uid=f'admin_stats_save_{model.__name__}')
+        pre_delete.connect(_remember_old_row, sender=model, dispatch_uid=f'admin_stats_pre_delete_{model.__name__}')
+        post_delete.connect(_row_deleted, sender=model, dispatch_uid=f'admin_stats_delete_{model.__name__}')
+    for model in set(VERSIONED_MODELS) - set(SECTION_MODELS):
+        post_save.connect(_bump_version, sender=model, dispatch_uid=f'table_version_save_{model.__name__}')
+        post_delete.connect(_bump_version, sender=model, dispatch_uid=f'table_version_delete_{model.__name__}')
+    bulk_saved.connect(_bulk_saved, dispatch_uid='admin_dashboard_bulk_saved')
@@ -0,0 +1,164 @@
+from collections import Counter
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from users.models import User
+from resources.models import ResourceRequest
+from labs.models import LabBooking
+from store.models import InventoryItem
+from library.models import Book
+from .models import StatsSnapshot
+
+# Every section is computed by a single conditional-aggregation query so the
+# dashboard never has to fan out into per-status count() calls.
+
+def _by_choice(model, field, choices):
+    aggregates = {'total': Count('pk')}
+    for value, _label in choices:
+        aggregates[f'{field}__{value}'] = Count('pk', filter=Q(**{field: value}))
+    result = model.objects.aggregate(**aggregates)
+    by_choice = {}
+    for value, _label in choices:
+        count = result[f'{field}__{value}']
+        if count:
+            by_choice[value] = count
+    return result['total'], by_choice
+
+def user_stats():
+    total, by_role = _by_choice(User, 'role', User.ROLES)
+    return {'total': total, 'by_role': by_role}
+
+def resource_stats():
+    total, by_status = _by_choice(ResourceRequest, 'status', ResourceRequest.STATUS_CHOICES)
+    return {'total_requests': total, 'by_status': by_status}
+
+def lab_stats():
+    total, by_status = _by_choice(LabBooking, 'status', LabBooking.STATUS_CHOICES)
+    return {'total_bookings': total, 'by_status': by_status}
+
+def inventory_stats():
+    result = InventoryItem.objects.aggregate(
+        total_items=Count('pk'),
+        low_stock=Count('pk', filter=Q(low_stock=True)),
+        total_quantity=Sum('quantity'),
+    )
+    return result
+
+def library_stats():
+    result = Book.objects.aggregate(
+        total_books=Count('pk'),
+        total_copies=Sum('total_copies'),
+        available_copies=Sum('available_copies'),
+    )
+    return result
+
+SECTIONS = {
+    'users': user_stats,
+    'resources': resource_stats,
+    'labs': lab_stats,
+    'inventory': inventory_stats,
+    'library': library_stats,
+}
+
+SECTION_MODELS = {
+    User: 'users',
+    ResourceRequest: 'resources',
+    LabBooking: 'labs',
+    InventoryItem: 'inventory',
+    Book: 'library',
+}
+
+# The fields each section reads, and one row's share of its numbers keyed
+# by the path into the section's data, so that a write can adjust the
+# snapshot by the difference instead of aggregating the table again.
+ROW_SHARES = {
+    'users': (['role'], lambda row: {('total',): 1, ('by_role', row['role']): 1}),
+    'resources': (['status'], lambda row: {('total_requests',): 1, ('by_status', row['status']): 1}),
+    'labs': (['status'], lambda row: {('total_bookings',): 1, ('by_status', row['status']): 1}),
+    'inventory': (['quantity', 'low_stock'], lambda row: {
+        ('total_items',): 1, ('low_stock',): int(row['low_stock']), ('total_quantity',): row['quantity'],
+    }),
+    'library': (['total_copies', 'available_copies'], lambda row: {
+        ('total_books',): 1, ('total_copies',): row['total_copies'], ('available_copies',): row['available_copies'],
+    }),
+}
+
+# Sum() over no rows is NULL: (row count, sums) per section that has sums
+EMPTY_SUMS = {
+    'inventory': ('total_items', ['total_quantity']),
+    'library': ('total_books', ['total_copies', 'available_copies']),
+}
+
+def section_fields(section):
+    return ROW_SHARES[section][0]
+
+def row_delta(section, old, new):
+    """Change in a section's numbers when a row goes from ``old`` to ``new``
+    field values; either is None when the row does not exist."""
+    share = ROW_SHARES[section][1]
+    delta = Counter()
+    if new is not None:
+        delta.update(share(new))
+    if old is not None:
+        delta.subtract(share(old))
+    return delta
+
+def apply_delta(section, delta):
+    """Adjust the section's snapshot by ``delta`` with the snapshot row
+    locked, inside the writer's transaction. Returns False when there is
+    no snapshot yet to adjust."""
+    delta = {path: amount for path, amount in delta.items() if amount}
+    if not delta:
+        return True
+    with transaction.atomic():
+        snapshot = StatsSnapshot.objects.select_for_update().filter(section=section).first()
+        if snapshot is None:
+            return False
+        data = snapshot.data
+        for path, amount in delta.items():
+            parent = data
+            for key in path[:-1]:
+                parent = parent.setdefault(key, {})
+            value = (parent.get(path[-1]) or 0) + amount
+            if len(path) > 1 and not value:
+                # Choices with no rows are left out, as _by_choice does
+                parent.pop(path[-1], None)
+            else:
+                parent[path[-1]] = value
+        if section in EMPTY_SUMS:
+            count, sums = EMPTY_SUMS[section]
+            if not data[count]:
+                data.update({name: None for name in sums})
+        snapshot.save(update_fields=['data', 'updated_at'])
+    return True
+
+def compute_stats():
+    return {name: compute() for name, compute in SECTIONS.items()}
+
+def refresh_section(section):
+    data = SECTIONS[section]()
+    StatsSnapshot.objects.update_or_create(section=section, defaults={'data': data})
+    return data
+
+def refresh_all():
+    return {section: refresh_section(section) for section in SECTIONS}
+
+def schedule_refresh(section, then=None):
+    # Recompute once the surrounding transaction commits so that a burst of
+    # saves inside one atomic block only pays for the final state.
+    def run():
+        refresh_section(section)
+        if then is not None:
+            then()
+    transaction.on_commit(run)
+
+def get_stats():
+    """Serve the dashboard stats from the snapshot table in one query.
+
+    Nothing is written here. A section with no snapshot yet is aggregated
+    live until the first write to its table or refresh_admin_stats stores one.
+    """
+    snapshots = dict(StatsSnapshot.objects.values_list('section', 'data'))
+    return {
+        section: snapshots[section] if section in snapshots else compute()
+        for section, compute in SECTIONS.items()
+    }
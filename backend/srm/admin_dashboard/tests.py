@@ -1,3 +1,163 @@
-from django.test import TestCase
+from datetime import date, time
+from django.db import connection
+from unittest import mock
+from django.db.models import QuerySet
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from labs.models import Lab, LabBooking
+from library.models import Book
+from resources.models import ResourceRequest
+from store.models import InventoryItem
+from srm.signals import bulk_saved
+from store.stock import apply_movements, move_stock
+from users.models import User
+from .models import StatsSnapshot
+from .stats import compute_stats, get_stats, refresh_all
 
-# Create your tests here.
+
+class StatsSnapshotTests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create(username='teacher', role='teacher')
+        self.admin = User.objects.create(username='admin', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.lab = Lab.objects.create(lab_number='101', capacity=30)
+        self.pens = InventoryItem.objects.create(
+            name='Blue Pens', category='stationery', quantity=10, threshold=2, department='Science',
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            refresh_all()
+
+    def assertSnapshotMatchesTables(self):
+        self.assertEqual(dict(StatsSnapshot.objects.values_list('section', 'data')), compute_stats())
+
+    def test_writes_adjust_the_snapshot(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.create(username='librarian', role='librarian')
+            self.teacher.role = 'labtech'
+            self.teacher.save()
+            request = ResourceRequest.objects.create(
+                teacher=self.teacher, resource_type='stationery', resource_name='Pens', quantity=3,
+            )
+            request.status = 'rejected'
+            request.save()
+            booking = LabBooking.objects.create(
+                lab=self.lab, teacher=self.teacher, date=date(2026, 11, 2), start_time=time(9), end_time=time(10),
+                requirements='Microscopes',
+            )
+            move_stock(self.pens.pk, 'consume', -9)
+            apply_movements([{'item_id': self.pens.pk, 'kind': 'restock', 'change': 4}])
+            book = Book.objects.create(title='Dune', author='Herbert', isbn='1', category='fiction', total_copies=3)
+        self.assertSnapshotMatchesTables()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/api/labs/bookings/status/', {'status': 'approved', 'ids': [booking.pk]}, format='json',
+            )
+            self.assertEqual(response.data['ids'], [booking.pk])
+            response = self.client.post('/api/library/borrows/', {
+                'book_id': book.pk, 'borrower_name': 'Ana', 'borrower_type': 'student', 'due_date': '2026-11-20',
+            }, format='json')
+            self.assertEqual(response.status_code, 201)
+            request.delete()
+            self.pens.delete()
+        self.assertSnapshotMatchesTables()
+        self.assertEqual(get_stats()['inventory'], {'total_items': 0, 'low_stock': 0, 'total_quantity': None})
+
+    def test_writes_do_not_aggregate_the_table(self):
+        request = ResourceRequest.objects.create(
+            teacher=self.teacher, resource_type='stationery', resource_name='Pens', quantity=3,
+        )
+        request.status = 'fulfilled'
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            request.save()
+        self.assertFalse([query for query in queries if 'COUNT(' in query['sql']])
+        self.assertEqual(get_stats()['resources'], {'total_requests': 1, 'by_status': {'fulfilled': 1}})
+
+    def test_old_rows_are_read_under_a_lock(self):
+        request = ResourceRequest.objects.create(
+            teacher=self.teacher, resource_type='stationery', resource_name='Pens', quantity=3,
+        )
+        request.status = 'fulfilled'
+        with mock.patch.object(QuerySet, 'select_for_update', autospec=True, side_effect=QuerySet.select_for_update) as lock:
+            request.save()
+        self.assertIn(ResourceRequest, [call.args[0].model for call in lock.call_args_list])
+
+    def test_missing_sections_are_served_live_without_writing(self):
+        StatsSnapshot.objects.filter(section='labs').delete()
+        with CaptureQueriesContext(connection) as queries:
+            stats = self.client.get('/api/admin/stats/').data
+        self.assertEqual(stats['labs'], {'total_bookings': 0, 'by_status': {}})
+        self.assertFalse([query for query in queries if not query['sql'].startswith('SELECT')])
+        self.assertFalse(StatsSnapshot.objects.filter(section='labs').exists())
+
+        # The first write to the table stores it again
+        with self.captureOnCommitCallbacks(execute=True):
+            LabBooking.objects.create(
+                lab=self.lab, teacher=self.teacher, date=date(2026, 11, 2), start_time=time(9), end_time=time(10),
+                requirements='Microscopes',
+            )
+        self.assertSnapshotMatchesTables()
+
+
+class DashboardETagTests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create(username='teacher', role='teacher')
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='admin', role='admin'))
+        self.request = ResourceRequest.objects.create(
+            teacher=self.teacher, resource_type='stationery', resource_name='Pens', quantity=3,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            refresh_all()
+
+    def get(self, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get('/api/admin/dashboard/', **headers)
+
+    def test_unchanged_dashboard_is_not_modified(self):
+        etag = self.get()['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get(etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(len(queries), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.request.status = 'fulfilled'
+            self.request.save()
+        response = self.get(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['stats']['resources']['by_status'], {'fulfilled': 1})
+        self.assertEqual(response.data['recent_requests'][0]['status'], 'fulfilled')
+
+    def test_etag_moves_only_with_the_snapshot(self):
+        etag = self.get()['ETag']
+        # A bulk update without old values is aggregated again on commit
+        with self.captureOnCommitCallbacks() as callbacks:
+            ResourceRequest.objects.filter(pk=self.request.pk).update(status='rejected')
+            self.request.status = 'rejected'
+            bulk_saved.send(sender=ResourceRequest, instances=[self.request], created=False)
+        self.assertEqual(self.get(etag).status_code, 304)
+
+        for callback in callbacks:
+            callback()
+        response = self.get(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['stats']['resources']['by_status'], {'rejected': 1})
+
+
+class AutocommitStatsTests(TransactionTestCase):
+    def test_saves_outside_a_transaction_aggregate_again(self):
+        teacher = User.objects.create(username='teacher', role='teacher')
+        request = ResourceRequest.objects.create(
+            teacher=teacher, resource_type='stationery', resource_name='Pens', quantity=3,
+        )
+        refresh_all()
+        request.status = 'rejected'
+        with CaptureQueriesContext(connection) as queries:
+            request.save()
+        self.assertTrue([query for query in queries if 'COUNT(' in query['sql']])
+        self.assertEqual(dict(StatsSnapshot.objects.values_list('section', 'data')), compute_stats())
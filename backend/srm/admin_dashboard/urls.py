@@ -1,6 +1,8 @@
 from django.urls import path
-from .views import AdminStatsView
+from .views import AdminStatsView, AdminDashboardView, CacheStatsView
 
 urlpatterns = [
     path('stats/', AdminStatsView.as_view(), name='admin-stats'),
-]
\ No newline at end of file
+    path('dashboard/', AdminDashboardView.as_view(), name='admin-dashboard'),
+    path('cache/', CacheStatsView.as_view(), name='admin-cache'),
+]
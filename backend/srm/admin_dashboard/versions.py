@@ -0,0 +1,19 @@
+import hashlib
+from django.db.models import F
+from .models import TableVersion
+
+def bump_version(model):
+    table = model._meta.db_table
+    updated = TableVersion.objects.filter(table=table).update(version=F('version') + 1)
+    if not updated:
+        TableVersion.objects.get_or_create(table=table, defaults={'version': 1})
+
+def get_versions(models):
+    tables = [model._meta.db_table for model in models]
+    versions = dict(TableVersion.objects.filter(table__in=tables).values_list('table', 'version'))
+    return {table: versions.get(table, 0) for table in tables}
+
+def versions_etag(models):
+    versions = get_versions(models)
+    key = ';'.join(f'{table}={version}' for table, version in sorted(versions.items()))
+    return '"%s"' % hashlib.sha1(key.encode()).hexdigest()
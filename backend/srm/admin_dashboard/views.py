@@ -1,11 +1,15 @@
+from django.http import HttpResponseNotModified
+from django.utils.http import parse_etags
 from rest_framework import generics, permissions
 from rest_framework.response import Response
-from django.db.models import Count, Sum
-from users.models import User
-from resources.models import ResourceRequest
 from labs.models import LabBooking
-from store.models import InventoryItem
-from library.models import Book
+from labs.serializers import LabBookingSerializer
+from resources.models import ResourceRequest
+from resources.serializers import ResourceRequestSerializer
+from srm import cache
+from .signals import VERSIONED_MODELS
+from .stats import compute_stats, get_stats
+from .versions import versions_etag
 
 class AdminStatsView(generics.GenericAPIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -13,29 +17,48 @@ class AdminStatsView(generics.GenericAPIView):
     def get(self, request):
         if not request.user.role == 'admin':
             return Response({"detail": "Not authorized"}, status=403)
-        
-        stats = {
-            'users': {
-                'total': User.objects.count(),
-                'by_role': dict(User.objects.values_list('role').annotate(count=Count('role')))
-            },
-            'resources': {
-                'total_requests': ResourceRequest.objects.count(),
-                'by_status': dict(ResourceRequest.objects.values_list('status').annotate(count=Count('status')))
-            },
-            'labs': {
-                'total_bookings': LabBooking.objects.count(),
-                'by_status': dict(LabBooking.objects.values_list('status').annotate(count=Count('status')))
-            },
-            'inventory': {
-                'total_items': InventoryItem.objects.count(),
-                'low_stock': InventoryItem.objects.filter(quantity__lte=models.F('threshold')).count(),
-                'total_quantity': InventoryItem.objects.aggregate(total=Sum('quantity'))['total']
-            },
-            'library': {
-                'total_books': Book.objects.count(),
-                'total_copies': Book.objects.aggregate(total=Sum('total_copies'))['total'],
-                'available_copies': Book.objects.aggregate(total=Sum('available_copies'))['total']
-            }
-        }
-        return Response(stats)  
\ No newline at end of file
+
+        # ?live=true bypasses the snapshot table and aggregates the raw tables
+        if request.query_params.get('live') == 'true':
+            return Response(compute_stats())
+        return Response(get_stats())
+
+class AdminDashboardView(generics.GenericAPIView):
+    """Stats plus the recent bookings and requests in a single response.
+
+    The ETag is derived from the change versions of every table the payload
+    reads, so an unchanged dashboard is answered with 304 after one query.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        if not request.user.role == 'admin':
+            return Response({"detail": "Not authorized"}, status=403)
+
+        etag = versions_etag(VERSIONED_MODELS)
+        etags = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+        if etag in etags or '*' in etags:
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            response['Cache-Control'] = 'private, no-cache'
+            return response
+
+        recent_bookings = LabBooking.objects.select_related('lab', 'teacher').order_by('-created_at')[:10]
+        recent_requests = ResourceRequest.objects.select_related('teacher').order_by('-created_at')[:10]
+        response = Response({
+            'stats': get_stats(),
+            'recent_bookings': LabBookingSerializer(recent_bookings, many=True).data,
+            'recent_requests': ResourceRequestSerializer(recent_requests, many=True).data,
+        })
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+class CacheStatsView(generics.GenericAPIView):
+    """Hit and miss counts of the versioned response cache."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        if not request.user.role == 'admin':
+            return Response({"detail": "Not authorized"}, status=403)
+        return Response(cache.stats())
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+import numpy as np
+from .conflicts import ACTIVE_STATUSES
+from .models import LabBooking
+
+SLOT_MINUTES = 15
+
+def _minutes(value):
+    return value.hour * 60 + value.minute + value.second / 60
+
+def _time(minutes):
+    return (datetime.min + timedelta(minutes=int(minutes))).time()
+
+def occupancy_grid(labs, start_date, end_date, day_start, day_end, slot_minutes=SLOT_MINUTES):
+    """Boolean (lab, day, slot) array that is True where a slot is booked."""
+    lab_index = {lab.pk: i for i, lab in enumerate(labs)}
+    days = (end_date - start_date).days + 1
+    slots = int(np.ceil((_minutes(day_end) - _minutes(day_start)) / slot_minutes))
+    bookings = np.array(list(
+        LabBooking.objects.filter(
+            lab__in=list(lab_index), date__range=(start_date, end_date), status__in=ACTIVE_STATUSES,
+            start_time__lt=day_end, end_time__gt=day_start,
+        ).values_list('lab_id', 'date', 'start_time', 'end_time')
+    ), dtype=object).reshape(-1, 4)
+
+    # Difference array: +1 where a booking starts, -1 where it ends, then a
+    # running sum along the slot axis gives the number of overlapping bookings.
+    delta = np.zeros((len(labs), days, slots + 1), dtype=np.int32)
+    if len(bookings):
+        lab_idx = np.fromiter((lab_index[pk] for pk in bookings[:, 0]), dtype=np.intp, count=len(bookings))
+        day_idx = np.fromiter(((day - start_date).days for day in bookings[:, 1]), dtype=np.intp, count=len(bookings))
+        offset = _minutes(day_start)
+        starts = np.fromiter((_minutes(t) for t in bookings[:, 2]), dtype=float, count=len(bookings))
+        ends = np.fromiter((_minutes(t) for t in bookings[:, 3]), dtype=float, count=len(bookings))
+        start_slot = np.clip(np.floor((starts - offset) / slot_minutes), 0, slots).astype(np.intp)
+        end_slot = np.clip(np.ceil((ends - offset) / slot_minutes), 0, slots).astype(np.intp)
+        np.add.at(delta, (lab_idx, day_idx, start_slot), 1)
+        np.add.at(delta, (lab_idx, day_idx, end_slot), -1)
+    return np.cumsum(delta, axis=2)[:, :, :slots] > 0
+
+def free_windows(labs, start_date, end_date, duration, day_start, day_end, slot_minutes=SLOT_MINUTES):
+    """Maximal free windows of at least `duration` minutes, grouped by lab."""
+    free = ~occupancy_grid(labs, start_date, end_date, day_start, day_end, slot_minutes)
+
+    # Runs of free slots begin where the padded row steps 0 -> 1 and end
+    # where it steps 1 -> 0; np.nonzero returns both in the same order.
+    padded = np.pad(free.astype(np.int8), ((0, 0), (0, 0), (1, 1)))
+    steps = np.diff(padded, axis=2)
+    lab_idx, day_idx, run_start = np.nonzero(steps == 1)
+    run_end = np.nonzero(steps == -1)[2]
+
+    # The last slot may run past day_end, so the length is measured after
+    # clamping rather than counted in slots
+    starts = _minutes(day_start) + run_start * slot_minutes
+    ends = np.minimum(_minutes(day_start) + run_end * slot_minutes, _minutes(day_end))
+    keep = (ends - starts) >= duration
+
+    windows = {lab.pk: [] for lab in labs}
+    for lab_i, day_i, start, end in zip(lab_idx[keep], day_idx[keep], starts[keep], ends[keep]):
+        windows[labs[lab_i].pk].append({
+            'date': start_date + timedelta(days=int(day_i)),
+            'start_time': _time(start),
+            'end_time': _time(end),
+        })
+    return windows
@@ -0,0 +1,78 @@
+from django.db.models import F
+from rest_framework import serializers
+from .models import Lab, LabBooking
+
+# Bookings in these states hold their slot; rejected ones free it again
+ACTIVE_STATUSES = ('pending', 'approved')
+
+def overlapping_bookings(lab, date, start_time, end_time, exclude=None):
+    # Two intervals overlap when each starts before the other ends, which is
+    # a range scan on the (lab, date, start_time, end_time) index.
+    queryset = LabBooking.objects.filter(
+        lab=lab,
+        date=date,
+        start_time__lt=end_time,
+        end_time__gt=start_time,
+        status__in=ACTIVE_STATUSES,
+    )
+    if exclude is not None:
+        queryset = queryset.exclude(pk=exclude)
+    return queryset
+
+def lock_labs(lab_ids):
+    # A no-op UPDATE takes the row locks on PostgreSQL and the write lock on
+    # SQLite, so concurrent bookings for the same lab are checked one at a
+    # time. Must be called inside transaction.atomic().
+    Lab.objects.filter(pk__in=lab_ids).update(lab_number=F('lab_number'))
+
+def lock_lab(lab):
+    lock_labs([lab.pk])
+
+def find_conflicts(occurrences, exclude=()):
+    """Map each occurrence index to the ids of the bookings it overlaps.
+
+    ``occurrences`` are dicts with lab, date, start_time and end_time. All
+    candidates are fetched with one query over the occurrences' labs, dates
+    and time span, and occurrences are also checked against each other.
+    Bookings in ``exclude`` are ignored, for occurrences that move them.
+    """
+    if not occurrences:
+        return {}
+    candidates = LabBooking.objects.filter(
+        lab__in={occ['lab'].pk for occ in occurrences},
+        date__in={occ['date'] for occ in occurrences},
+        start_time__lt=max(occ['end_time'] for occ in occurrences),
+        end_time__gt=min(occ['start_time'] for occ in occurrences),
+        status__in=ACTIVE_STATUSES,
+    ).exclude(pk__in=exclude).values_list('id', 'lab_id', 'date', 'start_time', 'end_time')
+
+    by_slot = {}
+    for booking_id, lab_id, date, start_time, end_time in candidates:
+        by_slot.setdefault((lab_id, date), []).append((start_time, end_time, booking_id))
+
+    conflicts = {}
+    taken = {}
+    for index, occ in enumerate(occurrences):
+        key = (occ['lab'].pk, occ['date'])
+        overlapping = [
+            booking_id for start_time, end_time, booking_id in by_slot.get(key, [])
+            if start_time < occ['end_time'] and end_time > occ['start_time']
+        ]
+        clashes_in_batch = any(
+            start_time < occ['end_time'] and end_time > occ['start_time']
+            for start_time, end_time in taken.get(key, [])
+        )
+        if overlapping or clashes_in_batch:
+            conflicts[index] = overlapping
+        else:
+            taken.setdefault(key, []).append((occ['start_time'], occ['end_time']))
+    return conflicts
+
+def ensure_no_conflict(lab, date, start_time, end_time, exclude=None):
+    lock_lab(lab)
+    conflicts = list(overlapping_bookings(lab, date, start_time, end_time, exclude).values_list('id', flat=True))
+    if conflicts:
+        raise serializers.ValidationError({
+            'non_field_errors': [f"{lab} is already booked on {date} between {start_time} and {end_time}"],
+            'conflicts': conflicts,
+        })
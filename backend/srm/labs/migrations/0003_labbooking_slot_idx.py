@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-18 13:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('labs', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='labbooking',
+            index=models.Index(fields=['lab', 'date', 'start_time', 'end_time'], name='labbooking_slot_idx'),
+        ),
+    ]
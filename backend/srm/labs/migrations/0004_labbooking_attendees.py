@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 13:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('labs', '0003_labbooking_slot_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='labbooking',
+            name='attendees',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-18 13:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('labs', '0004_labbooking_attendees'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='labbooking',
+            index=models.Index(fields=['created_at', 'id'], name='labbooking_created_idx'),
+        ),
+    ]
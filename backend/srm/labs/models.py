@@ -24,9 +24,16 @@ class LabBooking(models.Model):
     start_time = models.TimeField()
     end_time = models.TimeField()
     requirements = models.TextField()
+    attendees = models.PositiveIntegerField(null=True, blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['lab', 'date', 'start_time', 'end_time'], name='labbooking_slot_idx'),
+            models.Index(fields=['created_at', 'id'], name='labbooking_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.lab} - {self.date} {self.start_time}-{self.end_time}"
\ No newline at end of file
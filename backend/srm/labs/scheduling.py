@@ -0,0 +1,171 @@
+import numpy as np
+from scipy import sparse
+from scipy.optimize import Bounds, LinearConstraint, milp
+from django.db import transaction
+from rest_framework import serializers
+from srm.signals import bulk_saved
+from .conflicts import find_conflicts, lock_labs
+from .models import Lab, LabBooking
+
+def _minutes(value):
+    return value.hour * 60 + value.minute
+
+def equipment_set(text):
+    return {item.strip().lower() for item in (text or '').split(',') if item.strip()}
+
+def solve(requests, labs, existing, time_limit=30):
+    """Assign pending requests to labs with a 0-1 integer program.
+
+    ``requests`` are dicts with id, lab_id, date, start, end (minutes),
+    attendees and the equipment of the lab they asked for; ``labs`` are dicts with id, capacity and equipment (a set);
+    ``existing`` holds (lab_id, date, start, end) of approved bookings.
+
+    A request may go to its own lab or to any lab with enough capacity and
+    at least the equipment of the lab it asked for, as long as it does not
+    overlap an approved booking there. No lab takes two overlapping requests,
+    and a request left unassigned keeps its slot in the lab it asked for.
+    The objective first maximizes the number of assigned requests and then
+    prefers keeping each request in the lab it asked for.
+
+    Returns ``{request id: lab id}`` for every assigned request.
+    """
+    if not requests:
+        return {}
+    blocked = {}
+    for lab_id, date, start, end in existing:
+        blocked.setdefault((lab_id, date), []).append((start, end))
+
+    # Candidate (request, lab) pairs become the decision variables
+    pairs = []
+    weights = []
+    preference = 1.0 / (len(requests) + 1)
+    for r_index, request in enumerate(requests):
+        needed = request['equipment']
+        for lab in labs:
+            if request['attendees'] and lab['capacity'] < request['attendees']:
+                continue
+            if lab['id'] != request['lab_id'] and not needed <= lab['equipment']:
+                continue
+            if any(start < request['end'] and end > request['start'] for start, end in blocked.get((lab['id'], request['date']), [])):
+                continue
+            pairs.append((r_index, lab['id']))
+            weights.append(1.0 + (preference if lab['id'] == request['lab_id'] else 0.0))
+    if not pairs:
+        return {}
+
+    pair_request = np.array([r for r, _lab in pairs])
+    pair_lab = np.array([lab for _r, lab in pairs])
+    rows, cols, values, upper = [], [], [], []
+
+    def constrain(plus, minus=(), bound=1):
+        rows.extend([len(upper)] * (len(plus) + len(minus)))
+        cols.extend(plus)
+        cols.extend(minus)
+        values.extend([1.0] * len(plus) + [-1.0] * len(minus))
+        upper.append(bound)
+
+    # Each request is assigned at most once
+    for r_index in range(len(requests)):
+        constrain(np.nonzero(pair_request == r_index)[0])
+
+    # Interval graphs have a clique per start point: all requests of a day
+    # that are running at that moment. Per lab, each clique holds at most one.
+    # A request left unassigned stays pending and keeps its slot in the lab
+    # it asked for, so nothing else may land there unless it is assigned.
+    dates = np.array([request['date'] for request in requests], dtype=object)
+    starts = np.array([request['start'] for request in requests])
+    ends = np.array([request['end'] for request in requests])
+    own_labs = np.array([request['lab_id'] for request in requests])
+    for date in set(dates):
+        members = np.nonzero(dates == date)[0]
+        running = (starts[members][None, :] <= starts[members][:, None]) & (starts[members][:, None] < ends[members][None, :])
+        cliques = {tuple(members[row]) for row in running if row.sum() > 1}
+        for clique in cliques:
+            in_clique = np.isin(pair_request, clique)
+            for lab_id in np.union1d(pair_lab[in_clique], own_labs[list(clique)]):
+                columns = np.nonzero(in_clique & (pair_lab == lab_id))[0]
+                if len(columns) > 1:
+                    constrain(columns)
+                for r_index in clique:
+                    if own_labs[r_index] != lab_id:
+                        continue
+                    # Assigned anywhere, or nothing else in this lab
+                    others = columns[pair_request[columns] != r_index]
+                    if len(others):
+                        moved = np.nonzero((pair_request == r_index) & (pair_lab != lab_id))[0]
+                        constrain(others, moved, bound=0)
+
+    matrix = sparse.csr_array((values, (rows, cols)), shape=(len(upper), len(pairs)))
+    result = milp(
+        c=-np.array(weights),
+        constraints=LinearConstraint(matrix, ub=np.array(upper, dtype=float)),
+        integrality=np.ones(len(pairs)),
+        bounds=Bounds(0, 1),
+        options={'time_limit': time_limit},
+    )
+    if result.x is None:
+        return {}
+    chosen = np.nonzero(result.x > 0.5)[0]
+    return {requests[pair_request[i]]['id']: int(pair_lab[i]) for i in chosen}
+
+def plan(start_date, end_date):
+    """Load the pending bookings of a period and propose an assignment."""
+    pending = list(
+        LabBooking.objects.filter(date__range=(start_date, end_date), status='pending')
+        .select_related('lab').order_by('date', 'start_time', 'created_at')
+    )
+    labs = [
+        {'id': lab.pk, 'capacity': lab.capacity, 'equipment': equipment_set(lab.equipment)}
+        for lab in Lab.objects.filter(is_available=True)
+    ]
+    existing = [
+        (lab_id, date, _minutes(start), _minutes(end))
+        for lab_id, date, start, end in LabBooking.objects.filter(
+            date__range=(start_date, end_date), status='approved'
+        ).values_list('lab_id', 'date', 'start_time', 'end_time')
+    ]
+    requests = [
+        {
+            'id': booking.pk, 'lab_id': booking.lab_id, 'date': booking.date,
+            'start': _minutes(booking.start_time), 'end': _minutes(booking.end_time),
+            'attendees': booking.attendees, 'equipment': equipment_set(booking.lab.equipment),
+        }
+        for booking in pending
+    ]
+    return pending, solve(requests, labs, existing)
+
+def commit(pending, assignment):
+    """Approve every assigned booking, moving it to its lab, in one query.
+
+    The new slots are checked again under the lab locks; any overlap with
+    a booking outside the plan raises ValidationError and approves nothing.
+    """
+    assigned = [booking for booking in pending if booking.pk in assignment]
+    labs = Lab.objects.in_bulk(set(assignment.values()))
+    with transaction.atomic():
+        lock_labs(list(labs))
+        conflicts = find_conflicts(
+            [
+                {'lab': labs[assignment[booking.pk]], 'date': booking.date,
+                 'start_time': booking.start_time, 'end_time': booking.end_time}
+                for booking in assigned
+            ],
+            exclude=[booking.pk for booking in assigned],
+        )
+        if conflicts:
+            raise serializers.ValidationError({
+                'non_field_errors': ["The plan overlaps bookings made since it was computed; plan again"],
+                'conflicts': {assigned[index].pk: ids for index, ids in conflicts.items()},
+            })
+
+        approved, previous = [], {}
+        for booking in assigned:
+            previous[booking.pk] = {'lab_id': booking.lab_id, 'status': booking.status}
+            booking.lab_id = assignment[booking.pk]
+            booking.status = 'approved'
+            approved.append(booking)
+        LabBooking.objects.bulk_update(approved, ['lab', 'status'])
+        bulk_saved.send(
+            sender=LabBooking, instances=approved, created=False, update_fields=['lab', 'status'], previous=previous,
+        )
+    return approved
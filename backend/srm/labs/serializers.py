@@ -1,17 +1,145 @@
+from datetime import time
+from dateutil import rrule
 from rest_framework import serializers
 from .models import Lab, LabBooking
 from users.serializers import UserSerializer
+from srm.fieldsets import SparseFieldsetSerializerMixin
 
 class LabSerializer(serializers.ModelSerializer):
     class Meta:
         model = Lab
         fields = '__all__'
 
-class LabBookingSerializer(serializers.ModelSerializer):
+class LabBookingSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     lab = LabSerializer(read_only=True)
+    lab_id = serializers.PrimaryKeyRelatedField(queryset=Lab.objects.all(), source='lab', write_only=True)
     teacher = UserSerializer(read_only=True)
     
     class Meta:
         model = LabBooking
         fields = '__all__'
-        read_only_fields = ['created_at']
\ No newline at end of file
+        read_only_fields = ['created_at']
+
+    def validate(self, attrs):
+        start_time = attrs.get('start_time', getattr(self.instance, 'start_time', None))
+        end_time = attrs.get('end_time', getattr(self.instance, 'end_time', None))
+        if start_time and end_time and start_time >= end_time:
+            raise serializers.ValidationError("End time must be after start time")
+        return attrs
+
+class FreeSlotQuerySerializer(serializers.Serializer):
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    duration = serializers.IntegerField(min_value=1, max_value=24 * 60, help_text='Minutes')
+    capacity = serializers.IntegerField(min_value=0, required=False, default=0)
+    equipment = serializers.CharField(required=False, allow_blank=True, help_text='Comma separated keywords')
+    day_start = serializers.TimeField(required=False, default=time(8, 0))
+    day_end = serializers.TimeField(required=False, default=time(17, 0))
+
+    MAX_DAYS = 200
+
+    def validate(self, attrs):
+        if attrs['end_date'] < attrs['start_date']:
+            raise serializers.ValidationError("end_date must not be before start_date")
+        if (attrs['end_date'] - attrs['start_date']).days >= self.MAX_DAYS:
+            raise serializers.ValidationError(f"Search at most {self.MAX_DAYS} days at a time")
+        if attrs['day_end'] <= attrs['day_start']:
+            raise serializers.ValidationError("day_end must be after day_start")
+        attrs['equipment'] = [word.strip() for word in attrs.get('equipment', '').split(',') if word.strip()]
+        return attrs
+
+
+class BookingOccurrenceSerializer(serializers.Serializer):
+    lab_id = serializers.IntegerField()
+    date = serializers.DateField()
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+
+    def validate(self, attrs):
+        if attrs['start_time'] >= attrs['end_time']:
+            raise serializers.ValidationError("End time must be after start time")
+        return attrs
+
+class RecurrenceSerializer(serializers.Serializer):
+    lab_id = serializers.IntegerField()
+    start_date = serializers.DateField()
+    until = serializers.DateField(required=False)
+    count = serializers.IntegerField(min_value=1, required=False)
+    interval = serializers.IntegerField(min_value=1, default=1, help_text='Weeks between occurrences')
+    weekdays = serializers.ListField(
+        child=serializers.IntegerField(min_value=0, max_value=6), required=False,
+        help_text='0 = Monday; defaults to the weekday of start_date',
+    )
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+
+    def validate(self, attrs):
+        if ('until' in attrs) == ('count' in attrs):
+            raise serializers.ValidationError("Give exactly one of until or count")
+        if attrs['start_time'] >= attrs['end_time']:
+            raise serializers.ValidationError("End time must be after start time")
+        return attrs
+
+    @staticmethod
+    def expand(attrs, limit):
+        dates = rrule.rrule(
+            rrule.WEEKLY,
+            dtstart=attrs['start_date'],
+            interval=attrs['interval'],
+            byweekday=attrs.get('weekdays') or [attrs['start_date'].weekday()],
+            until=attrs.get('until'),
+            count=attrs.get('count'),
+        )
+        occurrences = []
+        for moment in dates:
+            if len(occurrences) == limit:
+                raise serializers.ValidationError(f"A series may have at most {limit} occurrences")
+            occurrences.append({
+                'lab_id': attrs['lab_id'],
+                'date': moment.date(),
+                'start_time': attrs['start_time'],
+                'end_time': attrs['end_time'],
+            })
+        return occurrences
+
+class BulkLabBookingSerializer(serializers.Serializer):
+    occurrences = BookingOccurrenceSerializer(many=True, required=False)
+    recurrence = RecurrenceSerializer(required=False)
+    requirements = serializers.CharField()
+    notes = serializers.CharField(required=False, allow_blank=True, default='')
+    all_or_nothing = serializers.BooleanField(default=False)
+
+    MAX_OCCURRENCES = 100
+
+    def validate(self, attrs):
+        if ('occurrences' in attrs) == ('recurrence' in attrs):
+            raise serializers.ValidationError("Give exactly one of occurrences or recurrence")
+        if 'recurrence' in attrs:
+            occurrences = RecurrenceSerializer.expand(attrs.pop('recurrence'), self.MAX_OCCURRENCES)
+        else:
+            occurrences = attrs['occurrences']
+        if not occurrences:
+            raise serializers.ValidationError("No occurrences to book")
+        if len(occurrences) > self.MAX_OCCURRENCES:
+            raise serializers.ValidationError(f"At most {self.MAX_OCCURRENCES} occurrences per request")
+
+        # Resolve every lab with one query instead of one per occurrence
+        labs = Lab.objects.in_bulk({occ['lab_id'] for occ in occurrences})
+        missing = sorted({occ['lab_id'] for occ in occurrences} - set(labs))
+        if missing:
+            raise serializers.ValidationError({'lab_id': [f"Unknown lab {pk}" for pk in missing]})
+        attrs['occurrences'] = [
+            {'lab': labs[occ['lab_id']], 'date': occ['date'], 'start_time': occ['start_time'], 'end_time': occ['end_time']}
+            for occ in occurrences
+        ]
+        return attrs
+
+class SchedulePlanSerializer(serializers.Serializer):
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    commit = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        if attrs['end_date'] < attrs['start_date']:
+            raise serializers.ValidationError("end_date must not be before start_date")
+        return attrs
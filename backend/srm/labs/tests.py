@@ -1,3 +1,427 @@
-from django.test import TestCase
+import threading
+from datetime import date, time, timedelta
+from unittest import mock
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+from users.models import User
+from . import conflicts, scheduling
+from .availability import free_windows
+from .models import Lab, LabBooking
+from .serializers import RecurrenceSerializer
 
-# Create your tests here.
+
+class BulkStatusTests(TestCase):
+    def setUp(self):
+        teacher = User.objects.create(username='teacher', role='teacher')
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='labtech', role='labtech'))
+        lab = Lab.objects.create(lab_number='101', capacity=30)
+        self.bookings = LabBooking.objects.bulk_create([
+            LabBooking(
+                lab=lab, teacher=teacher, date=date(2026, 11, 2) + timedelta(days=day),
+                start_time=time(9), end_time=time(10), requirements='Microscopes', status=status,
+            )
+            for day, status in enumerate(['pending', 'pending', 'rejected', 'pending'])
+        ])
+
+    def test_filter_transition_skips_disallowed_rows(self):
+        response = self.client.post('/api/labs/bookings/status/', {
+            'status': 'approved', 'filter': {'date__lte': '2026-11-04'},
+        }, format='json')
+
+        self.assertEqual(response.data['updated'], 2)
+        self.assertEqual(response.data['skipped'], [{'id': self.bookings[2].pk, 'status': 'rejected'}])
+        self.assertEqual(
+            list(LabBooking.objects.order_by('date').values_list('status', flat=True)),
+            ['approved', 'approved', 'rejected', 'pending'],
+        )
+
+    def test_approvals_are_checked_for_conflicts(self):
+        # Overlaps the first pending booking, as an unplanned pending one can
+        clash = LabBooking.objects.create(
+            lab=self.bookings[0].lab, teacher=self.bookings[0].teacher, date=self.bookings[0].date,
+            start_time=time(9, 30), end_time=time(10, 30), requirements='Microscopes',
+        )
+        url = '/api/labs/bookings/status/'
+        response = self.client.post(url, {'status': 'approved', 'ids': [self.bookings[0].pk]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['conflicts'], {self.bookings[0].pk: [str(clash.pk)]})
+        self.assertFalse(LabBooking.objects.filter(status='approved').exists())
+
+        # Within one request the earlier booking wins, so both cannot be approved
+        clash.date = self.bookings[1].date
+        clash.save()
+        response = self.client.post(url, {'status': 'approved', 'ids': [self.bookings[1].pk, clash.pk]}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        clash.status = 'rejected'
+        clash.save()
+        response = self.client.post(url, {'status': 'approved', 'ids': [self.bookings[0].pk]}, format='json')
+        self.assertEqual(response.data['ids'], [self.bookings[0].pk])
+
+    def test_rows_added_after_the_read_are_left_alone(self):
+        read = QuerySet.values_list
+        added = []
+
+        def read_then_insert(queryset, *fields, **kwargs):
+            rows = list(read(queryset, *fields, **kwargs))
+            if not added:
+                # A booking committed between the locked read and the UPDATE
+                added.append(LabBooking.objects.create(
+                    lab=self.bookings[0].lab, teacher=self.bookings[0].teacher, date=date(2026, 11, 20),
+                    start_time=time(9), end_time=time(10), requirements='Microscopes',
+                ))
+            return rows
+
+        with mock.patch.object(QuerySet, 'values_list', read_then_insert):
+            response = self.client.post('/api/labs/bookings/status/', {
+                'status': 'rejected', 'filter': {'status': 'pending'},
+            }, format='json')
+        self.assertEqual(response.data['updated'], 3)
+        added[0].refresh_from_db()
+        self.assertEqual(added[0].status, 'pending')
+
+    def test_invalid_requests_change_nothing(self):
+        url = '/api/labs/bookings/status/'
+        self.assertEqual(self.client.post(url, {'status': 'pending', 'ids': [1]}, format='json').status_code, 400)
+        self.assertEqual(
+            self.client.post(url, {'status': 'approved', 'filter': {'room': '1'}}, format='json').status_code, 400,
+        )
+        self.assertFalse(LabBooking.objects.filter(status='approved').exists())
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        teacher = User.objects.create(username='teacher', role='teacher')
+        self.client = APIClient()
+        self.client.force_authenticate(teacher)
+        self.lab = Lab.objects.create(lab_number='101', capacity=30, equipment='Microscopes')
+        self.booking = LabBooking.objects.create(
+            lab=self.lab, teacher=teacher, date=date(2026, 11, 2), start_time=time(9), end_time=time(10),
+            requirements='Microscopes', notes='Year 9 biology',
+        )
+
+    def test_fields_limit_output_and_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/labs/bookings/', {'fields': 'date,status,lab'})
+        self.assertEqual(response.data['results'], [
+            {'id': self.booking.pk, 'lab': self.lab.pk, 'date': '2026-11-02', 'status': 'pending'},
+        ])
+        sql, = [query['sql'] for query in queries]
+        self.assertNotIn('requirements', sql)
+        self.assertNotIn('JOIN', sql)
+
+    def test_expand_embeds_relation(self):
+        response = self.client.get('/api/labs/bookings/', {'fields': 'date', 'expand': 'lab'})
+        self.assertEqual(response.data['results'][0]['lab']['lab_number'], '101')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'date', 'lab'})
+
+        response = self.client.get(f'/api/labs/bookings/{self.booking.pk}/', {'expand': 'teacher'})
+        self.assertEqual(response.data['lab'], self.lab.pk)
+        self.assertEqual(response.data['teacher']['username'], 'teacher')
+        self.assertEqual(response.data['notes'], 'Year 9 biology')
+
+    def test_unknown_names_are_rejected(self):
+        response = self.client.get('/api/labs/bookings/', {'fields': 'date,room', 'expand': 'date'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data), {'fields', 'expand'})
+
+
+class BookingConflictTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='teacher', role='teacher'))
+        self.lab = Lab.objects.create(lab_number='101', capacity=30)
+        self.other_lab = Lab.objects.create(lab_number='102', capacity=30)
+        self.booking = self.book('09:00', '10:00').data
+
+    def book(self, start_time, end_time, lab=None):
+        return self.client.post('/api/labs/bookings/', {
+            'lab_id': (lab or self.lab).pk, 'date': '2026-11-02', 'start_time': start_time, 'end_time': end_time,
+            'requirements': 'Microscopes',
+        }, format='json')
+
+    def test_overlapping_create_is_rejected(self):
+        response = self.book('09:30', '11:00')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['conflicts'], [str(self.booking['id'])])
+
+        # Back to back, another lab, or a freed slot are all fine
+        self.assertEqual(self.book('10:00', '11:00').status_code, 201)
+        self.assertEqual(self.book('09:00', '10:00', lab=self.other_lab).status_code, 201)
+        LabBooking.objects.filter(pk=self.booking['id']).update(status='rejected')
+        self.assertEqual(self.book('09:30', '10:00').status_code, 201)
+
+    def test_overlapping_update_is_rejected(self):
+        other = self.book('10:00', '11:00').data
+        url = f"/api/labs/bookings/{other['id']}/"
+        response = self.client.patch(url, {'start_time': '09:45'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['conflicts'], [str(self.booking['id'])])
+
+        # A booking never conflicts with itself
+        self.assertEqual(self.client.patch(url, {'end_time': '11:30'}, format='json').status_code, 200)
+        self.assertEqual(self.client.patch(url, {'lab_id': self.other_lab.pk, 'start_time': '09:00'}, format='json').status_code, 200)
+
+        # Reactivating a rejected booking needs its slot to be free again
+        self.assertEqual(self.client.patch(url, {'status': 'rejected'}, format='json').status_code, 200)
+        self.book('09:00', '10:00', lab=self.other_lab)
+        self.assertEqual(self.client.patch(url, {'status': 'pending'}, format='json').status_code, 400)
+
+
+class ConcurrentBookingTests(TransactionTestCase):
+    def test_parallel_bookings_for_one_slot_admit_one(self):
+        teacher = User.objects.create(username='teacher', role='teacher')
+        lab = Lab.objects.create(lab_number='101', capacity=30)
+        barrier = threading.Barrier(10)
+        statuses = []
+        lock = threading.Lock()
+
+        def worker(index):
+            client = APIClient()
+            client.force_authenticate(teacher)
+            barrier.wait()
+            try:
+                # Every request overlaps every other on 09:30-10:00
+                response = client.post('/api/labs/bookings/', {
+                    'lab_id': lab.pk, 'date': '2026-11-02', 'start_time': f'09:{index:02d}', 'end_time': '10:00',
+                    'requirements': 'Microscopes',
+                }, format='json')
+                with lock:
+                    statuses.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(10)]
+        # SQLite already serializes writers at BEGIN; other databases rely on the lab lock
+        with mock.patch.object(conflicts, 'lock_labs', wraps=conflicts.lock_labs) as lock_labs:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(lock_labs.call_args_list, [mock.call([lab.pk])] * 10)
+        self.assertEqual(sorted(statuses), [201] + [400] * 9)
+        self.assertEqual(LabBooking.objects.count(), 1)
+
+
+class BulkBookingTests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create(username='teacher', role='teacher')
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+        self.lab = Lab.objects.create(lab_number='101', capacity=30)
+        # 2026-11-09 is the second Monday of the series below
+        self.taken = LabBooking.objects.create(
+            lab=self.lab, teacher=self.teacher, date=date(2026, 11, 9), start_time=time(9, 30), end_time=time(11),
+            requirements='Microscopes',
+        )
+
+    def series(self, **recurrence):
+        return {
+            'lab_id': self.lab.pk, 'start_date': date(2026, 11, 2), 'start_time': time(9), 'end_time': time(10),
+            **recurrence,
+        }
+
+    def dates(self, **recurrence):
+        serializer = RecurrenceSerializer(data=self.series(**recurrence))
+        serializer.is_valid(raise_exception=True)
+        return [occ['date'].isoformat() for occ in RecurrenceSerializer.expand(serializer.validated_data, 100)]
+
+    def post(self, **data):
+        return self.client.post('/api/labs/bookings/bulk/', {'requirements': 'Microscopes', **data}, format='json')
+
+    def test_recurrence_expands_weekly_rules(self):
+        self.assertEqual(self.dates(count=3), ['2026-11-02', '2026-11-09', '2026-11-16'])
+        self.assertEqual(self.dates(until='2026-11-30', interval=2), ['2026-11-02', '2026-11-16', '2026-11-30'])
+        self.assertEqual(
+            self.dates(count=4, weekdays=[0, 3]), ['2026-11-02', '2026-11-05', '2026-11-09', '2026-11-12'],
+        )
+        self.assertEqual(self.post(recurrence=self.series()).status_code, 400)
+        self.assertEqual(self.post(recurrence=self.series(count=101)).status_code, 400)
+
+    def test_conflicting_occurrences_are_skipped(self):
+        response = self.post(recurrence=self.series(count=3))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['created'], response.data['conflicts']), (2, 1))
+        self.assertEqual(
+            [(result['date'].isoformat(), result['result']) for result in response.data['results']],
+            [('2026-11-02', 'created'), ('2026-11-09', 'conflict'), ('2026-11-16', 'created')],
+        )
+        self.assertEqual(response.data['results'][1]['conflicts'], [self.taken.pk])
+        self.assertEqual(LabBooking.objects.count(), 3)
+
+    def test_occurrences_conflicting_with_each_other(self):
+        occurrence = {'lab_id': self.lab.pk, 'date': '2026-11-03', 'start_time': '09:00', 'end_time': '10:00'}
+        response = self.post(occurrences=[occurrence, {**occurrence, 'start_time': '09:30', 'end_time': '10:30'}])
+        self.assertEqual([result['result'] for result in response.data['results']], ['created', 'conflict'])
+        self.assertEqual(response.data['results'][1]['conflicts'], [])
+
+    def test_all_or_nothing_creates_nothing_on_conflict(self):
+        response = self.post(recurrence=self.series(count=3), all_or_nothing=True)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(
+            [result['result'] for result in response.data['results']], ['skipped', 'conflict', 'skipped'],
+        )
+        self.assertEqual(LabBooking.objects.count(), 1)
+
+        response = self.post(recurrence=self.series(count=3, start_date='2026-11-03'), all_or_nothing=True)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 3)
+
+
+class FreeSlotTests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create(username='teacher', role='teacher')
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+        self.small = Lab.objects.create(lab_number='101', capacity=20, equipment='Microscopes')
+        self.large = Lab.objects.create(lab_number='102', capacity=40, equipment='Computers')
+        self.day = date(2026, 11, 2)
+
+    def book(self, lab, start, end, status='approved'):
+        LabBooking.objects.create(
+            lab=lab, teacher=self.teacher, date=self.day, start_time=start, end_time=end,
+            requirements='', status=status,
+        )
+
+    def windows(self, labs, duration, day_start=time(8), day_end=time(12)):
+        windows = free_windows(labs, self.day, self.day, duration, day_start, day_end)
+        return [(window['start_time'], window['end_time']) for window in windows[labs[0].pk]]
+
+    def test_windows_skip_active_bookings(self):
+        self.book(self.small, time(9), time(10, 10))
+        self.book(self.small, time(11), time(11, 30), status='rejected')
+        self.assertEqual(self.windows([self.small], 45), [(time(8), time(9)), (time(10, 15), time(12))])
+        self.assertEqual(self.windows([self.small], 61), [(time(10, 15), time(12))])
+
+    def test_windows_clamped_to_day_end_keep_full_duration(self):
+        self.assertEqual(self.windows([self.small], 60, day_end=time(8, 50)), [])
+        self.assertEqual(self.windows([self.small], 50, day_end=time(8, 50)), [(time(8), time(8, 50))])
+
+    def test_endpoint_filters_labs(self):
+        self.book(self.large, time(8), time(12))
+        response = self.client.get('/api/labs/free-slots/', {
+            'start_date': '2026-11-02', 'end_date': '2026-11-02', 'duration': 60, 'day_end': '12:00',
+        })
+        self.assertEqual([row['lab']['lab_number'] for row in response.data], ['101'])
+
+        response = self.client.get('/api/labs/free-slots/', {
+            'start_date': '2026-11-02', 'end_date': '2026-11-03', 'duration': 60, 'capacity': 30, 'day_end': '12:00',
+        })
+        self.assertEqual([row['lab']['lab_number'] for row in response.data], ['102'])
+        self.assertEqual([window['date'] for window in response.data[0]['windows']], [date(2026, 11, 3)])
+
+        response = self.client.get('/api/labs/free-slots/', {
+            'start_date': '2026-11-02', 'end_date': '2026-11-02', 'duration': 60, 'equipment': 'microscopes',
+        })
+        self.assertEqual([row['lab']['lab_number'] for row in response.data], ['101'])
+
+
+class SchedulingTests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create(username='teacher', role='teacher')
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='labtech', role='labtech'))
+        self.chem = Lab.objects.create(lab_number='101', capacity=30, equipment='Fume hood')
+        self.spare = Lab.objects.create(lab_number='102', capacity=30, equipment='Fume hood, Microscopes')
+        self.small = Lab.objects.create(lab_number='103', capacity=10, equipment='Fume hood')
+        self.day = date(2026, 11, 2)
+
+    def request(self, request_id, lab_id, start, end, attendees=20, equipment=frozenset({'fume hood'})):
+        return {
+            'id': request_id, 'lab_id': lab_id, 'date': self.day, 'start': start, 'end': end,
+            'attendees': attendees, 'equipment': set(equipment),
+        }
+
+    def test_solve_moves_overlaps_to_a_suitable_lab(self):
+        labs = [
+            {'id': 1, 'capacity': 30, 'equipment': {'fume hood'}},
+            {'id': 2, 'capacity': 30, 'equipment': {'fume hood', 'microscopes'}},
+            {'id': 3, 'capacity': 10, 'equipment': {'fume hood'}},
+            {'id': 4, 'capacity': 30, 'equipment': {'computers'}},
+        ]
+        requests = [self.request(1, 1, 540, 600), self.request(2, 1, 570, 630), self.request(3, 1, 600, 660)]
+        # Lab 2 is taken for the first hour, so request 2 is the one that can move
+        existing = [(2, self.day, 540, 560)]
+
+        self.assertEqual(scheduling.solve(requests, labs, existing), {1: 1, 2: 2, 3: 1})
+        # With lab 2 taken, request 2 stays pending across both of the others
+        self.assertEqual(scheduling.solve(requests, labs, [(2, self.day, 540, 640)]), {})
+        self.assertEqual(scheduling.solve([], labs, existing), {})
+
+    def test_unassigned_requests_keep_their_slot(self):
+        labs = [{'id': 1, 'capacity': 30, 'equipment': {'fume hood'}}, {'id': 2, 'capacity': 30, 'equipment': {'fume hood'}}]
+        # Request 1 fits nowhere and stays pending in lab 1; request 2 cannot
+        # stay in lab 2 and must not move onto request 1's slot either
+        existing = [(1, self.day, 500, 550), (2, self.day, 530, 545), (2, self.day, 600, 700)]
+        requests = [self.request(1, 1, 540, 600), self.request(2, 2, 550, 620)]
+        self.assertEqual(scheduling.solve(requests, labs, existing), {})
+        self.assertEqual(scheduling.solve(requests[1:], labs, existing), {2: 1})
+
+    def book(self, lab, start, end, status='pending', attendees=20):
+        return LabBooking.objects.create(
+            lab=lab, teacher=self.teacher, date=self.day, start_time=start, end_time=end,
+            requirements='', status=status, attendees=attendees,
+        )
+
+    def test_plan_reads_pending_bookings(self):
+        first = self.book(self.chem, time(9), time(10))
+        second = self.book(self.chem, time(9, 30), time(10, 30))
+        self.book(self.spare, time(9), time(11), status='approved')
+        crowded = self.book(self.chem, time(9, 45), time(10, 15), attendees=25)
+
+        pending, assignment = scheduling.plan(self.day, self.day)
+        self.assertEqual({booking.pk for booking in pending}, {first.pk, second.pk, crowded.pk})
+        # The spare lab is approved for the morning and the small one is too
+        # small, so approving any of them would overlap the others still pending
+        self.assertEqual(assignment, {})
+
+        crowded.delete()
+        second.status = 'rejected'
+        second.save()
+        pending, assignment = scheduling.plan(self.day, self.day)
+        self.assertEqual(assignment, {first.pk: self.chem.pk})
+
+    def test_commit_rechecks_the_new_slots(self):
+        first = self.book(self.chem, time(9), time(10))
+        pending, assignment = scheduling.plan(self.day, self.day)
+        # Booked after the plan was made, in the slot the plan gives away
+        late = self.book(self.chem, time(9, 30), time(10, 30))
+        with self.assertRaises(ValidationError) as raised:
+            scheduling.commit(pending, assignment)
+        self.assertEqual(raised.exception.detail['conflicts'], {first.pk: [str(late.pk)]})
+        self.assertFalse(LabBooking.objects.filter(status='approved').exists())
+
+    def test_schedule_endpoint_previews_then_commits(self):
+        first = self.book(self.chem, time(9), time(10))
+        second = self.book(self.chem, time(9, 30), time(10, 30))
+        url = '/api/labs/bookings/schedule/'
+
+        preview = self.client.post(url, {'start_date': '2026-11-02', 'end_date': '2026-11-02'}, format='json').data
+        self.assertEqual((preview['committed'], preview['assigned'], preview['unassigned']), (False, 2, []))
+        self.assertEqual(sum(row['moved'] for row in preview['plan']), 1)
+        self.assertFalse(LabBooking.objects.filter(status='approved').exists())
+
+        self.client.post(url, {'start_date': '2026-11-02', 'end_date': '2026-11-02', 'commit': True}, format='json')
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.status, second.status), ('approved', 'approved'))
+        self.assertNotEqual(first.lab_id, second.lab_id)
+
+        self.client.force_authenticate(self.teacher)
+        self.assertEqual(self.client.post(url, {'start_date': '2026-11-02', 'end_date': '2026-11-02'}).status_code, 403)
+
+    def test_command_reports_moves_when_committing(self):
+        self.book(self.chem, time(9), time(10))
+        self.book(self.chem, time(9, 30), time(10, 30))
+        out = StringIO()
+        call_command('plan_lab_bookings', '--start', '2026-11-02', '--end', '2026-11-02', '--commit', stdout=out)
+        self.assertIn('Approved 2 of 2 pending bookings (1 moved to another lab)', out.getvalue())
+        self.assertEqual(LabBooking.objects.filter(status='approved').count(), 2)
@@ -2,7 +2,11 @@ from django.urls import path
 from .views import (
     LabListCreateView,
     AvailableLabsView,
+    FreeSlotSearchView,
     LabBookingListCreateView,
+    LabBookingBulkCreateView,
+    LabBookingScheduleView,
+    LabBookingBulkStatusView,
     LabBookingRetrieveUpdateDestroyView,
     RecentLabBookingsView
 )
@@ -10,7 +14,11 @@ from .views import (
 urlpatterns = [
     path('', LabListCreateView.as_view(), name='lab-list'),
     path('available/', AvailableLabsView.as_view(), name='available-labs'),
+    path('free-slots/', FreeSlotSearchView.as_view(), name='lab-free-slots'),
     path('bookings/', LabBookingListCreateView.as_view(), name='lab-booking-list'),
+    path('bookings/bulk/', LabBookingBulkCreateView.as_view(), name='lab-booking-bulk'),
+    path('bookings/schedule/', LabBookingScheduleView.as_view(), name='lab-booking-schedule'),
+    path('bookings/status/', LabBookingBulkStatusView.as_view(), name='lab-booking-bulk-status'),
     path('bookings/<int:pk>/', LabBookingRetrieveUpdateDestroyView.as_view(), name='lab-booking-detail'),
     path('bookings/recent/', RecentLabBookingsView.as_view(), name='recent-lab-bookings'),
 ]
\ No newline at end of file
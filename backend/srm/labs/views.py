@@ -1,38 +1,231 @@
-from rest_framework import generics, permissions
+from django.db import transaction
+from rest_framework import generics, permissions, serializers, status
+from rest_framework.response import Response
+from srm.cache import CachedResponseMixin
+from srm.export import ExportMixin
+from srm.fastpath import FastListMixin
+from srm.fieldsets import SparseFieldsetMixin
+from srm.signals import bulk_saved
+from srm.transitions import BulkTransitionSerializer, transition_targets, bulk_transition, transition_response
 from .models import Lab, LabBooking
-from .serializers import LabSerializer, LabBookingSerializer
+from .serializers import (
+    LabSerializer, LabBookingSerializer, FreeSlotQuerySerializer,
+    BulkLabBookingSerializer, SchedulePlanSerializer
+)
+from .conflicts import ACTIVE_STATUSES, ensure_no_conflict, find_conflicts, lock_labs
+from .availability import free_windows
+from . import scheduling
 from django_filters.rest_framework import DjangoFilterBackend
 
-class LabListCreateView(generics.ListCreateAPIView):
+class LabListCreateView(ExportMixin, CachedResponseMixin, FastListMixin, generics.ListCreateAPIView):
     queryset = Lab.objects.all()
     serializer_class = LabSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cache_models = (Lab,)
+    keyset_ordering = ('lab_number', 'id')
 
-class AvailableLabsView(generics.ListAPIView):
+class AvailableLabsView(ExportMixin, CachedResponseMixin, generics.ListAPIView):
     serializer_class = LabSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cache_models = (Lab,)
+    keyset_ordering = ('lab_number', 'id')
 
     def get_queryset(self):
         return Lab.objects.filter(is_available=True)
 
-class LabBookingListCreateView(generics.ListCreateAPIView):
-    queryset = LabBooking.objects.all()
+class FreeSlotSearchView(generics.GenericAPIView):
+    serializer_class = LabSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        params = FreeSlotQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        query = params.validated_data
+
+        labs = Lab.objects.filter(is_available=True, capacity__gte=query['capacity'])
+        for keyword in query['equipment']:
+            labs = labs.filter(equipment__icontains=keyword)
+        labs = list(labs.order_by('lab_number'))
+
+        windows = free_windows(
+            labs, query['start_date'], query['end_date'], query['duration'],
+            query['day_start'], query['day_end'],
+        )
+        results = [
+            {'lab': self.get_serializer(lab).data, 'windows': windows[lab.pk]}
+            for lab in labs if windows[lab.pk]
+        ]
+        return Response(results)
+
+class LabBookingListCreateView(ExportMixin, FastListMixin, SparseFieldsetMixin, generics.ListCreateAPIView):
+    queryset = LabBooking.objects.select_related('lab', 'teacher')
     serializer_class = LabBookingSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['status', 'teacher', 'lab']
 
     def perform_create(self, serializer):
-        serializer.save(teacher=self.request.user)
+        data = serializer.validated_data
+        with transaction.atomic():
+            ensure_no_conflict(data['lab'], data['date'], data['start_time'], data['end_time'])
+            serializer.save(teacher=self.request.user)
+
+class LabBookingBulkCreateView(generics.GenericAPIView):
+    serializer_class = BulkLabBookingSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        occurrences = data['occurrences']
+
+        with transaction.atomic():
+            lock_labs({occ['lab'].pk for occ in occurrences})
+            conflicts = find_conflicts(occurrences)
+            if conflicts and data['all_or_nothing']:
+                bookings = []
+            else:
+                bookings = LabBooking.objects.bulk_create([
+                    LabBooking(
+                        teacher=request.user, requirements=data['requirements'], notes=data['notes'], **occ
+                    )
+                    for index, occ in enumerate(occurrences) if index not in conflicts
+                ])
+                bulk_saved.send(sender=LabBooking, instances=bookings, created=True)
+
+        created = iter(bookings)
+        results = []
+        for index, occ in enumerate(occurrences):
+            result = {
+                'lab': occ['lab'].pk,
+                'date': occ['date'],
+                'start_time': occ['start_time'],
+                'end_time': occ['end_time'],
+            }
+            if index in conflicts:
+                result.update(result='conflict', conflicts=conflicts[index])
+            elif bookings:
+                result.update(result='created', id=next(created).pk)
+            else:
+                result.update(result='skipped')
+            results.append(result)
+
+        return Response(
+            {'created': len(bookings), 'conflicts': len(conflicts), 'results': results},
+            status=status.HTTP_201_CREATED if bookings else status.HTTP_409_CONFLICT,
+        )
+
+class LabBookingScheduleView(generics.GenericAPIView):
+    serializer_class = SchedulePlanSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        if request.user.role not in ('labtech', 'admin'):
+            return Response({"detail": "Not authorized"}, status=403)
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        if data['commit']:
+            # Re-plan under the lab locks so the committed plan is still valid
+            with transaction.atomic():
+                lock_labs(Lab.objects.values_list('pk', flat=True))
+                pending, assignment = scheduling.plan(data['start_date'], data['end_date'])
+                requested = {booking.pk: booking.lab_id for booking in pending}
+                scheduling.commit(pending, assignment)
+        else:
+            pending, assignment = scheduling.plan(data['start_date'], data['end_date'])
+            requested = {booking.pk: booking.lab_id for booking in pending}
+
+        plan = [
+            {'booking': pk, 'requested_lab': requested[pk], 'lab': lab_id, 'moved': lab_id != requested[pk]}
+            for pk, lab_id in assignment.items()
+        ]
+        return Response({
+            'committed': data['commit'],
+            'assigned': len(plan),
+            'unassigned': [pk for pk in requested if pk not in assignment],
+            'plan': plan,
+        })
+
+class LabBookingBulkStatusView(generics.GenericAPIView):
+    serializer_class = BulkTransitionSerializer
+    permission_classes = [permissions.IsAuthenticated]
 
-class LabBookingRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = LabBooking.objects.all()
+    # Approvals are checked for conflicts like single updates; reopening a
+    # rejected booking has to go through the per-booking update
+    TRANSITIONS = {
+        'approved': ('pending',),
+        'rejected': ('pending', 'approved'),
+    }
+    FILTER_FIELDS = {'status': ['exact'], 'lab': ['exact'], 'teacher': ['exact'], 'date': ['exact', 'gte', 'lte']}
+
+    def post(self, request):
+        if request.user.role not in ('labtech', 'admin'):
+            return Response({"detail": "Not authorized"}, status=403)
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        if data['status'] not in self.TRANSITIONS:
+            raise serializers.ValidationError({'status': f"Bookings cannot be bulk moved to {data['status']!r}"})
+
+        queryset = transition_targets(LabBooking, data, self.FILTER_FIELDS)
+        with transaction.atomic():
+            if data['status'] == 'approved':
+                queryset = self.check_conflicts(queryset)
+            moved, skipped = bulk_transition(
+                queryset, data['status'], self.TRANSITIONS[data['status']], related=('lab', 'teacher'),
+            )
+        return Response(transition_response(data['status'], moved, skipped, data))
+
+    def check_conflicts(self, queryset):
+        """Refuse the whole approval if a pending booking overlaps another
+        active one, and return the checked rows for the transition."""
+        ids = list(queryset.values_list('pk', flat=True))
+        lock_labs(LabBooking.objects.filter(pk__in=ids).values_list('lab_id', flat=True).distinct())
+        pending = list(LabBooking.objects.filter(pk__in=ids, status='pending').select_related('lab'))
+        conflicts = find_conflicts(
+            [
+                {'lab': booking.lab, 'date': booking.date, 'start_time': booking.start_time, 'end_time': booking.end_time}
+                for booking in pending
+            ],
+            exclude=[booking.pk for booking in pending],
+        )
+        if conflicts:
+            raise serializers.ValidationError({
+                'non_field_errors': ["Some bookings overlap other bookings of their lab"],
+                'conflicts': {pending[index].pk: overlapping for index, overlapping in conflicts.items()},
+            })
+        return LabBooking.objects.filter(pk__in=ids)
+
+class LabBookingRetrieveUpdateDestroyView(SparseFieldsetMixin, generics.RetrieveUpdateDestroyAPIView):
+    queryset = LabBooking.objects.select_related('lab', 'teacher')
     serializer_class = LabBookingSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-class RecentLabBookingsView(generics.ListAPIView):
+    def perform_update(self, serializer):
+        instance = serializer.instance
+        data = serializer.validated_data
+        slot_fields = ('lab', 'date', 'start_time', 'end_time', 'status')
+        changed = any(field in data and data[field] != getattr(instance, field) for field in slot_fields)
+        with transaction.atomic():
+            if changed and data.get('status', instance.status) in ACTIVE_STATUSES:
+                ensure_no_conflict(
+                    data.get('lab', instance.lab),
+                    data.get('date', instance.date),
+                    data.get('start_time', instance.start_time),
+                    data.get('end_time', instance.end_time),
+                    exclude=instance.pk,
+                )
+            serializer.save()
+
+class RecentLabBookingsView(SparseFieldsetMixin, generics.ListAPIView):
     serializer_class = LabBookingSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = None
 
     def get_queryset(self):
-        return LabBooking.objects.order_by('-created_at')[:10]
\ No newline at end of file
+        return LabBooking.objects.select_related('lab', 'teacher').order_by('-created_at')[:10]
\ No newline at end of file
@@ -0,0 +1,184 @@
+from collections import Counter
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Coalesce, Concat, Greatest
+from django.utils import timezone
+from srm.signals import bulk_saved
+from users.models import User
+from .models import Book, Borrower, BorrowRecord, normalize_name
+
+# Copies are only ever moved with conditional UPDATEs, so the database
+# enforces 0 <= available_copies <= total_copies under any concurrency and
+# a borrow or return costs one statement instead of a read and a write.
+
+def take_copy(book_id):
+    """Reserve one copy; returns False when none is available."""
+    return Book.objects.filter(pk=book_id, available_copies__gt=0).update(
+        available_copies=F('available_copies') - 1
+    ) == 1
+
+def release_copy(book_id):
+    """Put one copy back; returns False when every copy already was."""
+    return Book.objects.filter(pk=book_id, available_copies__lt=F('total_copies')).update(
+        available_copies=F('available_copies') + 1
+    ) == 1
+
+def mark_returned(record):
+    """Flag a borrow as returned exactly once; returns False if it already was."""
+    now = timezone.now()
+    if not BorrowRecord.objects.filter(pk=record.pk, returned=False).update(returned=True, returned_date=now):
+        return False
+    record.returned = True
+    record.returned_date = now
+    return True
+
+def copies_changed(changes):
+    """Announce moved copies. ``changes`` maps book ids to the change in
+    their available copies, negative for checkouts."""
+    changes = {pk: change for pk, change in changes.items() if change}
+    if not changes:
+        return
+    books = list(Book.objects.filter(pk__in=changes))
+    previous = {book.pk: {'available_copies': book.available_copies - changes[book.pk]} for book in books}
+    bulk_saved.send(
+        sender=Book, instances=books, created=False, update_fields=['available_copies'], previous=previous,
+    )
+
+def default_loan_limit(borrower_type):
+    return settings.LIBRARY_LOAN_LIMITS[borrower_type]
+
+def teacher_account(name):
+    """The unlinked teacher whose username or full name is ``name``, if
+    exactly one matches; the same rule as the borrower backfill."""
+    name = ' '.join(name.split())
+    teachers = User.objects.filter(role='teacher', borrower__isnull=True)
+    for matches in (
+        teachers.filter(username__iexact=name),
+        teachers.annotate(full_name=Concat('first_name', Value(' '), 'last_name')).filter(full_name__iexact=name),
+    ):
+        found = list(matches.values_list('pk', flat=True)[:2])
+        if found:
+            return found[0] if len(found) == 1 else None
+    return None
+
+def resolve_borrower(name, borrower_type):
+    """The borrower for a typed-in name, created on first checkout.
+    Teachers are linked to their user account when it can be told apart."""
+    borrower, _created = Borrower.objects.get_or_create(
+        normalized_name=normalize_name(name), borrower_type=borrower_type,
+        defaults={'name': ' '.join(name.split())},
+    )
+    if borrower_type == 'teacher' and borrower.user_id is None:
+        user_id = teacher_account(name)
+        if user_id is not None:
+            try:
+                with transaction.atomic():
+                    Borrower.objects.filter(pk=borrower.pk, user__isnull=True).update(user_id=user_id)
+            except IntegrityError:
+                # Linked to another borrower in the meantime
+                pass
+            else:
+                borrower.refresh_from_db(fields=['user'])
+    return borrower
+
+def reserve_loan(borrower):
+    """Count one more active loan unless the borrower is at their limit.
+
+    The limit check and the counter bump are one conditional UPDATE on the
+    borrower's primary key. Returns False when the limit is reached.
+    """
+    limit = Coalesce(F('loan_limit'), Value(default_loan_limit(borrower.borrower_type)))
+    return Borrower.objects.filter(pk=borrower.pk, active_loans__lt=limit).update(
+        active_loans=F('active_loans') + 1, total_loans=F('total_loans') + 1,
+    ) == 1
+
+def release_loan(borrower_id):
+    if borrower_id is not None:
+        Borrower.objects.filter(pk=borrower_id, active_loans__gt=0).update(active_loans=F('active_loans') - 1)
+
+# Batch sessions from the circulation desk. Both run inside the caller's
+# transaction with the touched rows locked, and move every counter with
+# one UPDATE per table however many items were scanned.
+
+def _per_row(counts):
+    return Case(*[When(pk=pk, then=Value(amount)) for pk, amount in counts.items()], default=Value(0))
+
+def return_batch(record_ids):
+    records = BorrowRecord.objects.select_for_update().select_related('book').in_bulk(record_ids)
+    results, returned, seen = [], [], set()
+    for pk in record_ids:
+        record = records.get(pk)
+        if record is None:
+            results.append({'record_id': pk, 'ok': False, 'error': "Unknown borrow record"})
+        elif record.returned or pk in seen:
+            results.append({'record_id': pk, 'ok': False, 'error': "Already returned"})
+        else:
+            seen.add(pk)
+            returned.append(record)
+            results.append({'record_id': pk, 'ok': True, 'isbn': record.book.isbn})
+    if not returned:
+        return results
+
+    now = timezone.now()
+    BorrowRecord.objects.filter(pk__in=seen).update(returned=True, returned_date=now)
+    for record in returned:
+        record.returned = True
+        record.returned_date = now
+    counts = Counter(record.book_id for record in returned)
+    # Never more copies back than are out
+    released = {
+        pk: min(counts[pk], total - available)
+        for pk, total, available in Book.objects.select_for_update().filter(pk__in=counts)
+        .values_list('pk', 'total_copies', 'available_copies')
+    }
+    Book.objects.filter(pk__in=released).update(available_copies=F('available_copies') + _per_row(released))
+    borrowers = Counter(record.borrower_id for record in returned if record.borrower_id)
+    if borrowers:
+        Borrower.objects.filter(pk__in=borrowers).update(
+            active_loans=Greatest(F('active_loans') - _per_row(borrowers), Value(0))
+        )
+    bulk_saved.send(sender=BorrowRecord, instances=returned, created=False)
+    copies_changed(released)
+    return results
+
+def checkout_batch(borrower, isbns, due_date):
+    borrower = Borrower.objects.select_for_update().get(pk=borrower.pk)
+    limit = borrower.loan_limit if borrower.loan_limit is not None else default_loan_limit(borrower.borrower_type)
+    room = max(limit - borrower.active_loans, 0)
+    books = Book.objects.select_for_update().in_bulk(set(isbns), field_name='isbn')
+    available = {book.pk: book.available_copies for book in books.values()}
+
+    results, records = [], []
+    for isbn in isbns:
+        book = books.get(isbn)
+        if book is None:
+            results.append({'isbn': isbn, 'ok': False, 'error': "Unknown ISBN"})
+        elif not room:
+            results.append({'isbn': isbn, 'ok': False, 'error': "Loan limit reached"})
+        elif not available[book.pk]:
+            results.append({'isbn': isbn, 'ok': False, 'error': "No available copies"})
+        else:
+            room -= 1
+            available[book.pk] -= 1
+            records.append(BorrowRecord(
+                book=book, borrower=borrower, borrower_name=borrower.name,
+                borrower_type=borrower.borrower_type, due_date=due_date,
+            ))
+            results.append({'isbn': isbn, 'ok': True})
+    if not records:
+        return results
+
+    BorrowRecord.objects.bulk_create(records)
+    created = iter(records)
+    for result in results:
+        if result['ok']:
+            result['record_id'] = next(created).pk
+    taken = Counter(record.book_id for record in records)
+    Book.objects.filter(pk__in=taken).update(available_copies=F('available_copies') - _per_row(taken))
+    Borrower.objects.filter(pk=borrower.pk).update(
+        active_loans=F('active_loans') + len(records), total_loans=F('total_loans') + len(records),
+    )
+    bulk_saved.send(sender=BorrowRecord, instances=records, created=True)
+    copies_changed({pk: -count for pk, count in taken.items()})
+    return results
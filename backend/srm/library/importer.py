@@ -0,0 +1,121 @@
+import csv
+from django.db import transaction
+from srm.signals import bulk_saved
+from .models import Book
+
+REQUIRED_COLUMNS = ('title', 'author', 'isbn', 'total_copies')
+CATEGORIES = {value for value, _label in Book.CATEGORIES}
+ISBN_MAX_LENGTH = Book._meta.get_field('isbn').max_length
+
+class ImportResult:
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.errors = []
+
+    def as_dict(self):
+        return {'rows': self.rows, 'created': self.created, 'updated': self.updated, 'errors': len(self.errors)}
+
+def clean_row(row):
+    """Validated Book field values for one CSV row, or raise ValueError."""
+    values = {column: (row.get(column) or '').strip() for column in ('title', 'author', 'isbn', 'category', 'total_copies')}
+    for column in ('title', 'author', 'isbn'):
+        if not values[column]:
+            raise ValueError(f"{column} is required")
+    if len(values['title']) > 255 or len(values['author']) > 255:
+        raise ValueError("title and author must be at most 255 characters")
+    if len(values['isbn']) > ISBN_MAX_LENGTH:
+        raise ValueError(f"isbn must be at most {ISBN_MAX_LENGTH} characters")
+    values['category'] = values['category'].lower() or 'general'
+    if values['category'] not in CATEGORIES:
+        raise ValueError(f"unknown category '{values['category']}'")
+    try:
+        values['total_copies'] = int(values['total_copies'])
+    except ValueError:
+        raise ValueError("total_copies must be a whole number")
+    if values['total_copies'] < 0:
+        raise ValueError("total_copies must not be negative")
+    return values
+
+def _upsert(chunk, result):
+    with transaction.atomic():
+        # Books already in the catalog keep their loans: available copies
+        # move by the change in total copies, never below zero. Locked so a
+        # checkout cannot slip in between this read and the upsert.
+        existing = {
+            isbn: (total, available)
+            for isbn, total, available in Book.objects.select_for_update()
+            .filter(isbn__in=[values['isbn'] for values in chunk])
+            .values_list('isbn', 'total_copies', 'available_copies')
+        }
+        books = []
+        for values in chunk:
+            if values['isbn'] in existing:
+                total, available = existing[values['isbn']]
+                values['available_copies'] = max(0, available + values['total_copies'] - total)
+            else:
+                # bulk_create() skips Book.save(), which would set this
+                values['available_copies'] = values['total_copies']
+            books.append(Book(**values))
+        Book.objects.bulk_create(
+            books,
+            update_conflicts=True,
+            unique_fields=['isbn'],
+            update_fields=['title', 'author', 'category', 'total_copies', 'available_copies'],
+        )
+        created = [book for book in books if book.isbn not in existing]
+        updated = [book for book in books if book.isbn in existing]
+        if created:
+            bulk_saved.send(sender=Book, instances=created, created=True)
+        if updated:
+            previous = {
+                book.pk: dict(zip(['total_copies', 'available_copies'], existing[book.isbn])) for book in updated
+            }
+            bulk_saved.send(sender=Book, instances=updated, created=False, previous=previous)
+    result.created += len(created)
+    result.updated += len(updated)
+
+def import_books(lines, batch_size=1000, on_progress=None):
+    """Stream a books CSV and upsert it on ``isbn`` in batches.
+
+    ``lines`` is any iterable of text lines with a header row. Invalid rows
+    and ISBNs repeated within the file are collected in ``result.errors``
+    as (line number, isbn, message) and skipped; everything else is written.
+    """
+    result = ImportResult()
+    reader = csv.DictReader(lines)
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or []]
+    missing = [column for column in REQUIRED_COLUMNS if column not in reader.fieldnames]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    seen = {}
+    chunk = []
+    for row in reader:
+        result.rows += 1
+        line = reader.line_num
+        try:
+            values = clean_row(row)
+            if values['isbn'] in seen:
+                raise ValueError(f"duplicate isbn, first seen on line {seen[values['isbn']]}")
+        except ValueError as error:
+            result.errors.append((line, (row.get('isbn') or '').strip(), str(error)))
+            continue
+        seen[values['isbn']] = line
+        chunk.append(values)
+        if len(chunk) >= batch_size:
+            _upsert(chunk, result)
+            chunk = []
+            if on_progress:
+                on_progress(result)
+    if chunk:
+        _upsert(chunk, result)
+    if on_progress:
+        on_progress(result)
+    return result
+
+def write_errors(errors, stream):
+    writer = csv.writer(stream)
+    writer.writerow(['line', 'isbn', 'error'])
+    writer.writerows(errors)
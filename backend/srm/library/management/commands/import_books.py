@@ -0,0 +1,38 @@
+import csv
+from django.core.management.base import BaseCommand, CommandError
+from library.importer import import_books, write_errors
+
+class Command(BaseCommand):
+    help = 'Import or update books from a CSV with title, author, isbn, category and total_copies columns'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help='Path to the CSV file')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per upsert batch')
+        parser.add_argument('--errors', help='Where to write rejected rows (default: <csv_file>.errors.csv)')
+
+    def handle(self, *args, **options):
+        imported = 0
+
+        def progress(result):
+            nonlocal imported
+            imported = result.created + result.updated
+            self.stdout.write(
+                f"{result.rows} rows read: {result.created} created, "
+                f"{result.updated} updated, {len(result.errors)} rejected"
+            )
+
+        try:
+            with open(options['csv_file'], newline='', encoding='utf-8-sig') as lines:
+                result = import_books(lines, options['batch_size'], progress)
+        except (OSError, csv.Error, ValueError) as error:
+            # Each batch commits on its own, so earlier batches stay imported
+            if imported:
+                raise CommandError(f"{error} ({imported} books from earlier batches were already imported)")
+            raise CommandError(str(error))
+
+        if result.errors:
+            path = options['errors'] or f"{options['csv_file']}.errors.csv"
+            with open(path, 'w', newline='', encoding='utf-8') as stream:
+                write_errors(result.errors, stream)
+            self.stdout.write(self.style.WARNING(f"{len(result.errors)} rows rejected, see {path}"))
+        self.stdout.write(self.style.SUCCESS(f"Imported {result.created + result.updated} books"))
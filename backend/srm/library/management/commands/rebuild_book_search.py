@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from library.models import Book
+from library.search import get_backend
+
+class Command(BaseCommand):
+    help = 'Rebuild the book search index from the library_book table'
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {type(backend).__name__} index for {Book.objects.count()} books"
+        ))
@@ -0,0 +1,26 @@
+import csv
+from django.core.management.base import BaseCommand
+from library.overdue import overdue_by_borrower, overdue_summary
+
+class Command(BaseCommand):
+    help = (
+        'Report overdue loans by age and per borrower; run daily. '
+        'Nothing is written to the loans: overdue is derived from due_date on every read.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--csv', help='Also write the per-borrower summary to this CSV file')
+
+    def handle(self, *args, **options):
+        summary = overdue_summary()
+        buckets = ', '.join(f"{label} days: {count}" for label, count in summary['buckets'].items())
+        self.stdout.write(f"Overdue now: {summary['count']} ({buckets})")
+
+        if options['csv']:
+            columns = ['borrower_id', 'name', 'type', 'overdue_loans', 'oldest_due_date']
+            with open(options['csv'], 'w', newline='', encoding='utf-8') as stream:
+                writer = csv.DictWriter(stream, fieldnames=columns)
+                writer.writeheader()
+                writer.writerows(overdue_by_borrower().iterator())
+            self.stdout.write(f"Per-borrower summary written to {options['csv']}")
+        self.stdout.write(self.style.SUCCESS('Overdue report complete'))
@@ -0,0 +1,57 @@
+# Generated by Django 5.1.7 on 2026-10-18 14:05
+
+from django.db import migrations
+from django.db.utils import OperationalError
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        try:
+            schema_editor.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS library_book_fts USING fts5("
+                "title, author, isbn, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            )
+        except OperationalError:
+            # SQLite built without FTS5: search falls back to the in-process index
+            return
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS library_book_fts_vocab USING fts5vocab(library_book_fts, 'row')"
+        )
+        schema_editor.execute(
+            "INSERT INTO library_book_fts (rowid, title, author, isbn) SELECT id, title, author, isbn FROM library_book"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS library_book_search_idx ON library_book "
+            "USING GIN (to_tsvector('simple', title || ' ' || author || ' ' || isbn))"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS library_book_title_trgm_idx ON library_book USING GIN (title gin_trgm_ops)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS library_book_author_trgm_idx ON library_book USING GIN (author gin_trgm_ops)"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS library_book_fts_vocab")
+        schema_editor.execute("DROP TABLE IF EXISTS library_book_fts")
+    elif vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS library_book_search_idx")
+        schema_editor.execute("DROP INDEX IF EXISTS library_book_title_trgm_idx")
+        schema_editor.execute("DROP INDEX IF EXISTS library_book_author_trgm_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
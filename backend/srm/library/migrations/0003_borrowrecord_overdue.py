@@ -0,0 +1,17 @@
+# Generated by Django 5.1.7 on 2026-10-18 13:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0002_book_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='borrowrecord',
+            index=models.Index(fields=['returned', 'due_date'], name='borrow_returned_due_idx'),
+        ),
+    ]
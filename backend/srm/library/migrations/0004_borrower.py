@@ -0,0 +1,43 @@
+# Generated by Django 5.1.7 on 2026-10-18 13:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0003_borrowrecord_overdue'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Borrower',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('normalized_name', models.CharField(editable=False, max_length=255)),
+                ('borrower_type', models.CharField(choices=[('student', 'Student'), ('teacher', 'Teacher')], max_length=20)),
+                ('loan_limit', models.PositiveIntegerField(blank=True, null=True)),
+                ('active_loans', models.PositiveIntegerField(default=0, editable=False)),
+                ('total_loans', models.PositiveIntegerField(default=0, editable=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='borrower', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='borrowrecord',
+            name='borrower',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='loans', to='library.borrower'),
+        ),
+        migrations.AddIndex(
+            model_name='borrowrecord',
+            index=models.Index(fields=['borrower', 'borrowed_date'], name='borrow_history_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='borrower',
+            constraint=models.UniqueConstraint(fields=('normalized_name', 'borrower_type'), name='unique_borrower'),
+        ),
+    ]
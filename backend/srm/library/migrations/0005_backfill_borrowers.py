@@ -0,0 +1,74 @@
+# Generated by Django 5.1.7 on 2026-10-18 13:35
+
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count, Q
+
+
+def normalize_name(name):
+    return ' '.join((name or '').split()).casefold()
+
+
+def backfill_borrowers(apps, schema_editor):
+    Borrower = apps.get_model('library', 'Borrower')
+    BorrowRecord = apps.get_model('library', 'BorrowRecord')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+
+    # Teachers are matched to their user account by username, then by full
+    # name, and only when exactly one unlinked teacher fits, as teacher_account() does
+    by_username, by_full_name = {}, {}
+    for pk, username, first_name, last_name in User.objects.filter(role='teacher').values_list(
+        'pk', 'username', 'first_name', 'last_name'
+    ):
+        by_username.setdefault(normalize_name(username), []).append(pk)
+        by_full_name.setdefault(normalize_name(f'{first_name} {last_name}'), []).append(pk)
+
+    linked_users = set()
+
+    def teacher_account(normalized_name):
+        for index in (by_username, by_full_name):
+            found = [pk for pk in index.get(normalized_name, ()) if pk not in linked_users]
+            if found:
+                return found[0] if len(found) == 1 else None
+        return None
+
+    borrowers = {}
+    raw_names = {}
+    for name, borrower_type in BorrowRecord.objects.values_list('borrower_name', 'borrower_type').distinct():
+        key = (normalize_name(name), borrower_type)
+        raw_names.setdefault(key, []).append(name)
+        if key in borrowers:
+            continue
+        user_id = teacher_account(key[0]) if borrower_type == 'teacher' else None
+        if user_id is not None:
+            linked_users.add(user_id)
+        borrowers[key] = Borrower(
+            name=' '.join(name.split()), normalized_name=key[0], borrower_type=borrower_type, user_id=user_id,
+        )
+    Borrower.objects.bulk_create(borrowers.values(), batch_size=500)
+
+    # One UPDATE per borrower links every spelling of their name
+    ids = {
+        (normalized_name, borrower_type): pk
+        for pk, normalized_name, borrower_type in Borrower.objects.values_list('pk', 'normalized_name', 'borrower_type')
+    }
+    for key, names in raw_names.items():
+        BorrowRecord.objects.filter(borrower_type=key[1], borrower_name__in=names).update(borrower_id=ids[key])
+
+    counts = BorrowRecord.objects.values('borrower').annotate(
+        total=Count('pk'), active=Count('pk', filter=Q(returned=False)),
+    )
+    for row in counts:
+        Borrower.objects.filter(pk=row['borrower']).update(total_loans=row['total'], active_loans=row['active'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0004_borrower'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_borrowers, migrations.RunPython.noop),
+    ]
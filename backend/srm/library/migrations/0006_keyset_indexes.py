@@ -0,0 +1,21 @@
+# Generated by Django 5.1.7 on 2026-10-18 13:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0005_backfill_borrowers'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['added_date', 'id'], name='book_added_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='borrowrecord',
+            index=models.Index(fields=['borrowed_date', 'id'], name='borrow_borrowed_idx'),
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 
 class Book(models.Model):
@@ -17,6 +18,11 @@ class Book(models.Model):
     available_copies = models.PositiveIntegerField()
     added_date = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['added_date', 'id'], name='book_added_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.pk:  # New book being added
             self.available_copies = self.total_copies
@@ -25,17 +31,53 @@ class Book(models.Model):
     def __str__(self):
         return f"{self.title} by {self.author}"
 
+def normalize_name(name):
+    return ' '.join((name or '').split()).casefold()
+
+class Borrower(models.Model):
+    BORROWER_TYPES = (
+        ('student', 'Student'),
+        ('teacher', 'Teacher'),
+    )
+    name = models.CharField(max_length=255)
+    normalized_name = models.CharField(max_length=255, editable=False)
+    borrower_type = models.CharField(max_length=20, choices=BORROWER_TYPES)
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='borrower'
+    )
+    loan_limit = models.PositiveIntegerField(null=True, blank=True)
+    active_loans = models.PositiveIntegerField(default=0, editable=False)
+    total_loans = models.PositiveIntegerField(default=0, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['normalized_name', 'borrower_type'], name='unique_borrower'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.normalized_name = normalize_name(self.name)
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.name} ({self.borrower_type})"
+
 class BorrowRecord(models.Model):
     book = models.ForeignKey(Book, on_delete=models.CASCADE)
+    borrower = models.ForeignKey(Borrower, on_delete=models.PROTECT, null=True, blank=True, related_name='loans')
     borrower_name = models.CharField(max_length=255)
-    borrower_type = models.CharField(max_length=20, choices=(
-        ('student', 'Student'),
-        ('teacher', 'Teacher'),
-    ))
+    borrower_type = models.CharField(max_length=20, choices=Borrower.BORROWER_TYPES)
     borrowed_date = models.DateTimeField(auto_now_add=True)
     due_date = models.DateField()
     returned = models.BooleanField(default=False)
     returned_date = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['returned', 'due_date'], name='borrow_returned_due_idx'),
+            models.Index(fields=['borrower', 'borrowed_date'], name='borrow_history_idx'),
+            models.Index(fields=['borrowed_date', 'id'], name='borrow_borrowed_idx'),
+        ]
+
     def __str__(self):
         return f"{self.book.title} borrowed by {self.borrower_name}"
\ No newline at end of file
@@ -0,0 +1,53 @@
+from datetime import timedelta
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+from .models import BorrowRecord
+
+# (label, fewest days overdue, most days overdue or None)
+AGING_BUCKETS = (
+    ('1-7', 1, 7),
+    ('8-14', 8, 14),
+    ('15-30', 15, 30),
+    ('31+', 31, None),
+)
+
+def overdue_loans(today=None):
+    """Open loans past their due date; a range scan on (returned, due_date)."""
+    today = today or timezone.localdate()
+    return BorrowRecord.objects.filter(returned=False, due_date__lt=today)
+
+def _bucket_filter(today, low, high):
+    condition = Q(due_date__lte=today - timedelta(days=low))
+    if high is not None:
+        condition &= Q(due_date__gte=today - timedelta(days=high))
+    return condition
+
+def overdue_summary(today=None):
+    """Total overdue loans and their aging buckets in one query."""
+    today = today or timezone.localdate()
+    aggregates = {'total': Count('pk')}
+    for label, low, high in AGING_BUCKETS:
+        aggregates[label] = Count('pk', filter=_bucket_filter(today, low, high))
+    counts = overdue_loans(today).aggregate(**aggregates)
+    return {
+        'count': counts.pop('total'),
+        'buckets': counts,
+    }
+
+def overdue_by_borrower(today=None):
+    """Per-borrower overdue counts, grouped in the database on borrower_id.
+
+    Loans not linked to a borrower come back together under borrower_id None.
+    """
+    today = today or timezone.localdate()
+    return (
+        overdue_loans(today)
+        .values('borrower_id')
+        .annotate(
+            name=F('borrower__name'),
+            type=F('borrower__borrower_type'),
+            overdue_loans=Count('pk'),
+            oldest_due_date=Min('due_date'),
+        )
+        .order_by('oldest_due_date', 'borrower_id')
+    )
@@ -0,0 +1,235 @@
+import bisect
+import difflib
+import math
+import re
+import threading
+import unicodedata
+from django.conf import settings
+from django.db import connection
+from .models import Book
+
+SEARCH_FIELDS = ('title', 'author', 'isbn')
+FIELD_WEIGHTS = {'title': 10.0, 'author': 5.0, 'isbn': 1.0}
+FTS_TABLE = 'library_book_fts'
+FTS_VOCAB_TABLE = 'library_book_fts_vocab'
+SEARCH_VECTOR_SQL = "to_tsvector('simple', title || ' ' || author || ' ' || isbn)"
+
+def tokenize(text):
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return re.findall(r'\w+', text.lower())
+
+def _close_matches(token, vocabulary, limit=3):
+    return difflib.get_close_matches(token, vocabulary, n=limit, cutoff=0.75)
+
+
+class SQLiteFTSBackend:
+    """FTS5 virtual table keyed by the book id, ranked with bm25()."""
+
+    def index(self, books):
+        rows = [(book.pk, book.title, book.author, book.isbn) for book in books]
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(row[0],) for row in rows])
+            cursor.executemany(f"INSERT INTO {FTS_TABLE} (rowid, title, author, isbn) VALUES (%s, %s, %s, %s)", rows)
+
+    def remove(self, ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(pk,) for pk in ids])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(f"INSERT INTO {FTS_TABLE} (rowid, title, author, isbn) SELECT id, title, author, isbn FROM library_book")
+
+    def _match(self, expression, limit):
+        weights = ', '.join(str(FIELD_WEIGHTS[field]) for field in SEARCH_FIELDS)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, -bm25({FTS_TABLE}, {weights}) AS score FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s ORDER BY score DESC LIMIT %s",
+                [expression, limit],
+            )
+            return cursor.fetchall()
+
+    def _corrections(self, token):
+        upper = token[0] + '\U0010ffff'
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT term FROM {FTS_VOCAB_TABLE} WHERE term >= %s AND term < %s", [token[0], upper])
+            return _close_matches(token, [row[0] for row in cursor.fetchall()])
+
+    def search(self, query, limit):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        # Every token as a prefix: "dun herb" finds "Dune" by "Frank Herbert"
+        results = self._match(' '.join(f'"{token}"*' for token in tokens), limit)
+        if results:
+            return results
+        # Nothing matched, so retry each token with its closest indexed spellings
+        groups = []
+        for token in tokens:
+            alternatives = [token] + self._corrections(token)
+            groups.append('(' + ' OR '.join(f'"{term}"' for term in alternatives) + ')')
+        return self._match(' '.join(groups), limit)
+
+
+class PostgresSearchBackend:
+    """tsvector and trigram expression indexes; PostgreSQL keeps them in sync."""
+
+    def index(self, books):
+        pass
+
+    def remove(self, ids):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def search(self, query, limit):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        tsquery = ' & '.join(f'{token}:*' for token in tokens)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT id, ts_rank({SEARCH_VECTOR_SQL}, q) * 2 "
+                f"+ GREATEST(similarity(title, %s), similarity(author, %s)) AS score "
+                f"FROM library_book, to_tsquery('simple', %s) q "
+                f"WHERE {SEARCH_VECTOR_SQL} @@ q OR title %% %s OR author %% %s "
+                f"ORDER BY score DESC LIMIT %s",
+                [query, query, tsquery, query, query, limit],
+            )
+            return cursor.fetchall()
+
+
+class InvertedIndex:
+    """In-process index for backends without native full-text search and
+    for tests. It is loaded from the database on first use."""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.loaded = False
+        self.postings = {}
+        self.documents = {}
+        self.terms = []
+
+    def _add(self, pk, values):
+        self.documents[pk] = []
+        for field, value in zip(SEARCH_FIELDS, values):
+            for token in tokenize(value):
+                postings = self.postings.setdefault(token, {})
+                if not postings:
+                    bisect.insort(self.terms, token)
+                postings[pk] = postings.get(pk, 0.0) + FIELD_WEIGHTS[field]
+                self.documents[pk].append(token)
+
+    def _remove(self, pk):
+        for token in set(self.documents.pop(pk, [])):
+            postings = self.postings[token]
+            postings.pop(pk, None)
+            if not postings:
+                del self.postings[token]
+                self.terms.pop(bisect.bisect_left(self.terms, token))
+
+    def _ensure_loaded(self):
+        if not self.loaded:
+            self.rebuild()
+
+    def index(self, books):
+        with self.lock:
+            if not self.loaded:
+                return
+            for book in books:
+                self._remove(book.pk)
+                self._add(book.pk, [getattr(book, field) for field in SEARCH_FIELDS])
+
+    def remove(self, ids):
+        with self.lock:
+            for pk in ids:
+                self._remove(pk)
+
+    def rebuild(self):
+        with self.lock:
+            self.postings, self.documents, self.terms = {}, {}, []
+            for pk, *values in Book.objects.values_list('pk', *SEARCH_FIELDS).iterator():
+                self._add(pk, values)
+            self.loaded = True
+
+    def _range(self, prefix):
+        start = bisect.bisect_left(self.terms, prefix)
+        end = bisect.bisect_left(self.terms, prefix + '\U0010ffff')
+        return self.terms[start:end]
+
+    def _expand(self, token):
+        matches = self._range(token)
+        if matches:
+            return matches, 1.0
+        # Like the FTS5 backend, only correct within the same first letter
+        return _close_matches(token, self._range(token[0])), 0.5
+
+    def search(self, query, limit):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        with self.lock:
+            self._ensure_loaded()
+            total = len(self.documents) or 1
+            scores = None
+            for token in tokens:
+                token_scores = {}
+                terms, factor = self._expand(token)
+                for term in terms:
+                    postings = self.postings[term]
+                    idf = math.log(1 + total / len(postings))
+                    exact = 1.0 if term == token else 0.8
+                    for pk, weight in postings.items():
+                        token_scores[pk] = max(token_scores.get(pk, 0.0), weight * idf * exact * factor)
+                # Every token has to match, as with the FTS backends
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {pk: score + token_scores[pk] for pk, score in scores.items() if pk in token_scores}
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+            return ranked[:limit]
+
+
+_backend = None
+_memory_index = InvertedIndex()
+
+def _fts_available():
+    return FTS_TABLE in connection.introspection.table_names()
+
+def get_backend():
+    """The search backend for the default database.
+
+    ``LIBRARY_SEARCH_BACKEND`` may force 'fts5', 'postgres' or 'memory';
+    otherwise FTS5 is used on SQLite, tsvector/trigram on PostgreSQL and
+    the in-process index everywhere else.
+    """
+    global _backend
+    if _backend is None:
+        choice = getattr(settings, 'LIBRARY_SEARCH_BACKEND', None)
+        if choice is None:
+            if connection.vendor == 'sqlite' and _fts_available():
+                choice = 'fts5'
+            elif connection.vendor == 'postgresql':
+                choice = 'postgres'
+            else:
+                choice = 'memory'
+        _backend = {
+            'fts5': SQLiteFTSBackend,
+            'postgres': PostgresSearchBackend,
+            'memory': lambda: _memory_index,
+        }[choice]()
+    return _backend
+
+def reset_backend():
+    global _backend
+    _backend = None
+    _memory_index.loaded = False
+
+def search_books(query, limit=20):
+    """Books matching ``query`` in relevance order."""
+    ranked = get_backend().search(query, limit)
+    books = Book.objects.in_bulk([pk for pk, _score in ranked])
+    return [books[pk] for pk, _score in ranked if pk in books]
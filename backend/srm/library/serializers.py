@@ -1,14 +1,75 @@
 from rest_framework import serializers
-from .models import Book, BorrowRecord
+from srm.fieldsets import SparseFieldsetSerializerMixin
+from .models import Book, Borrower, BorrowRecord, normalize_name
 
 class BookSerializer(serializers.ModelSerializer):
     class Meta:
         model = Book
         fields = '__all__'
 
-class BorrowRecordSerializer(serializers.ModelSerializer):
+class BorrowerSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Borrower
+        fields = '__all__'
+        read_only_fields = ['created_at']
+
+    def validate(self, attrs):
+        # normalized_name is not editable, so DRF adds no validator for unique_borrower
+        name = attrs.get('name', getattr(self.instance, 'name', ''))
+        borrower_type = attrs.get('borrower_type', getattr(self.instance, 'borrower_type', None))
+        clashes = Borrower.objects.filter(normalized_name=normalize_name(name), borrower_type=borrower_type)
+        if self.instance is not None:
+            clashes = clashes.exclude(pk=self.instance.pk)
+        if clashes.exists():
+            raise serializers.ValidationError({'name': f"A {borrower_type} borrower with this name already exists"})
+        return attrs
+
+class BorrowRecordSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     book = BookSerializer(read_only=True)
+    book_id = serializers.PrimaryKeyRelatedField(queryset=Book.objects.all(), source='book', write_only=True)
+    borrower_id = serializers.PrimaryKeyRelatedField(
+        queryset=Borrower.objects.all(), source='borrower', write_only=True, required=False
+    )
     
     class Meta:
         model = BorrowRecord
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+        read_only_fields = ['borrower', 'returned', 'returned_date']
+        extra_kwargs = {
+            'borrower_name': {'required': False},
+            'borrower_type': {'required': False},
+        }
+
+    def validate(self, attrs):
+        if 'borrower' in attrs:
+            attrs['borrower_name'] = attrs['borrower'].name
+            attrs['borrower_type'] = attrs['borrower'].borrower_type
+        elif not self.instance and not (attrs.get('borrower_name') and attrs.get('borrower_type')):
+            raise serializers.ValidationError("Give borrower_id or borrower_name and borrower_type")
+        return attrs
+
+class BookSearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=200)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+class CirculationBatchSerializer(serializers.Serializer):
+    borrower_id = serializers.PrimaryKeyRelatedField(queryset=Borrower.objects.all(), source='borrower', required=False)
+    borrower_name = serializers.CharField(max_length=255, required=False)
+    borrower_type = serializers.ChoiceField(choices=Borrower.BORROWER_TYPES, required=False)
+    due_date = serializers.DateField(required=False)
+    checkout = serializers.ListField(child=serializers.CharField(max_length=20), required=False, default=list)
+    returns = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+
+    MAX_ITEMS = 200
+
+    def validate(self, attrs):
+        if not attrs['checkout'] and not attrs['returns']:
+            raise serializers.ValidationError("Nothing to check out or return")
+        if len(attrs['checkout']) + len(attrs['returns']) > self.MAX_ITEMS:
+            raise serializers.ValidationError(f"At most {self.MAX_ITEMS} items per session")
+        if attrs['checkout']:
+            if 'due_date' not in attrs:
+                raise serializers.ValidationError({'due_date': "Required for checkouts"})
+            if 'borrower' not in attrs and not (attrs.get('borrower_name') and attrs.get('borrower_type')):
+                raise serializers.ValidationError("Give borrower_id or borrower_name and borrower_type")
+        return attrs
@@ -0,0 +1,30 @@
+from django.db.models.signals import post_save, post_delete
+from srm.signals import bulk_saved
+from .circulation import release_loan
+from .models import Book, BorrowRecord
+from .search import SEARCH_FIELDS, get_backend
+
+def _touches_search_fields(update_fields):
+    return update_fields is None or not set(SEARCH_FIELDS).isdisjoint(update_fields)
+
+def _index_book(sender, instance, update_fields=None, **kwargs):
+    if _touches_search_fields(update_fields):
+        get_backend().index([instance])
+
+def _unindex_book(sender, instance, **kwargs):
+    get_backend().remove([instance.pk])
+
+def _index_books(sender, instances=(), update_fields=None, **kwargs):
+    if sender is Book and _touches_search_fields(update_fields):
+        get_backend().index(instances)
+
+def _release_deleted_loan(sender, instance, **kwargs):
+    # A loan deleted before it was returned, say with its book, stops counting
+    if not instance.returned:
+        release_loan(instance.borrower_id)
+
+def connect_signals():
+    post_save.connect(_index_book, sender=Book, dispatch_uid='book_search_save')
+    post_delete.connect(_unindex_book, sender=Book, dispatch_uid='book_search_delete')
+    bulk_saved.connect(_index_books, dispatch_uid='book_search_bulk_saved')
+    post_delete.connect(_release_deleted_loan, sender=BorrowRecord, dispatch_uid='borrow_record_delete')
@@ -1,3 +1,363 @@
-from django.test import TestCase
+import csv
+import tempfile
+import threading
+import time
+from unittest import skipUnless
+from datetime import date, timedelta
+from io import StringIO
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+from users.models import User
+from .models import Book, Borrower, BorrowRecord
+from .importer import import_books
+from .overdue import overdue_summary
+from .search import reset_backend, search_books
 
-# Create your tests here.
+
+class ConcurrentCirculationTests(TransactionTestCase):
+    copies = 10
+    borrowers = 40
+
+    def setUp(self):
+        self.user = User.objects.create(username='librarian', role='librarian')
+        self.book = Book.objects.create(
+            title='Dune', author='Frank Herbert', isbn='9780441013593',
+            category='fiction', total_copies=self.copies, available_copies=self.copies,
+        )
+
+    def run_in_parallel(self, count, request):
+        barrier = threading.Barrier(count)
+        statuses = []
+        lock = threading.Lock()
+
+        def worker(index):
+            client = APIClient()
+            client.force_authenticate(self.user)
+            barrier.wait()
+            try:
+                response = request(client, index)
+                with lock:
+                    statuses.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return statuses, time.perf_counter() - started
+
+    def borrow(self, client, index):
+        return client.post('/api/library/borrows/', {
+            'book_id': self.book.pk,
+            'borrower_name': f'Student {index}',
+            'borrower_type': 'student',
+            'due_date': (date.today() + timedelta(days=14)).isoformat(),
+        }, format='json')
+
+    def test_parallel_borrows_never_oversell(self):
+        statuses, elapsed = self.run_in_parallel(self.borrowers, self.borrow)
+
+        self.book.refresh_from_db()
+        self.assertEqual(statuses.count(201), self.copies)
+        self.assertEqual(statuses.count(400), self.borrowers - self.copies)
+        self.assertEqual(self.book.available_copies, 0)
+        self.assertEqual(BorrowRecord.objects.filter(book=self.book, returned=False).count(), self.copies)
+        self.assertGreater(self.borrowers / elapsed, 5, f"{self.borrowers} borrows took {elapsed:.2f}s")
+
+    def test_parallel_returns_release_each_copy_once(self):
+        self.run_in_parallel(self.copies, self.borrow)
+        records = list(BorrowRecord.objects.values_list('pk', flat=True))
+
+        # Every record is returned twice at the same time
+        statuses, _elapsed = self.run_in_parallel(
+            len(records) * 2,
+            lambda client, index: client.patch(f'/api/library/borrows/{records[index % len(records)]}/return/'),
+        )
+
+        self.book.refresh_from_db()
+        self.assertEqual(statuses.count(200), len(records))
+        self.assertEqual(statuses.count(400), len(records))
+        self.assertEqual(self.book.available_copies, self.copies)
+        self.assertFalse(BorrowRecord.objects.filter(returned=False).exists())
+
+
+class BorrowerTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='librarian', role='librarian'))
+        self.book = Book.objects.create(
+            title='Dune', author='Frank Herbert', isbn='9780441013593',
+            category='fiction', total_copies=10, available_copies=10,
+        )
+
+    def borrow(self, **borrower):
+        return self.client.post('/api/library/borrows/', {
+            'book_id': self.book.pk, 'due_date': date.today() + timedelta(days=14), **borrower,
+        }, format='json')
+
+    def test_spellings_share_one_borrower(self):
+        self.borrow(borrower_name='Jane Doe', borrower_type='student')
+        self.borrow(borrower_name='  jane   DOE ', borrower_type='student')
+
+        borrower = Borrower.objects.get()
+        self.assertEqual((borrower.active_loans, borrower.total_loans), (2, 2))
+        self.assertEqual(borrower.loans.count(), 2)
+
+    def test_loan_limit_enforced_and_released(self):
+        borrower = Borrower.objects.create(name='Jane Doe', borrower_type='student', loan_limit=1)
+        first = self.borrow(borrower_id=borrower.pk)
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(self.borrow(borrower_id=borrower.pk).status_code, 400)
+
+        self.client.patch(f"/api/library/borrows/{first.data['id']}/return/")
+        self.assertEqual(self.borrow(borrower_id=borrower.pk).status_code, 201)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.available_copies, 9)
+
+    def test_rename_onto_another_borrower_is_rejected(self):
+        Borrower.objects.create(name='Jane Doe', borrower_type='student')
+        other = Borrower.objects.create(name='John Doe', borrower_type='student')
+
+        response = self.client.patch(f'/api/library/borrowers/{other.pk}/', {'name': ' jane  doe'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('name', response.data)
+        response = self.client.patch(f'/api/library/borrowers/{other.pk}/', {'name': 'John  DOE'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.patch(f'/api/library/borrowers/{other.pk}/', {'borrower_type': 'teacher'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post('/api/library/borrowers/', {'name': 'JANE DOE', 'borrower_type': 'student'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_teachers_are_linked_to_their_account_at_checkout(self):
+        teacher = User.objects.create(username='mrsmith', first_name='Alan', last_name='Smith', role='teacher')
+        User.objects.create(username='asmith', first_name='Ann', last_name='Smith', role='teacher')
+
+        self.borrow(borrower_name='Alan  Smith', borrower_type='teacher')
+        self.borrow(borrower_name='mrsmith', borrower_type='teacher')
+        self.assertEqual(Borrower.objects.get(normalized_name='alan smith').user, teacher)
+        # The account is already linked to the first borrower
+        self.assertIsNone(Borrower.objects.get(normalized_name='mrsmith').user)
+        self.borrow(borrower_name='Alan Smith', borrower_type='student')
+        self.assertIsNone(Borrower.objects.get(borrower_type='student').user)
+
+    def test_deleting_an_open_loan_releases_it(self):
+        borrower = Borrower.objects.create(name='Jane Doe', borrower_type='student')
+        first = self.borrow(borrower_id=borrower.pk).data
+        self.borrow(borrower_id=borrower.pk)
+        self.client.patch(f"/api/library/borrows/{first['id']}/return/")
+
+        self.book.delete()
+        borrower.refresh_from_db()
+        self.assertEqual((borrower.active_loans, borrower.total_loans), (0, 2))
+
+    def test_history(self):
+        borrower = Borrower.objects.create(name='Jane Doe', borrower_type='student')
+        for _ in range(3):
+            self.borrow(borrower_id=borrower.pk)
+
+        response = self.client.get(f'/api/library/borrowers/{borrower.pk}/history/?page_size=2')
+        self.assertEqual(response.data['borrower']['active_loans'], 3)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+
+class CirculationBatchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='librarian', role='librarian'))
+        self.books = [
+            Book.objects.create(
+                title=f'Book {i}', author='Author', isbn=f'isbn-{i}',
+                category='fiction', total_copies=1, available_copies=1,
+            )
+            for i in range(3)
+        ]
+
+    def session(self, **data):
+        return self.client.post('/api/library/circulation/batch/', data, format='json')
+
+    def test_checkout_and_return_in_one_session(self):
+        response = self.session(
+            borrower_name='Jane Doe', borrower_type='student', due_date=date.today() + timedelta(days=14),
+            checkout=['isbn-0', 'isbn-0', 'isbn-1', 'missing'],
+        )
+        self.assertEqual([item['ok'] for item in response.data['checkout']], [True, False, True, False])
+        borrower = Borrower.objects.get(pk=response.data['borrower_id'])
+        self.assertEqual(borrower.active_loans, 2)
+
+        records = [item['record_id'] for item in response.data['checkout'] if item['ok']]
+        response = self.session(
+            borrower_id=borrower.pk, due_date=date.today() + timedelta(days=14),
+            returns=records, checkout=['isbn-2'],
+        )
+        self.assertTrue(all(item['ok'] for item in response.data['returns'] + response.data['checkout']))
+        borrower.refresh_from_db()
+        self.assertEqual((borrower.active_loans, borrower.total_loans), (1, 3))
+        self.assertEqual(
+            list(Book.objects.order_by('isbn').values_list('available_copies', flat=True)), [1, 1, 0],
+        )
+
+
+class BookImportTests(TestCase):
+    HEADER = 'Title,Author,ISBN,Category,Total_Copies\n'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='librarian', role='librarian'))
+        self.dune = Book.objects.create(
+            title='Dune', author='Herbert', isbn='isbn-1', category='fiction', total_copies=3,
+        )
+        Book.objects.filter(pk=self.dune.pk).update(available_copies=1)
+
+    def upload(self, content):
+        upload = SimpleUploadedFile('books.csv', content.encode(), content_type='text/csv')
+        return self.client.post('/api/library/books/import/', {'file': upload}, format='multipart')
+
+    def test_upsert_keeps_loans_and_reports_bad_rows(self):
+        result = import_books(StringIO(self.HEADER + (
+            'Dune Messiah,Herbert,isbn-1,,5\n'
+            'Emma,Austen,isbn-2,fiction,2\n'
+            'Emma again,Austen,isbn-2,fiction,2\n'
+            ',Nobody,isbn-3,fiction,1\n'
+            'Odd,Someone,isbn-4,poetry,1\n'
+            'Few,Someone,isbn-5,fiction,-1\n'
+        )), batch_size=1)
+
+        self.assertEqual(result.as_dict(), {'rows': 6, 'created': 1, 'updated': 1, 'errors': 4})
+        self.assertEqual([line for line, _isbn, _message in result.errors], [4, 5, 6, 7])
+        self.assertIn('first seen on line 3', result.errors[0][2])
+        self.dune.refresh_from_db()
+        # Two copies are still out on loan
+        self.assertEqual((self.dune.title, self.dune.category, self.dune.total_copies, self.dune.available_copies),
+                         ('Dune Messiah', 'general', 5, 3))
+        self.assertEqual(Book.objects.get(isbn='isbn-2').available_copies, 2)
+
+    def test_missing_columns(self):
+        with self.assertRaisesMessage(ValueError, 'Missing columns: isbn'):
+            import_books(StringIO('title,author,total_copies\n'))
+
+    def test_endpoint_imports_for_librarians_only(self):
+        self.client.force_authenticate(User.objects.create(username='teacher', role='teacher'))
+        response = self.upload(self.HEADER + 'Emma,Austen,isbn-2,fiction,2\n')
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Book.objects.filter(isbn='isbn-2').exists())
+
+        self.client.force_authenticate(User.objects.create(username='admin', role='admin'))
+        response = self.upload(self.HEADER + 'Emma,Austen,isbn-2,fiction,2\nBad,Row,isbn-3,fiction,x\n')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['error_rows'], [
+            {'line': 3, 'isbn': 'isbn-3', 'error': 'total_copies must be a whole number'},
+        ])
+
+    def test_unreadable_file_imports_nothing(self):
+        # Past the first batch, so a half import would have committed rows
+        rows = ''.join(f'Book {i},Author,new-{i},fiction,1\n' for i in range(1001))
+        response = self.upload(self.HEADER + rows + 'Dune 2,Herbert,isbn-1,fiction,"' + 'x' * 200_000 + '"\n')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('field larger than field limit', response.data['detail'])
+        self.assertEqual(list(Book.objects.values_list('isbn', flat=True)), ['isbn-1'])
+
+
+class OverdueTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='librarian', role='librarian'))
+        self.today = date.today()
+        book = Book.objects.create(title='Dune', author='Herbert', isbn='isbn-1', category='fiction', total_copies=20)
+        self.borrowers = {
+            name: Borrower.objects.create(name=name, borrower_type='student') for name in ('Ana', 'Ben', 'Cy', 'Dee')
+        }
+        # The oldest loan was recorded under Cy's old name; it still belongs to the same borrower
+        loans = [
+            ('Ana', 'Ana', 1), ('Ana', 'Ana', 7), ('Ben', 'Ben', 8), ('Ben', 'Ben', 14), ('Ben', 'Ben', 15),
+            ('Cy', 'Cy', 30), ('Cy', 'Cyrus', 31), ('Cy', 'Cy', 0),
+        ]
+        for borrower, name, days_late in loans:
+            BorrowRecord.objects.create(
+                book=book, borrower=self.borrowers[borrower], borrower_name=name, borrower_type='student',
+                due_date=self.today - timedelta(days=days_late),
+            )
+        BorrowRecord.objects.create(
+            book=book, borrower=self.borrowers['Dee'], borrower_name='Dee', borrower_type='student',
+            due_date=self.today - timedelta(days=40), returned=True,
+        )
+
+    def test_buckets_count_open_loans_by_days_overdue(self):
+        self.assertEqual(overdue_summary(self.today), {
+            'count': 7, 'buckets': {'1-7': 2, '8-14': 2, '15-30': 2, '31+': 1},
+        })
+        # A day later the loan due today is overdue and the others age a day
+        self.assertEqual(overdue_summary(self.today + timedelta(days=1))['buckets'], {
+            '1-7': 2, '8-14': 2, '15-30': 2, '31+': 2,
+        })
+
+    def test_overdue_endpoints(self):
+        response = self.client.get('/api/library/borrows/overdue/', {'page_size': 3})
+        self.assertEqual(response.data['count'], 7)
+        self.assertEqual(response.data['buckets']['31+'], 1)
+        self.assertEqual([row['borrower_name'] for row in response.data['results']], ['Cyrus', 'Cy', 'Ben'])
+
+        response = self.client.get('/api/library/borrows/overdue/borrowers/')
+        self.assertEqual(
+            [(row['borrower_id'], row['name'], row['overdue_loans']) for row in response.data],
+            [(self.borrowers['Cy'].pk, 'Cy', 2), (self.borrowers['Ben'].pk, 'Ben', 3), (self.borrowers['Ana'].pk, 'Ana', 2)],
+        )
+
+    def test_report_counts_buckets_and_writes_borrowers(self):
+        stdout = StringIO()
+        with tempfile.NamedTemporaryFile('r', suffix='.csv') as output:
+            call_command('report_overdue_loans', csv=output.name, stdout=stdout)
+            rows = list(csv.DictReader(output))
+        self.assertIn('Overdue now: 7 (1-7 days: 2, 8-14 days: 2, 15-30 days: 2, 31+ days: 1)', stdout.getvalue())
+        self.assertEqual(rows[0], {
+            'borrower_id': str(self.borrowers['Cy'].pk), 'name': 'Cy', 'type': 'student', 'overdue_loans': '2',
+            'oldest_due_date': str(self.today - timedelta(days=31)),
+        })
+        self.assertEqual(len(rows), 3)
+
+
+class BookSearchTests(TestCase):
+    def setUp(self):
+        reset_backend()
+        self.addCleanup(reset_backend)
+        self.dune = Book.objects.create(
+            title='Dune', author='Frank Herbert', isbn='9780441013593',
+            category='fiction', total_copies=1, available_copies=1,
+        )
+        self.children = Book.objects.create(
+            title='Children of Dune', author='Frank Herbert', isbn='9780441104024',
+            category='fiction', total_copies=1, available_copies=1,
+        )
+        self.herbs = Book.objects.create(
+            title='Herbs of the World', author='Ann Dunes', isbn='9781111111111',
+            category='science', total_copies=1, available_copies=1,
+        )
+
+    def assert_search_behaviour(self):
+        self.assertEqual(search_books('dune')[0], self.dune)
+        self.assertEqual(search_books('herb')[0], self.herbs)
+        self.assertEqual(set(search_books('frank dun')), {self.dune, self.children})
+        self.assertEqual(set(search_books('herbrt')), {self.dune, self.children})
+        self.assertEqual(search_books('9780441013593'), [self.dune])
+
+        self.herbs.title = 'Spices'
+        self.herbs.save()
+        self.assertEqual(search_books('spices'), [self.herbs])
+        self.herbs.delete()
+        self.assertEqual(search_books('spices'), [])
+
+    @skipUnless(connection.vendor == 'sqlite', 'FTS5 backend is SQLite only')
+    def test_sqlite_fts5(self):
+        self.assert_search_behaviour()
+
+    @override_settings(LIBRARY_SEARCH_BACKEND='memory')
+    def test_in_process_index(self):
+        reset_backend()
+        self.assert_search_behaviour()
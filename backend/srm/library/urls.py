@@ -1,16 +1,32 @@
 from django.urls import path
 from .views import (
     BookListCreateView,
+    BookSearchView,
+    BookImportView,
     BookRetrieveUpdateDestroyView,
+    BorrowerListCreateView,
+    BorrowerRetrieveUpdateView,
+    BorrowerHistoryView,
     BorrowRecordListCreateView,
     ReturnBookView,
-    ActiveBorrowsView
+    CirculationBatchView,
+    ActiveBorrowsView,
+    OverdueBorrowsView,
+    OverdueBorrowersView
 )
 
 urlpatterns = [
     path('books/', BookListCreateView.as_view(), name='book-list'),
+    path('books/search/', BookSearchView.as_view(), name='book-search'),
+    path('books/import/', BookImportView.as_view(), name='book-import'),
     path('books/<int:pk>/', BookRetrieveUpdateDestroyView.as_view(), name='book-detail'),
+    path('borrowers/', BorrowerListCreateView.as_view(), name='borrower-list'),
+    path('borrowers/<int:pk>/', BorrowerRetrieveUpdateView.as_view(), name='borrower-detail'),
+    path('borrowers/<int:pk>/history/', BorrowerHistoryView.as_view(), name='borrower-history'),
     path('borrows/', BorrowRecordListCreateView.as_view(), name='borrow-list'),
     path('borrows/<int:pk>/return/', ReturnBookView.as_view(), name='return-book'),
+    path('circulation/batch/', CirculationBatchView.as_view(), name='circulation-batch'),
     path('borrows/active/', ActiveBorrowsView.as_view(), name='active-borrows'),
+    path('borrows/overdue/', OverdueBorrowsView.as_view(), name='overdue-borrows'),
+    path('borrows/overdue/borrowers/', OverdueBorrowersView.as_view(), name='overdue-borrowers'),
 ]
\ No newline at end of file
@@ -1,61 +1,217 @@
+import csv
+import io
+from django.db import transaction
 from rest_framework import generics, permissions, serializers
-from .models import Book, BorrowRecord
-from .serializers import BookSerializer, BorrowRecordSerializer
+from rest_framework.parsers import MultiPartParser
+from srm.cache import CachedResponseMixin
+from srm.export import ExportMixin
+from srm.fastpath import FastListMixin
+from srm.fieldsets import SparseFieldsetMixin
+from srm.signals import bulk_saved
+from .models import Book, Borrower, BorrowRecord, normalize_name
+from .serializers import (
+    BookSerializer, BorrowerSerializer, BorrowRecordSerializer, BookSearchQuerySerializer,
+    CirculationBatchSerializer,
+)
+from .search import search_books
+from .importer import import_books
+from .overdue import overdue_loans, overdue_summary, overdue_by_borrower
+from .circulation import (
+    take_copy, release_copy, mark_returned, copies_changed, resolve_borrower, reserve_loan, release_loan,
+    return_batch, checkout_batch,
+)
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.response import Response
 from rest_framework import status
-from django.utils import timezone
 
-class BookListCreateView(generics.ListCreateAPIView):
+class BookListCreateView(ExportMixin, CachedResponseMixin, FastListMixin, generics.ListCreateAPIView):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cache_models = (Book,)
+    keyset_ordering = ('-added_date', '-id')
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['category']
 
+class BookSearchView(generics.GenericAPIView):
+    serializer_class = BookSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        params = BookSearchQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        books = search_books(params.validated_data['q'], params.validated_data['limit'])
+        return Response(self.get_serializer(books, many=True).data)
+
+class BookImportView(generics.GenericAPIView):
+    """Upsert the catalog from an uploaded CSV.
+
+    The upload is imported all or nothing: rows the importer rejects are
+    reported and skipped, but a file that cannot be read to the end leaves
+    the catalog as it was.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    MAX_REPORTED_ERRORS = 1000
+
+    def post(self, request):
+        if request.user.role not in ('librarian', 'admin'):
+            return Response({"detail": "Not authorized"}, status=status.HTTP_403_FORBIDDEN)
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"detail": "Upload a CSV as 'file'"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            # The batches commit as savepoints of this one transaction
+            with transaction.atomic():
+                result = import_books(io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline=''))
+        except (csv.Error, ValueError) as error:
+            return Response({"detail": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        summary = result.as_dict()
+        summary['error_rows'] = [
+            {'line': line, 'isbn': isbn, 'error': message}
+            for line, isbn, message in result.errors[:self.MAX_REPORTED_ERRORS]
+        ]
+        return Response(summary)
+
 class BookRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-class BorrowRecordListCreateView(generics.ListCreateAPIView):
-    queryset = BorrowRecord.objects.all()
+class BorrowRecordListCreateView(ExportMixin, FastListMixin, SparseFieldsetMixin, generics.ListCreateAPIView):
+    queryset = BorrowRecord.objects.select_related('book')
     serializer_class = BorrowRecordSerializer
     permission_classes = [permissions.IsAuthenticated]
+    keyset_ordering = ('-borrowed_date', '-id')
+    export_roles = ('librarian', 'admin')
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['borrower_name', 'returned']
+    filterset_fields = ['borrower', 'borrower_name', 'returned']
 
     def perform_create(self, serializer):
-        book = serializer.validated_data['book']
-        if book.available_copies > 0:
-            book.available_copies -= 1
-            book.save()
-            serializer.save()
-        else:
-            raise serializers.ValidationError("No available copies of this book")
+        data = serializer.validated_data
+        book = data['book']
+        with transaction.atomic():
+            borrower = data.get('borrower') or resolve_borrower(data['borrower_name'], data['borrower_type'])
+            if not reserve_loan(borrower):
+                raise serializers.ValidationError("This borrower has reached their loan limit")
+            if not take_copy(book.pk):
+                raise serializers.ValidationError("No available copies of this book")
+            serializer.save(borrower=borrower, borrower_name=borrower.name, borrower_type=borrower.borrower_type)
+            copies_changed({book.pk: -1})
+        book.refresh_from_db(fields=['available_copies'])
+
+class BorrowerListCreateView(ExportMixin, generics.ListCreateAPIView):
+    serializer_class = BorrowerSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    keyset_ordering = ('normalized_name', 'id')
+    export_roles = ('librarian', 'admin')
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['borrower_type']
+
+    def get_queryset(self):
+        queryset = Borrower.objects.order_by('normalized_name', 'id')
+        query = self.request.query_params.get('q')
+        if query:
+            queryset = queryset.filter(normalized_name__startswith=normalize_name(query))
+        return queryset
+
+class BorrowerRetrieveUpdateView(generics.RetrieveUpdateAPIView):
+    queryset = Borrower.objects.all()
+    serializer_class = BorrowerSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+class BorrowerHistoryView(ExportMixin, SparseFieldsetMixin, generics.ListAPIView):
+    """A borrower's loans, newest first, read off borrow_history_idx."""
+    serializer_class = BorrowRecordSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    keyset_ordering = ('-borrowed_date', '-id')
+    export_roles = ('librarian', 'admin')
+
+    def get_queryset(self):
+        return BorrowRecord.objects.filter(borrower_id=self.kwargs['pk']).select_related('book')
+
+    def list(self, request, *args, **kwargs):
+        self.borrower = generics.get_object_or_404(Borrower, pk=kwargs['pk'])
+        return super().list(request, *args, **kwargs)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data = {'borrower': BorrowerSerializer(self.borrower).data, **response.data}
+        return response
 
 class ReturnBookView(generics.UpdateAPIView):
-    queryset = BorrowRecord.objects.all()
+    queryset = BorrowRecord.objects.select_related('book')
     serializer_class = BorrowRecordSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def update(self, request, *args, **kwargs):
         instance = self.get_object()
-        instance.returned = True
-        instance.returned_date = timezone.now()
-        instance.save()
-        
-        # Update book availability
-        book = instance.book
-        book.available_copies += 1
-        book.save()
-        
+        with transaction.atomic():
+            if not mark_returned(instance):
+                raise serializers.ValidationError("This book has already been returned")
+            released = release_copy(instance.book_id)
+            release_loan(instance.borrower_id)
+            bulk_saved.send(sender=BorrowRecord, instances=[instance], created=False)
+            copies_changed({instance.book_id: int(released)})
+
+        instance.book.refresh_from_db(fields=['available_copies'])
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
 
-class ActiveBorrowsView(generics.ListAPIView):
+class CirculationBatchView(generics.GenericAPIView):
+    """Checkouts by ISBN and returns by record id from one desk session.
+
+    Returns are processed first so they free loan slots for the checkouts.
+    Each item gets its own result; one bad scan does not fail the rest.
+    """
+    serializer_class = CirculationBatchSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        borrower = None
+        with transaction.atomic():
+            returns = return_batch(data['returns'])
+            checkouts = []
+            if data['checkout']:
+                borrower = data.get('borrower') or resolve_borrower(data['borrower_name'], data['borrower_type'])
+                checkouts = checkout_batch(borrower, data['checkout'], data['due_date'])
+        return Response({
+            'borrower_id': borrower.pk if borrower else None,
+            'returns': returns,
+            'checkout': checkouts,
+        })
+
+class ActiveBorrowsView(ExportMixin, FastListMixin, SparseFieldsetMixin, generics.ListAPIView):
     serializer_class = BorrowRecordSerializer
     permission_classes = [permissions.IsAuthenticated]
+    keyset_ordering = ('due_date', 'id')
+    export_roles = ('librarian', 'admin')
 
     def get_queryset(self):
-        return BorrowRecord.objects.filter(returned=False)
\ No newline at end of file
+        return BorrowRecord.objects.filter(returned=False).select_related('book')
+
+class OverdueBorrowsView(ExportMixin, SparseFieldsetMixin, generics.ListAPIView):
+    serializer_class = BorrowRecordSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    keyset_ordering = ('due_date', 'id')
+    export_roles = ('librarian', 'admin')
+
+    def get_queryset(self):
+        return overdue_loans().select_related('book')
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data = {**overdue_summary(), **response.data}
+        return response
+
+class OverdueBorrowersView(generics.GenericAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return Response(list(overdue_by_borrower()))
+
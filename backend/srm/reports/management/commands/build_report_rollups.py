@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from reports.rollups import build_rollups, mark_all_dirty
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily report rollups for every day marked dirty'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Mark every day with data dirty before building')
+
+    def handle(self, *args, **options):
+        if options['full']:
+            marked = mark_all_dirty()
+            self.stdout.write(f"Marked {marked} days for rebuild")
+        processed = build_rollups()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt rollups for {processed} days"))
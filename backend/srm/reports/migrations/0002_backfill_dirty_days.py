@@ -0,0 +1,35 @@
+# Generated by Django 5.1.7 on 2026-10-18 13:24
+
+from django.db import migrations
+
+
+def mark_existing_days(apps, schema_editor):
+    # Every day that already has data is rolled up by the next build_report_rollups run
+    ResourceRequest = apps.get_model('resources', 'ResourceRequest')
+    LabBooking = apps.get_model('labs', 'LabBooking')
+    BorrowRecord = apps.get_model('library', 'BorrowRecord')
+    StockMovement = apps.get_model('store', 'StockMovement')
+    RollupDirtyDay = apps.get_model('reports', 'RollupDirtyDay')
+
+    days = set()
+    days.update(ResourceRequest.objects.dates('created_at', 'day'))
+    days.update(StockMovement.objects.filter(kind='consume').dates('created_at', 'day'))
+    days.update(LabBooking.objects.dates('date', 'day'))
+    days.update(BorrowRecord.objects.dates('borrowed_date', 'day'))
+    days.update(BorrowRecord.objects.exclude(returned_date=None).dates('returned_date', 'day'))
+    RollupDirtyDay.objects.bulk_create([RollupDirtyDay(day=day) for day in days], ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0001_initial'),
+        ('resources', '0002_initial'),
+        ('labs', '0002_initial'),
+        ('library', '0001_initial'),
+        ('store', '0003_stock_ledger'),
+    ]
+
+    operations = [
+        migrations.RunPython(mark_existing_days, migrations.RunPython.noop),
+    ]
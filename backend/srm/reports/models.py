@@ -0,0 +1,47 @@
+from django.db import models
+from labs.models import Lab
+
+class RollupDirtyDay(models.Model):
+    day = models.DateField(unique=True)
+    marked_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.day} (dirty)"
+
+class DailyRequestRollup(models.Model):
+    day = models.DateField()
+    resource_type = models.CharField(max_length=100)
+    status = models.CharField(max_length=20)
+    count = models.PositiveIntegerField(default=0)
+    quantity = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'resource_type', 'status'], name='unique_request_rollup'),
+        ]
+
+class DailyLabBookingRollup(models.Model):
+    day = models.DateField()
+    lab = models.ForeignKey(Lab, on_delete=models.CASCADE)
+    status = models.CharField(max_length=20)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'lab', 'status'], name='unique_lab_booking_rollup'),
+        ]
+
+class DailyCirculationRollup(models.Model):
+    day = models.DateField(unique=True)
+    borrows = models.PositiveIntegerField(default=0)
+    returns = models.PositiveIntegerField(default=0)
+
+class DailyConsumptionRollup(models.Model):
+    day = models.DateField()
+    resource_type = models.CharField(max_length=100)
+    quantity = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'resource_type'], name='unique_consumption_rollup'),
+        ]
@@ -0,0 +1,142 @@
+import pandas as pd
+from django.db import transaction
+from django.db.models import Sum
+from resources.models import ResourceRequest
+from labs.models import LabBooking
+from library.models import BorrowRecord
+from store.models import StockMovement
+from .models import (
+    RollupDirtyDay, DailyRequestRollup, DailyLabBookingRollup,
+    DailyCirculationRollup, DailyConsumptionRollup
+)
+
+def mark_dirty(days):
+    days = {day for day in days if day is not None}
+    if days:
+        RollupDirtyDay.objects.bulk_create(
+            [RollupDirtyDay(day=day) for day in days], ignore_conflicts=True
+        )
+
+def _frame(queryset, columns):
+    return pd.DataFrame.from_records(list(queryset.values_list(*columns)), columns=columns)
+
+def _build_requests(days):
+    df = _frame(
+        ResourceRequest.objects.filter(created_at__date__in=days),
+        ['created_at__date', 'resource_type', 'status', 'quantity'],
+    )
+    if df.empty:
+        return []
+    grouped = df.groupby(['created_at__date', 'resource_type', 'status'])['quantity'].agg(['count', 'sum'])
+    return [
+        DailyRequestRollup(day=day, resource_type=resource_type, status=status, count=int(row['count']), quantity=int(row['sum']))
+        for (day, resource_type, status), row in grouped.iterrows()
+    ]
+
+def _build_consumption(days):
+    # Read from the stock ledger, so consumption that never went through a request counts too
+    df = _frame(
+        StockMovement.objects.filter(kind='consume', created_at__date__in=days),
+        ['created_at__date', 'item__category', 'change'],
+    )
+    if df.empty:
+        return []
+    grouped = df.groupby(['created_at__date', 'item__category'])['change'].sum()
+    return [
+        DailyConsumptionRollup(day=day, resource_type=category, quantity=-int(change))
+        for (day, category), change in grouped.items()
+    ]
+
+def _build_lab_bookings(days):
+    df = _frame(LabBooking.objects.filter(date__in=days), ['date', 'lab_id', 'status'])
+    if df.empty:
+        return []
+    grouped = df.groupby(['date', 'lab_id', 'status']).size()
+    return [
+        DailyLabBookingRollup(day=day, lab_id=lab_id, status=status, count=int(count))
+        for (day, lab_id, status), count in grouped.items()
+    ]
+
+def _build_circulation(days):
+    borrows = _frame(BorrowRecord.objects.filter(borrowed_date__date__in=days), ['borrowed_date__date'])
+    returns = _frame(BorrowRecord.objects.filter(returned_date__date__in=days), ['returned_date__date'])
+    counts = pd.DataFrame({
+        'borrows': borrows.groupby('borrowed_date__date').size(),
+        'returns': returns.groupby('returned_date__date').size(),
+    }).fillna(0)
+    return [
+        DailyCirculationRollup(day=day, borrows=int(row['borrows']), returns=int(row['returns']))
+        for day, row in counts.iterrows()
+    ]
+
+ROLLUPS = [
+    (DailyRequestRollup, _build_requests),
+    (DailyConsumptionRollup, _build_consumption),
+    (DailyLabBookingRollup, _build_lab_bookings),
+    (DailyCirculationRollup, _build_circulation),
+]
+
+def build_rollups(batch_size=90):
+    """Rebuild the rollup rows of every dirty day and clear the dirty marks.
+
+    Returns the number of days processed. Days are handled in batches so a
+    full rebuild of several school years does not load everything at once.
+    Each batch locks its dirty marks, so overlapping runs take different
+    days instead of racing on the rollup unique constraints.
+    """
+    processed = 0
+    while True:
+        with transaction.atomic():
+            dirty = list(
+                RollupDirtyDay.objects.select_for_update(skip_locked=True)
+                .order_by('day').values_list('id', 'day')[:batch_size]
+            )
+            if not dirty:
+                return processed
+            ids = [pk for pk, _day in dirty]
+            days = [day for _pk, day in dirty]
+            # Cleared before reading, so a write marking one of these days
+            # while the batch runs leaves it dirty for the next run
+            RollupDirtyDay.objects.filter(id__in=ids).delete()
+            for model, build in ROLLUPS:
+                model.objects.filter(day__in=days).delete()
+                model.objects.bulk_create(build(days))
+        processed += len(days)
+
+def mark_all_dirty():
+    days = set()
+    days.update(ResourceRequest.objects.dates('created_at', 'day'))
+    days.update(StockMovement.objects.filter(kind='consume').dates('created_at', 'day'))
+    days.update(LabBooking.objects.dates('date', 'day'))
+    days.update(BorrowRecord.objects.dates('borrowed_date', 'day'))
+    days.update(BorrowRecord.objects.exclude(returned_date=None).dates('returned_date', 'day'))
+    mark_dirty(days)
+    return len(days)
+
+def _pivot(rows, name_field, value_field, columns):
+    summary = {}
+    for row in rows:
+        entry = summary.setdefault(row[name_field], {'name': row[name_field], **{column: 0 for column in columns}})
+        entry[row['status']] = row[value_field]
+    return list(summary.values())
+
+def summarize(start=None, end=None):
+    def in_range(model):
+        queryset = model.objects.all()
+        if start:
+            queryset = queryset.filter(day__gte=start)
+        if end:
+            queryset = queryset.filter(day__lte=end)
+        return queryset
+
+    requests = in_range(DailyRequestRollup).values('resource_type', 'status').annotate(total=Sum('count')).order_by('resource_type')
+    bookings = in_range(DailyLabBookingRollup).values('lab__lab_number', 'status').annotate(total=Sum('count')).order_by('lab__lab_number')
+    circulation = in_range(DailyCirculationRollup).aggregate(borrows=Sum('borrows'), returns=Sum('returns'))
+    consumption = in_range(DailyConsumptionRollup).values('resource_type').annotate(quantity=Sum('quantity')).order_by('resource_type')
+
+    return {
+        'requests': _pivot(requests, 'resource_type', 'total', [s for s, _ in ResourceRequest.STATUS_CHOICES]),
+        'lab_bookings': _pivot(bookings, 'lab__lab_number', 'total', [s for s, _ in LabBooking.STATUS_CHOICES]),
+        'circulation': {key: value or 0 for key, value in circulation.items()},
+        'consumption': [{'name': row['resource_type'], 'quantity': row['quantity']} for row in consumption],
+    }
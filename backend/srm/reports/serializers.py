@@ -0,0 +1,5 @@
+from rest_framework import serializers
+
+class SummaryQuerySerializer(serializers.Serializer):
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
@@ -0,0 +1,50 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.utils import timezone
+from srm.signals import bulk_saved
+from resources.models import ResourceRequest
+from labs.models import LabBooking
+from library.models import BorrowRecord
+from store.models import StockMovement
+from .rollups import mark_dirty
+
+def _date(value):
+    if value is None:
+        return None
+    if hasattr(value, 'hour'):
+        return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+    return value
+
+# The fields whose dates decide which rollup days a row contributes to
+ROLLUP_DATE_FIELDS = {
+    ResourceRequest: ['created_at'],
+    LabBooking: ['date'],
+    BorrowRecord: ['borrowed_date', 'returned_date'],
+    StockMovement: ['created_at'],
+}
+
+def _days(instance, fields):
+    return {_date(getattr(instance, field)) for field in fields}
+
+def _remember_old_days(sender, instance, **kwargs):
+    # A status or date change must also rebuild the day the row used to count towards
+    if instance.pk:
+        fields = ROLLUP_DATE_FIELDS[sender]
+        old = sender.objects.filter(pk=instance.pk).values(*fields).first()
+        instance._rollup_old_days = {_date(value) for value in old.values()} if old else set()
+
+def _mark_days(sender, instance, **kwargs):
+    days = _days(instance, ROLLUP_DATE_FIELDS[sender])
+    days |= getattr(instance, '_rollup_old_days', set())
+    mark_dirty(days)
+
+def _bulk_saved(sender, instances=(), **kwargs):
+    if sender in ROLLUP_DATE_FIELDS:
+        fields = ROLLUP_DATE_FIELDS[sender]
+        mark_dirty(set().union(*(_days(instance, fields) for instance in instances)))
+
+def connect_signals():
+    for model in ROLLUP_DATE_FIELDS:
+        pre_save.connect(_remember_old_days, sender=model, dispatch_uid=f'rollup_pre_save_{model.__name__}')
+        post_save.connect(_mark_days, sender=model, dispatch_uid=f'rollup_save_{model.__name__}')
+        post_delete.connect(_mark_days, sender=model, dispatch_uid=f'rollup_delete_{model.__name__}')
+    bulk_saved.connect(_bulk_saved, dispatch_uid='reports_bulk_saved')
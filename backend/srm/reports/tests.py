@@ -0,0 +1,114 @@
+from datetime import date, datetime, time, timezone
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+from labs.models import Lab, LabBooking
+from library.models import Book, BorrowRecord
+from resources.models import ResourceRequest
+from store.models import InventoryItem, StockMovement
+from store.stock import apply_movements, move_stock
+from users.models import User
+from .models import DailyLabBookingRollup, DailyRequestRollup, RollupDirtyDay
+
+DAY = date(2026, 11, 2)
+NEXT_DAY = date(2026, 11, 3)
+
+
+def at(day, hour=10):
+    return datetime.combine(day, time(hour), tzinfo=timezone.utc)
+
+
+class RollupTests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create(username='teacher', role='teacher')
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='admin', role='admin'))
+        self.lab = Lab.objects.create(lab_number='101', capacity=30)
+
+        for quantity, status in [(3, 'pending'), (2, 'fulfilled'), (5, 'fulfilled')]:
+            request = ResourceRequest.objects.create(
+                teacher=self.teacher, resource_type='stationery', resource_name='Pens', quantity=quantity, status=status,
+            )
+            ResourceRequest.objects.filter(pk=request.pk).update(created_at=at(DAY), updated_at=at(DAY, 14))
+        self.booking = LabBooking.objects.create(
+            lab=self.lab, teacher=self.teacher, date=DAY, start_time=time(9), end_time=time(10),
+            requirements='Microscopes', status='approved',
+        )
+        book = Book.objects.create(title='Dune', author='Herbert', isbn='1', category='fiction', total_copies=2, available_copies=2)
+        for returned in [None, at(NEXT_DAY)]:
+            record = BorrowRecord.objects.create(
+                book=book, borrower_name='Ana', borrower_type='student', due_date=NEXT_DAY,
+                returned=returned is not None, returned_date=returned,
+            )
+            BorrowRecord.objects.filter(pk=record.pk).update(borrowed_date=at(DAY))
+        self.pens = InventoryItem.objects.create(
+            name='Pens', category='stationery', quantity=50, threshold=5, department='Science',
+        )
+        # Consumption comes from the ledger; the restock is not consumption
+        StockMovement.objects.bulk_create([
+            StockMovement(item=self.pens, kind=kind, change=change, quantity_after=50, created_at=at(DAY, 14))
+            for kind, change in [('consume', -2), ('consume', -5), ('restock', 10)]
+        ])
+        # The update() and bulk_create() calls above bypass the signals, so mark the days they moved rows to
+        RollupDirtyDay.objects.bulk_create([RollupDirtyDay(day=DAY), RollupDirtyDay(day=NEXT_DAY)], ignore_conflicts=True)
+
+    def summary(self, **params):
+        response = self.client.get('/api/reports/summary/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_summary_reads_rollups_without_building_them(self):
+        summary = self.summary()
+        self.assertEqual(summary['requests'], [])
+        self.assertGreater(summary['pending_days'], 0)
+        self.assertFalse(DailyRequestRollup.objects.exists())
+
+    def test_build_totals_match_source_rows(self):
+        call_command('build_report_rollups', stdout=StringIO())
+        summary = self.summary()
+
+        self.assertEqual(summary['pending_days'], 0)
+        self.assertEqual(summary['requests'], [{'name': 'stationery', 'pending': 1, 'fulfilled': 2, 'rejected': 0}])
+        self.assertEqual(summary['lab_bookings'], [
+            {'name': '101', 'pending': 0, 'approved': 1, 'rejected': 0},
+        ])
+        self.assertEqual(summary['circulation'], {'borrows': 2, 'returns': 1})
+        self.assertEqual(summary['consumption'], [{'name': 'stationery', 'quantity': 7}])
+        self.assertEqual(DailyRequestRollup.objects.get(status='fulfilled').quantity, 7)
+
+        summary = self.summary(start=NEXT_DAY.isoformat())
+        self.assertEqual(summary['requests'], [])
+        self.assertEqual(summary['circulation'], {'borrows': 0, 'returns': 1})
+
+    def test_changes_mark_old_and_new_days(self):
+        call_command('build_report_rollups', stdout=StringIO())
+
+        self.booking.date = NEXT_DAY
+        self.booking.status = 'rejected'
+        self.booking.save()
+        self.assertEqual(set(RollupDirtyDay.objects.values_list('day', flat=True)), {DAY, NEXT_DAY})
+
+        call_command('build_report_rollups', stdout=StringIO())
+        self.assertEqual(
+            list(DailyLabBookingRollup.objects.values_list('day', 'status', 'count')),
+            [(NEXT_DAY, 'rejected', 1)],
+        )
+        self.assertFalse(RollupDirtyDay.objects.exists())
+
+        self.booking.delete()
+        call_command('build_report_rollups', stdout=StringIO())
+        self.assertFalse(DailyLabBookingRollup.objects.exists())
+
+    def test_stock_movements_mark_their_day(self):
+        RollupDirtyDay.objects.all().delete()
+        move_stock(self.pens.pk, 'consume', -1)
+        today = StockMovement.objects.latest('id').created_at.date()
+        self.assertEqual(list(RollupDirtyDay.objects.values_list('day', flat=True)), [today])
+
+        RollupDirtyDay.objects.all().delete()
+        apply_movements([{'item_id': self.pens.pk, 'kind': 'consume', 'change': -3}])
+        self.assertEqual(list(RollupDirtyDay.objects.values_list('day', flat=True)), [today])
+
+        call_command('build_report_rollups', stdout=StringIO())
+        self.assertEqual(self.summary(start=today.isoformat())['consumption'], [{'name': 'stationery', 'quantity': 4}])
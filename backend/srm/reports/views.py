@@ -0,0 +1,22 @@
+from rest_framework import generics, permissions
+from rest_framework.response import Response
+from .models import RollupDirtyDay
+from .rollups import summarize
+from .serializers import SummaryQuerySerializer
+
+class ReportSummaryView(generics.GenericAPIView):
+    """Reads the rollup tables only. They are rebuilt by the
+    build_report_rollups command, run on a schedule; ``pending_days``
+    counts the days changed since its last run."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        if not request.user.role == 'admin':
+            return Response({"detail": "Not authorized"}, status=403)
+
+        params = SummaryQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        summary = summarize(params.validated_data.get('start'), params.validated_data.get('end'))
+        summary['pending_days'] = RollupDirtyDay.objects.count()
+        return Response(summary)
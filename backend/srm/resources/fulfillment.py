@@ -0,0 +1,64 @@
+from django.db import transaction
+from django.utils import timezone
+from srm.signals import bulk_saved
+from store.models import InventoryItem
+from store.stock import apply_movements
+from .models import ResourceRequest
+
+def fulfill(request_ids, user=None):
+    """Fulfill pending requests and consume their stock in one transaction.
+
+    Requests are served oldest first. One whose item is short stays
+    pending while the rest go ahead. Returns one result per id, in the
+    order given.
+    """
+    request_ids = list(dict.fromkeys(request_ids))
+    results = {}
+    with transaction.atomic():
+        requests = ResourceRequest.objects.select_for_update().in_bulk(request_ids)
+        queue = []
+        for pk in request_ids:
+            request = requests.get(pk)
+            if request is None:
+                results[pk] = {'id': pk, 'ok': False, 'error': "Unknown request"}
+            elif request.status != 'pending':
+                results[pk] = {'id': pk, 'ok': False, 'error': f"Request is {request.status}"}
+            elif request.item_id is None:
+                results[pk] = {'id': pk, 'ok': False, 'error': "Not linked to an inventory item"}
+            else:
+                queue.append(request)
+        queue.sort(key=lambda request: (request.created_at, request.pk))
+
+        stock = dict(
+            InventoryItem.objects.select_for_update()
+            .filter(pk__in={request.item_id for request in queue}).values_list('pk', 'quantity')
+        )
+        fulfilled = []
+        for request in queue:
+            if stock[request.item_id] >= request.quantity:
+                stock[request.item_id] -= request.quantity
+                fulfilled.append(request)
+                results[request.pk] = {'id': request.pk, 'ok': True, 'item_id': request.item_id}
+            else:
+                results[request.pk] = {
+                    'id': request.pk, 'ok': False, 'error': "Not enough stock", 'available': stock[request.item_id],
+                }
+
+        if fulfilled:
+            # Stock was allocated against the same locked rows, so this cannot fall short
+            apply_movements([
+                {'item_id': request.item_id, 'kind': 'consume', 'change': -request.quantity, 'note': f"Request #{request.pk}"}
+                for request in fulfilled
+            ], user=user)
+            now = timezone.now()
+            ResourceRequest.objects.filter(pk__in=[request.pk for request in fulfilled]).update(
+                status='fulfilled', updated_at=now,
+            )
+            for request in fulfilled:
+                request.status = 'fulfilled'
+                request.updated_at = now
+            bulk_saved.send(
+                sender=ResourceRequest, instances=fulfilled, created=False, update_fields=['status', 'updated_at'],
+                previous={request.pk: {'status': 'pending'} for request in fulfilled},
+            )
+    return [results[pk] for pk in request_ids]
@@ -0,0 +1,49 @@
+# Generated by Django 5.1.7 on 2026-10-18 13:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def link_requests(apps, schema_editor):
+    # Existing requests are linked on exact normalized names only; fuzzy
+    # matches are left for a storekeeper to confirm
+    InventoryItem = apps.get_model('store', 'InventoryItem')
+    ResourceRequest = apps.get_model('resources', 'ResourceRequest')
+    items = {}
+    for pk, normalized_name in InventoryItem.objects.order_by('-pk').values_list('pk', 'normalized_name'):
+        items[normalized_name] = pk
+    spellings = {}
+    for name in ResourceRequest.objects.values_list('resource_name', flat=True).distinct():
+        pk = items.get(' '.join(name.split()).casefold())
+        if pk is not None:
+            spellings.setdefault(pk, []).append(name)
+    for pk, names in spellings.items():
+        ResourceRequest.objects.filter(resource_name__in=names).update(item_id=pk, match_score=1.0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0002_initial'),
+        ('store', '0005_inventory_normalized_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resourcerequest',
+            name='item',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='requests', to='store.inventoryitem'),
+        ),
+        migrations.AddField(
+            model_name='resourcerequest',
+            name='match_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='resourcerequest',
+            index=models.Index(fields=['status', 'created_at'], name='resource_request_queue_idx'),
+        ),
+        migrations.RunPython(link_requests, migrations.RunPython.noop),
+    ]
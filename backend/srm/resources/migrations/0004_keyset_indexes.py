@@ -0,0 +1,20 @@
+# Generated by Django 5.1.7 on 2026-10-18 13:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0003_request_item'),
+        ('store', '0005_inventory_normalized_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='resourcerequest',
+            index=models.Index(fields=['created_at', 'id'], name='resource_request_created_idx'),
+        ),
+    ]
@@ -12,11 +12,22 @@ class ResourceRequest(models.Model):
     teacher = models.ForeignKey(User, on_delete=models.CASCADE) 
     resource_type = models.CharField(max_length=100)
     resource_name = models.CharField(max_length=255)
+    # Inventory item the name was matched to when the request was made
+    item = models.ForeignKey(
+        'store.InventoryItem', on_delete=models.SET_NULL, null=True, blank=True, related_name='requests'
+    )
+    match_score = models.FloatField(null=True, blank=True)
     quantity = models.PositiveIntegerField()
     description = models.TextField(blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='resource_request_queue_idx'),
+            models.Index(fields=['created_at', 'id'], name='resource_request_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.resource_name} - {self.get_status_display()}"
\ No newline at end of file
@@ -1,11 +1,15 @@
 from rest_framework import serializers
 from .models import ResourceRequest
 from users.serializers import UserSerializer
+from srm.fieldsets import SparseFieldsetSerializerMixin
 
-class ResourceRequestSerializer(serializers.ModelSerializer):
+class ResourceRequestSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     teacher = UserSerializer(read_only=True)
     
     class Meta:
         model = ResourceRequest
         fields = '__all__'
-        read_only_fields = ['created_at', 'updated_at']
\ No newline at end of file
+        read_only_fields = ['match_score', 'created_at', 'updated_at']
+
+class FulfillRequestsSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=500)
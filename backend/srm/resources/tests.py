@@ -1,3 +1,96 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
+from users.models import User
+from store.models import InventoryItem, StockMovement
+from .models import ResourceRequest
 
-# Create your tests here.
+
+class FulfillmentTests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create(username='teacher', role='teacher')
+        self.storekeeper = User.objects.create(username='storekeeper', role='storekeeper')
+        self.client = APIClient()
+        self.pens = InventoryItem.objects.create(
+            name='Blue Pens', category='stationery', quantity=10, threshold=2, department='Science',
+        )
+
+    def request(self, name, quantity):
+        self.client.force_authenticate(self.teacher)
+        return self.client.post('/api/resources/requests/', {
+            'resource_type': 'stationery', 'resource_name': name, 'quantity': quantity,
+        }, format='json').data
+
+    def test_names_are_matched_at_request_time(self):
+        self.assertEqual(self.request(' blue  PENS', 1)['item'], self.pens.pk)
+        fuzzy = self.request('Blue Pen', 1)
+        self.assertEqual(fuzzy['item'], self.pens.pk)
+        self.assertLess(fuzzy['match_score'], 1)
+        self.assertIsNone(self.request('Chalk', 1)['item'])
+
+    def test_batch_fulfillment_skips_shortfalls(self):
+        ids = [self.request('Blue Pens', quantity)['id'] for quantity in (4, 8, 6)]
+
+        self.client.force_authenticate(self.storekeeper)
+        response = self.client.post('/api/resources/requests/fulfill/', {'ids': ids}, format='json')
+
+        self.assertEqual([result['ok'] for result in response.data['results']], [True, False, True])
+        self.assertEqual(
+            list(ResourceRequest.objects.order_by('id').values_list('status', flat=True)),
+            ['fulfilled', 'pending', 'fulfilled'],
+        )
+        self.pens.refresh_from_db()
+        self.assertEqual(self.pens.quantity, 0)
+        self.assertEqual(StockMovement.objects.filter(kind='consume').count(), 2)
+
+    def test_batch_fulfillment_needs_storekeeper(self):
+        self.client.force_authenticate(self.teacher)
+        response = self.client.post('/api/resources/requests/fulfill/', {'ids': [1]}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_bulk_status_fulfils_through_stock(self):
+        linked = self.request('Blue Pens', 6)['id']
+        short = self.request('Blue Pens', 6)['id']
+        unlinked = self.request('Chalk', 1)['id']
+
+        self.client.force_authenticate(self.storekeeper)
+        response = self.client.post('/api/resources/requests/status/', {
+            'status': 'fulfilled', 'ids': [linked, short, unlinked],
+        }, format='json')
+
+        self.assertEqual(response.data['ids'], [linked, unlinked])
+        self.assertEqual([result['id'] for result in response.data['not_fulfilled']], [short])
+        self.pens.refresh_from_db()
+        self.assertEqual(self.pens.quantity, 4)
+
+    def test_failed_fulfilment_rolls_back_the_whole_update(self):
+        pk = self.request('Blue Pens', 4)['id']
+
+        self.client.force_authenticate(self.storekeeper)
+        response = self.client.patch(f'/api/resources/requests/{pk}/', {
+            'status': 'fulfilled', 'quantity': 12, 'description': 'Whole year group',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        request = ResourceRequest.objects.get(pk=pk)
+        self.assertEqual((request.status, request.quantity, request.description), ('pending', 4, ''))
+        self.pens.refresh_from_db()
+        self.assertEqual(self.pens.quantity, 10)
+
+        response = self.client.patch(f'/api/resources/requests/{pk}/', {'status': 'fulfilled', 'quantity': 5}, format='json')
+        self.assertEqual((response.data['status'], response.data['quantity']), ('fulfilled', 5))
+        self.pens.refresh_from_db()
+        self.assertEqual(self.pens.quantity, 5)
+
+    def test_fulfilled_requests_cannot_be_reopened(self):
+        pk = self.request('Blue Pens', 4)['id']
+        self.client.force_authenticate(self.storekeeper)
+        url = f'/api/resources/requests/{pk}/'
+        self.assertEqual(self.client.patch(url, {'status': 'fulfilled'}, format='json').status_code, 200)
+
+        response = self.client.patch(url, {'status': 'pending'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('status', response.data)
+        # Other edits still go through
+        self.assertEqual(self.client.patch(url, {'status': 'fulfilled', 'description': 'Done'}, format='json').status_code, 200)
+        self.pens.refresh_from_db()
+        self.assertEqual(self.pens.quantity, 6)
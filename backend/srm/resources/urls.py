@@ -2,11 +2,15 @@ from django.urls import path
 from .views import (
     ResourceRequestListCreateView,
     ResourceRequestRetrieveUpdateDestroyView,
+    FulfillRequestsView,
+    ResourceRequestBulkStatusView,
     RecentResourceRequestsView
 )
 
 urlpatterns = [
     path('requests/', ResourceRequestListCreateView.as_view(), name='resource-request-list'),
     path('requests/<int:pk>/', ResourceRequestRetrieveUpdateDestroyView.as_view(), name='resource-request-detail'),
+    path('requests/fulfill/', FulfillRequestsView.as_view(), name='fulfill-resource-requests'),
+    path('requests/status/', ResourceRequestBulkStatusView.as_view(), name='resource-request-bulk-status'),
     path('requests/recent/', RecentResourceRequestsView.as_view(), name='recent-resource-requests'),
 ]
\ No newline at end of file
@@ -1,26 +1,131 @@
-from rest_framework import generics, permissions
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import generics, permissions, serializers
+from rest_framework.response import Response
+from srm.export import ExportMixin
+from srm.fastpath import FastListMixin
+from srm.fieldsets import SparseFieldsetMixin
+from srm.transitions import (
+    BulkTransitionSerializer, check_transition, transition_targets, bulk_transition, transition_response,
+)
+from store.matching import match_item
 from .models import ResourceRequest
-from .serializers import ResourceRequestSerializer
+from .serializers import ResourceRequestSerializer, FulfillRequestsSerializer
+from .fulfillment import fulfill
 from django_filters.rest_framework import DjangoFilterBackend
 
-class ResourceRequestListCreateView(generics.ListCreateAPIView):
-    queryset = ResourceRequest.objects.all()
+# Status moves allowed by PATCH and the bulk endpoint. Nothing leaves
+# fulfilled: stock it consumed is never given back.
+REQUEST_TRANSITIONS = {
+    'fulfilled': ('pending',),
+    'rejected': ('pending',),
+    'pending': ('rejected',),
+}
+
+def _matched_item(serializer):
+    """Item fields for a new or renamed request, matched unless given explicitly."""
+    data = serializer.validated_data
+    if 'item' in data:
+        return {'match_score': None}
+    if 'resource_name' not in data:
+        return {}
+    item_id, score = match_item(data['resource_name'])
+    return {'item_id': item_id, 'match_score': score}
+
+class ResourceRequestListCreateView(ExportMixin, FastListMixin, SparseFieldsetMixin, generics.ListCreateAPIView):
+    queryset = ResourceRequest.objects.select_related('teacher')
     serializer_class = ResourceRequestSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['status', 'teacher']
+    filterset_fields = ['status', 'teacher', 'item']
 
     def perform_create(self, serializer):
-        serializer.save(teacher=self.request.user)
+        serializer.save(teacher=self.request.user, **_matched_item(serializer))
 
-class ResourceRequestRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = ResourceRequest.objects.all()
+class ResourceRequestRetrieveUpdateDestroyView(SparseFieldsetMixin, generics.RetrieveUpdateDestroyAPIView):
+    queryset = ResourceRequest.objects.select_related('teacher')
     serializer_class = ResourceRequestSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-class RecentResourceRequestsView(generics.ListAPIView):
+    def perform_update(self, serializer):
+        instance = serializer.instance
+        if 'status' in serializer.validated_data:
+            check_transition(REQUEST_TRANSITIONS, instance.status, serializer.validated_data['status'])
+        linked = serializer.validated_data.get('item', instance.item)
+        # Fulfilling a linked request takes its quantity out of stock
+        if serializer.validated_data.get('status') == 'fulfilled' and instance.status == 'pending' and linked:
+            serializer.validated_data.pop('status')
+            # A failed fulfilment rolls back the other edits as well
+            with transaction.atomic():
+                serializer.save(**_matched_item(serializer))
+                result, = fulfill([instance.pk], user=self.request.user)
+                if not result['ok']:
+                    raise serializers.ValidationError(result['error'])
+            instance.refresh_from_db()
+        else:
+            serializer.save(**_matched_item(serializer))
+
+class FulfillRequestsView(generics.GenericAPIView):
+    serializer_class = FulfillRequestsSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        if request.user.role not in ('storekeeper', 'admin'):
+            return Response({"detail": "Not authorized"}, status=403)
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = fulfill(serializer.validated_data['ids'], user=request.user)
+        return Response({
+            'fulfilled': sum(result['ok'] for result in results),
+            'results': results,
+        })
+
+class ResourceRequestBulkStatusView(generics.GenericAPIView):
+    serializer_class = BulkTransitionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    TRANSITIONS = REQUEST_TRANSITIONS
+    FILTER_FIELDS = {
+        'status': ['exact'], 'teacher': ['exact'], 'resource_type': ['exact'], 'item': ['exact', 'isnull'],
+        'created_at': ['gte', 'lte'],
+    }
+
+    def post(self, request):
+        if request.user.role not in ('storekeeper', 'admin'):
+            return Response({"detail": "Not authorized"}, status=403)
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        target = data['status']
+        if target not in self.TRANSITIONS:
+            raise serializers.ValidationError({'status': f"Requests cannot be bulk moved to {target!r}"})
+
+        queryset = transition_targets(ResourceRequest, data, self.FILTER_FIELDS)
+        results = []
+        if target == 'fulfilled':
+            # Requests linked to inventory consume their stock on the way
+            linked = list(queryset.filter(status='pending', item__isnull=False).values_list('pk', flat=True))
+            results = fulfill(linked, user=request.user) if linked else []
+            queryset = queryset.exclude(pk__in=linked)
+        moved, skipped = bulk_transition(
+            queryset, target, self.TRANSITIONS[target], related=('teacher',), updated_at=timezone.now(),
+        )
+        moved = sorted(moved + [result['id'] for result in results if result['ok']])
+        response = transition_response(target, moved, skipped, data)
+        shortfalls = [result for result in results if not result['ok']]
+        if shortfalls:
+            response['not_fulfilled'] = shortfalls
+            if 'not_found' in response:
+                short = {result['id'] for result in shortfalls}
+                response['not_found'] = [pk for pk in response['not_found'] if pk not in short]
+        return Response(response)
+
+class RecentResourceRequestsView(SparseFieldsetMixin, generics.ListAPIView):
     serializer_class = ResourceRequestSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = None
 
     def get_queryset(self):
-        return ResourceRequest.objects.order_by('-created_at')[:10]
\ No newline at end of file
+        return ResourceRequest.objects.select_related('teacher').order_by('-created_at')[:10]
\ No newline at end of file
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class SrmConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'srm'
+
+    def ready(self):
+        from .cache import connect_signals
+        connect_signals()
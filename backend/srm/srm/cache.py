@@ -0,0 +1,147 @@
+import hashlib
+import time
+from django.apps import apps
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from rest_framework.response import Response
+from .signals import bulk_saved
+
+CACHE_ALIAS = 'api'
+# Hit and miss counters, kept apart so culling responses never resets them
+STATS_ALIAS = 'api_stats'
+VERSION_PREFIX = 'version'
+STATS_PREFIX = 'stats'
+# Models that CachedResponseMixin views may list in cache_models. Only
+# their writes bump a version, connected at startup so management
+# commands invalidate too.
+CACHED_MODELS = ('labs.Lab', 'library.Book', 'store.InventoryItem', 'users.User')
+
+# Views whose hit and miss counters stats() reports
+_names = []
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+def _version_key(model):
+    return f'{VERSION_PREFIX}:{model._meta.concrete_model._meta.label_lower}'
+
+def bump_versions(*models):
+    """Invalidate everything cached against ``models`` with one counter
+    increment each. Code writing with update() must call this or send
+    bulk_saved."""
+    cache = get_cache()
+    for model in models:
+        key = _version_key(model)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Nothing cached against it yet, or the counter was evicted. A
+            # clock-based start cannot repeat a version already handed out.
+            cache.add(key, time.time_ns(), timeout=None)
+
+def get_versions(models):
+    cache = get_cache()
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+def _count(name, outcome):
+    cache = caches[STATS_ALIAS]
+    key = f'{STATS_PREFIX}:{name}:{outcome}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+def versioned_key(name, models, variant=''):
+    """Cache key for ``name`` at the current version of every model in
+    ``models``. A write makes old keys unreachable instead of having to
+    find and delete them."""
+    versions = '.'.join(str(version) for version in get_versions(models))
+    digest = hashlib.sha1(f'{variant}@{versions}'.encode()).hexdigest()
+    return f'{name}:{digest}'
+
+def _timeout(timeout):
+    return {} if timeout is None else {'timeout': timeout}
+
+
+def stats():
+    """Hit and miss counts per cached view since the counters were created."""
+    cache = get_cache()
+    counts = caches[STATS_ALIAS].get_many([f'{STATS_PREFIX}:{name}:{outcome}' for name in _names for outcome in ('hits', 'misses')])
+    views = {}
+    for name in _names:
+        hits = counts.get(f'{STATS_PREFIX}:{name}:hits', 0)
+        misses = counts.get(f'{STATS_PREFIX}:{name}:misses', 0)
+        views[name] = {'hits': hits, 'misses': misses}
+    hits = sum(view['hits'] for view in views.values())
+    misses = sum(view['misses'] for view in views.values())
+    return {
+        'backend': type(cache).__name__,
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / (hits + misses), 4) if hits + misses else None,
+        'views': views,
+    }
+
+
+class CachedResponseMixin:
+    """Cache GET list responses until a model in ``cache_models`` changes.
+
+    Only for views whose output does not depend on who is asking; the
+    permission checks still run on every request.
+    """
+    cache_models = ()
+    cache_timeout = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.cache_models:
+            unknown = [model._meta.label for model in cls.cache_models if model._meta.label not in CACHED_MODELS]
+            if unknown:
+                raise ImproperlyConfigured(f"Add {', '.join(unknown)} to srm.cache.CACHED_MODELS")
+            _names.append(cls.cache_name())
+
+    @classmethod
+    def cache_name(cls):
+        return f'{cls.__module__}.{cls.__name__}'
+
+    def list(self, request, *args, **kwargs):
+        cache = get_cache()
+        name = self.cache_name()
+        # Links in the response are absolute, so the host is part of the key
+        variant = f'{request.get_host()}?{sorted(request.query_params.lists())}'
+        key = versioned_key(name, self.cache_models, variant)
+        entry = cache.get(key)
+        if entry is not None:
+            _count(name, 'hits')
+            data, headers = entry
+            return Response(data, headers=headers)
+
+        _count(name, 'misses')
+        response = super().list(request, *args, **kwargs)
+        if isinstance(response, Response) and response.status_code == 200:
+            headers = {header: value for header, value in response.items() if header != 'Content-Type'}
+            cache.set(key, (response.data, headers), **_timeout(self.cache_timeout))
+        return response
+
+
+def _model_changed(sender, **kwargs):
+    # Once now, so later reads in the same transaction miss, and again on
+    # commit, so nothing cached from the old rows meanwhile survives
+    bump_versions(sender)
+    transaction.on_commit(lambda: bump_versions(sender))
+
+def connect_signals():
+    for label in CACHED_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(_model_changed, sender=model, dispatch_uid=f'api_cache_save_{label}')
+        post_delete.connect(_model_changed, sender=model, dispatch_uid=f'api_cache_delete_{label}')
+        bulk_saved.connect(_model_changed, sender=model, dispatch_uid=f'api_cache_bulk_saved_{label}')
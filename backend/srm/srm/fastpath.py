@@ -0,0 +1,178 @@
+from rest_framework import ISO_8601, serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from .fieldsets import concrete_field
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# to_representation methods that return the database value unchanged; subclasses
+# overriding them do not match
+IDENTITY_REPRESENTATIONS = {
+    field_class.to_representation for field_class in (
+        serializers.CharField, serializers.ChoiceField, serializers.IntegerField, serializers.BooleanField,
+        serializers.PrimaryKeyRelatedField,
+    )
+}
+# Fields converted with their own to_representation, which only looks at the value
+CONVERTED_FIELDS = (
+    serializers.DateTimeField, serializers.DateField, serializers.TimeField, serializers.DecimalField,
+    serializers.FloatField,
+)
+
+
+class RowMapper:
+    """Builds the serializer's output dict straight from a values() row.
+
+    ``columns`` are the values() names to select; each part is
+    (output key, column, converter or None) or, for an embedded relation,
+    (output key, foreign key column, child RowMapper). ``plain`` is False
+    when rows may hold floats, which orjson formats differently.
+    """
+
+    def __init__(self, columns, parts, plain=True):
+        self.columns = columns
+        self.parts = parts
+        self.plain = plain
+
+    def bind(self):
+        """Row function for one response, with every converter bound once
+        rather than once per row."""
+        parts = []
+        for name, column, convert in self.parts:
+            nested = isinstance(convert, RowMapper)
+            if hasattr(convert, 'bind'):
+                convert = convert.bind()
+            parts.append((name, column, convert, nested))
+
+        def build(row):
+            item = {}
+            for name, column, convert, nested in parts:
+                value = row[column]
+                if value is not None and convert is not None:
+                    # An embedded relation reads its columns from the same row
+                    value = convert(row) if nested else convert(value)
+                item[name] = value
+            return item
+        return build
+
+    def rows(self, rows):
+        build = self.bind()
+        return [build(row) for row in rows]
+
+
+class DateTimeConverter:
+    """DateTimeField.to_representation with the field's timezone looked
+    up once per response rather than once per value."""
+
+    def __init__(self, field):
+        self.field = field
+
+    def bind(self):
+        field = self.field
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        tz = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+        if tz is None or output_format is None or output_format.lower() != ISO_8601:
+            return field.to_representation
+
+        def convert(value):
+            if isinstance(value, str) or value.utcoffset() is None:
+                return field.to_representation(value)
+            value = value.astimezone(tz).isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        return convert
+
+
+def _compile(serializer, prefix, columns):
+    if type(serializer).to_representation is not serializers.Serializer.to_representation:
+        return None
+    model = serializer.Meta.model
+    parts, plain = [], True
+    for field in serializer._readable_fields:
+        source = field.source
+        if concrete_field(model, source) is None:
+            return None
+        column = prefix + source
+        columns.append(column)
+        if isinstance(field, serializers.ModelSerializer):
+            child = _compile(field, column + '__', columns)
+            if child is None:
+                return None
+            parts.append((field.field_name, column, child))
+            plain = plain and child.plain
+        elif type(field).to_representation in IDENTITY_REPRESENTATIONS and getattr(field, 'pk_field', None) is None:
+            parts.append((field.field_name, column, None))
+        elif isinstance(field, CONVERTED_FIELDS):
+            convert = DateTimeConverter(field) if isinstance(field, serializers.DateTimeField) else field.to_representation
+            parts.append((field.field_name, column, convert))
+            plain = plain and not isinstance(field, serializers.FloatField)
+        else:
+            return None
+    return RowMapper(columns, parts, plain)
+
+MAX_MAPPERS = 256
+_mappers = {}
+
+def compile_mapper(serializer):
+    """A RowMapper equivalent to ``serializer``, or None when it renders
+    something other than plain model columns and embedded relations."""
+    key = (type(serializer), tuple((name, type(field)) for name, field in serializer.fields.items()))
+    if key not in _mappers:
+        if len(_mappers) >= MAX_MAPPERS:
+            # Every distinct ?fields= selection compiles its own mapper
+            _mappers.clear()
+        _mappers[key] = _compile(serializer, '', [])
+    return _mappers[key]
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that hands rows built by FastListMixin to orjson, when
+    installed, with output byte for byte identical to the stock renderer."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer_context = renderer_context or {}
+        mapper = getattr(renderer_context.get('response'), 'row_mapper', None)
+        plain = (
+            orjson is not None and mapper is not None and mapper.plain and data is not None
+            and self.compact and not self.ensure_ascii and self.strict
+            and self.get_indent(accepted_media_type, renderer_context) is None
+        )
+        if plain:
+            try:
+                ret = orjson.dumps(data)
+            except orjson.JSONEncodeError:
+                pass
+            else:
+                # The stock renderer escapes these to keep the output a JavaScript subset
+                return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class FastListMixin:
+    """Serve GET list requests from values() rows instead of model instances
+    and ModelSerializer, falling back to the normal path whenever the
+    serializer cannot be mapped column for column."""
+    renderer_classes = [FastJSONRenderer] + [
+        renderer for renderer in api_settings.DEFAULT_RENDERER_CLASSES if renderer is not JSONRenderer
+    ]
+
+    def list(self, request, *args, **kwargs):
+        mapper = compile_mapper(self.get_serializer())
+        if mapper is None:
+            return super().list(request, *args, **kwargs)
+
+        columns = list(mapper.columns)
+        if self.paginator is not None and hasattr(self.paginator, 'get_ordering'):
+            # The cursor is built from the ordering columns of the last row
+            columns += [name.lstrip('-') for name in self.paginator.get_ordering(self)]
+        rows = self.filter_queryset(self.get_queryset()).values(*dict.fromkeys(columns))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            response = self.get_paginated_response(mapper.rows(page))
+        else:
+            response = Response(mapper.rows(rows))
+        response.row_mapper = mapper
+        return response
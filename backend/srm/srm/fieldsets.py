@@ -0,0 +1,96 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+def _names(request, param):
+    value = request.query_params.get(param)
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+def sparse_selection(request):
+    """(fields, expand) asked for by a read request, or None when it asks
+    for neither and gets the full representation.
+
+    ``fields`` is None when every field is wanted.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    fields, expand = _names(request, FIELDS_PARAM), _names(request, EXPAND_PARAM)
+    if fields is None and expand is None:
+        return None
+    return fields, expand or set()
+
+
+class SparseFieldsetSerializerMixin:
+    """``?fields=a,b`` keeps only those fields (and ``id``). ``?expand=rel``
+    embeds the named relations.
+
+    Once either parameter is given, relations that are not expanded are
+    rendered as their primary key, which is read from the row itself.
+    Without either parameter the representation is unchanged.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selection = sparse_selection(self.context.get('request'))
+        if selection is None:
+            return
+        wanted, expand = selection
+        readable = {name for name, field in self.fields.items() if not field.write_only}
+        nested = {name for name in readable if isinstance(self.fields[name], serializers.BaseSerializer)}
+        errors = {}
+        if wanted is not None and wanted - readable:
+            errors[FIELDS_PARAM] = f"Unknown fields: {', '.join(sorted(wanted - readable))}"
+        if expand - nested:
+            errors[EXPAND_PARAM] = f"Cannot expand: {', '.join(sorted(expand - nested))}"
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        for name in readable:
+            if wanted is not None and name not in wanted | expand | {'id'}:
+                self.fields.pop(name)
+            elif name in nested and name not in expand:
+                self.fields[name] = serializers.PrimaryKeyRelatedField(read_only=True)
+
+
+def concrete_field(model, name):
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+    return field if field.concrete else None
+
+def sparse_queryset(queryset, serializer, keep=()):
+    """Load only the columns ``serializer`` renders plus ``keep``, joining
+    just the relations it embeds."""
+    model = queryset.model
+    columns, related = {'pk', *keep}, []
+    for field in serializer.fields.values():
+        if field.write_only or concrete_field(model, field.source) is None:
+            continue
+        columns.add(field.source)
+        if isinstance(field, serializers.BaseSerializer):
+            related.append(field.source)
+    queryset = queryset.select_related(None)
+    if related:
+        queryset = queryset.select_related(*related)
+    return queryset.only(*columns)
+
+
+class SparseFieldsetMixin:
+    """View side of SparseFieldsetSerializerMixin: the queryset fetches
+    the same fields the serializer will render."""
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if sparse_selection(self.request) is None:
+            return queryset
+        keep = ()
+        if self.paginator is not None and hasattr(self.paginator, 'get_ordering'):
+            # The cursor is built from the ordering columns of the last row
+            keep = [name.lstrip('-') for name in self.paginator.get_ordering(self)]
+        return sparse_queryset(queryset, self.get_serializer(), keep)
@@ -0,0 +1,79 @@
+import time
+from datetime import date, time as clock
+from types import SimpleNamespace
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from labs.models import Lab, LabBooking
+from labs.serializers import LabBookingSerializer
+from library.models import Book
+from library.serializers import BookSerializer
+from srm.fastpath import FastJSONRenderer, compile_mapper
+from users.models import User
+from users.serializers import UserSerializer
+
+class Command(BaseCommand):
+    help = 'Compare per-row cost of the ModelSerializer and values() list paths on throwaway rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        # Everything is created and measured inside a transaction that is rolled back
+        with transaction.atomic():
+            self.populate(rows)
+            for label, queryset, serializer_class in [
+                ('users', User.objects.filter(username__startswith='bench'), UserSerializer),
+                ('books', Book.objects.filter(isbn__startswith='bench'), BookSerializer),
+                ('lab bookings', LabBooking.objects.select_related('lab', 'teacher'), LabBookingSerializer),
+            ]:
+                self.compare(label, queryset.order_by('pk'), serializer_class, repeat)
+            transaction.set_rollback(True)
+
+    def populate(self, rows):
+        teachers = User.objects.bulk_create([
+            User(username=f'bench{i}', first_name='Bench', last_name=f'Teacher {i}', role='teacher') for i in range(rows)
+        ])
+        Book.objects.bulk_create([
+            Book(title=f'Bench book {i}', author='Author', isbn=f'bench-{i}', category='fiction',
+                 total_copies=2, available_copies=2)
+            for i in range(rows)
+        ])
+        labs = Lab.objects.bulk_create([Lab(lab_number=f'Bench {i}', capacity=30) for i in range(50)])
+        LabBooking.objects.bulk_create([
+            LabBooking(lab=labs[i % 50], teacher=teacher, date=date(2026, 11, 2), start_time=clock(9), end_time=clock(10),
+                       requirements='Microscopes')
+            for i, teacher in enumerate(teachers)
+        ])
+
+    def best(self, function, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            output = function()
+            timings.append(time.perf_counter() - started)
+        return min(timings), output
+
+    def compare(self, label, queryset, serializer_class, repeat):
+        mapper = compile_mapper(serializer_class())
+        context = {'response': SimpleNamespace(row_mapper=mapper)}
+
+        def slow():
+            return JSONRenderer().render(serializer_class(list(queryset), many=True).data)
+
+        def fast():
+            rows = mapper.rows(queryset.values(*dict.fromkeys(mapper.columns)))
+            return FastJSONRenderer().render(rows, renderer_context=context)
+
+        count = queryset.count()
+        slow_time, expected = self.best(slow, repeat)
+        fast_time, output = self.best(fast, repeat)
+        if output != expected:
+            self.stderr.write(self.style.ERROR(f'{label}: fast path output differs'))
+            return
+        self.stdout.write(
+            f'{label}: {count} rows, serializer {slow_time / count * 1e6:.1f}us/row, '
+            f'values() {fast_time / count * 1e6:.1f}us/row, {slow_time / fast_time:.1f}x faster'
+        )
@@ -0,0 +1,121 @@
+import base64
+import json
+from functools import reduce
+from operator import or_
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+class KeysetPagination(BasePagination):
+    """Forward-only keyset pagination over a unique, indexed ordering.
+
+    The cursor stores the ordering values of the last row served, so each
+    page is a single range scan on the index however deep the client pages,
+    unlike OFFSET which reads and discards every earlier row.
+
+    Views without a ``created_at`` column set ``keyset_ordering``, which
+    may name annotations of the view's queryset as well as columns. Counting
+    the whole result is opt-in with ``?count=true``, which adds an
+    X-Total-Count header.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = api_settings.PAGE_SIZE or 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_ordering(self, view):
+        return getattr(view, 'keyset_ordering', self.ordering)
+
+    def cursor_field(self, queryset, name):
+        # Orderings may use an annotation, such as a Coalesce giving NULLs a sort key
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field
+        return queryset.model._meta.get_field(name)
+
+    def decode_cursor(self, request, queryset, fields):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            if len(values) != len(fields):
+                raise ValueError
+            return [self.cursor_field(queryset, name).to_python(value) for name, value in zip(fields, values)]
+        except (TypeError, ValueError, UnicodeDecodeError, json.JSONDecodeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row, fields):
+        values = []
+        for name in fields:
+            value = row[name] if isinstance(row, dict) else getattr(row, name)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def after_cursor(self, fields, descending, values):
+        # (a, b) > (x, y)  <=>  a > x OR (a = x AND b > y), and so on
+        lookup = 'lt' if descending else 'gt'
+        clauses = []
+        for index, name in enumerate(fields):
+            equal = {field: value for field, value in zip(fields[:index], values[:index])}
+            clauses.append(Q(**equal, **{f'{name}__{lookup}': values[index]}))
+        return reduce(or_, clauses)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering = self.get_ordering(view)
+        fields = [name.lstrip('-') for name in ordering]
+        descending = ordering[0].startswith('-')
+        self.page_size_value = self.get_page_size(request)
+        self.request = request
+
+        queryset = queryset.order_by(*ordering)
+        self.total = None
+        if request.query_params.get(self.count_query_param, '').lower() in ('1', 'true'):
+            self.total = queryset.count()
+        values = self.decode_cursor(request, queryset, fields)
+        if values is not None:
+            queryset = queryset.filter(self.after_cursor(fields, descending, values))
+
+        rows = list(queryset[:self.page_size_value + 1])
+        self.has_next = len(rows) > self.page_size_value
+        rows = rows[:self.page_size_value]
+        self.next_cursor = self.encode_cursor(rows[-1], fields) if self.has_next else None
+        return rows
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        headers = {'X-Total-Count': str(self.total)} if self.total is not None else None
+        return Response({
+            'next': self.get_next_link(),
+            'previous': None,
+            'results': data,
+        }, headers=headers)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
 from datetime import timedelta
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -28,6 +29,9 @@ INSTALLED_APPS = [
     'store',
     'library',
     'users',
+    'admin_dashboard',
+    'reports',
+    'activities',
 ]
 
 MIDDLEWARE = [
@@ -65,9 +69,73 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Take the write lock at BEGIN so concurrent writers queue on the
+            # busy timeout instead of failing with "database is locked"
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
+        # A file rather than shared-cache memory, which only has table locks
+        # and cannot run the concurrency tests
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
+# Backend of the versioned response cache (srm.cache): 'file' serves every
+# process on one node, 'redis' every node sharing a Redis-compatible server
+# at API_CACHE_LOCATION and 'locmem' a single process; 'dummy' turns it off.
+# Tests run with it off, see srm.test_runner.
+API_CACHE_BACKEND = os.getenv('API_CACHE_BACKEND', 'file')
+# Each process keeps its own locmem cache and never sees the version bumps
+# of the others, so it would serve stale responses behind several workers
+if API_CACHE_BACKEND == 'locmem' and int(os.getenv('WEB_CONCURRENCY', '1')) > 1:
+    raise ImproperlyConfigured(
+        "API_CACHE_BACKEND=locmem only serves one process; use 'file' or 'redis' with WEB_CONCURRENCY > 1"
+    )
+API_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'srm-api',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('API_CACHE_LOCATION', str(BASE_DIR / 'api_cache')),
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('API_CACHE_LOCATION', 'redis://127.0.0.1:6379/1'),
+    },
+    'dummy': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
+}
+
+# Hit and miss counters of the response cache, on the same backend but
+# apart from the responses, so culling responses never resets them
+API_CACHE_STATS_OPTIONS = {
+    'locmem': {'LOCATION': 'srm-api-stats'},
+    'file': {'LOCATION': f"{API_CACHE_BACKENDS['file']['LOCATION']}-stats"},
+    'redis': {'KEY_PREFIX': 'stats'},
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'api': {
+        **API_CACHE_BACKENDS[API_CACHE_BACKEND],
+        'TIMEOUT': 300,
+    },
+    'api_stats': {
+        **API_CACHE_BACKENDS[API_CACHE_BACKEND],
+        **API_CACHE_STATS_OPTIONS.get(API_CACHE_BACKEND, {}),
+        'TIMEOUT': None,
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -93,13 +161,17 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'users.User' 
 
+TEST_RUNNER = 'srm.test_runner.TestRunner'
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'srm.auth.CustomJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
-    )
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'srm.pagination.KeysetPagination',
+    'PAGE_SIZE': 20,
 }
 
 SIMPLE_JWT = {
@@ -108,4 +180,14 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
 }
 
-CORS_ALLOW_ALL_ORIGINS = True
\ No newline at end of file
+CORS_ALLOW_ALL_ORIGINS = True
+CORS_EXPOSE_HEADERS = ['X-Total-Count']
+
+# Active loans allowed per borrower type unless a borrower has their own limit
+LIBRARY_LOAN_LIMITS = {
+    'student': 3,
+    'teacher': 10,
+}
+
+# Days between placing a store order and the stock arriving
+STORE_REORDER_LEAD_DAYS = 7
@@ -0,0 +1,10 @@
+from django.dispatch import Signal
+
+# Sent after bulk_create() or queryset update() calls, which bypass
+# post_save. Receivers get the affected ``instances`` (already carrying
+# their new values and primary keys), whether they were ``created`` and,
+# like post_save, the ``update_fields`` written when that is known.
+# Updates may also pass ``previous``, mapping primary keys to the old
+# values of changed fields, for receivers that keep running totals; a
+# field left out is taken as unchanged.
+bulk_saved = Signal()
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """Runs the tests with the response cache turned off.
+
+    Writes a test rolls back still bump the cached versions, so entries
+    would outlive the rows they were built from. The cache tests turn it
+    back on with override_settings.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._api_cache_off = override_settings(CACHES={
+            **settings.CACHES,
+            'api': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+            'api_stats': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+        })
+        self._api_cache_off.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._api_cache_off.disable()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,338 @@
+import csv
+import io
+import json
+from datetime import date, time, timedelta
+from unittest import mock
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.test import APIClient
+from users.models import User
+from labs.models import Lab, LabBooking
+from resources.models import ResourceRequest
+from store.models import InventoryItem, LowStockEvent, StockMovement
+from library.models import Book, Borrower, BorrowRecord
+from activities.models import ActivityEvent
+from library.serializers import BookSerializer
+from . import cache as api_cache
+from .fastpath import compile_mapper
+
+
+class QueryCountTests(TestCase):
+    """Every list and detail endpoint costs the same number of queries
+    however many rows it returns."""
+
+    SIZES = (10, 100, 1000)
+
+    # url: queries; the overdue list also reads its summary and the history its borrower
+    ENDPOINTS = {
+        '/api/auth/users/': 1,
+        '/api/resources/requests/': 1,
+        '/api/resources/requests/recent/': 1,
+        '/api/resources/requests/{request}/': 1,
+        '/api/labs/': 1,
+        '/api/labs/available/': 1,
+        '/api/labs/bookings/': 1,
+        '/api/labs/bookings/recent/': 1,
+        '/api/labs/bookings/{booking}/': 1,
+        '/api/store/inventory/': 1,
+        '/api/store/inventory/{item}/': 1,
+        '/api/store/low-stock/': 1,
+        '/api/store/low-stock/events/': 1,
+        '/api/store/inventory/{item}/movements/': 1,
+        '/api/library/books/': 1,
+        '/api/library/books/{book}/': 1,
+        '/api/library/borrows/': 1,
+        '/api/library/borrows/active/': 1,
+        '/api/library/borrows/overdue/': 2,
+        '/api/library/borrowers/': 1,
+        '/api/library/borrowers/{borrower}/history/': 2,
+        '/api/labs/bookings/?fields=date,status&expand=lab': 1,
+        '/api/resources/requests/?fields=status,teacher': 1,
+        '/api/library/borrows/?expand=book': 1,
+        '/api/activities/recent/': 1,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin', role='admin')
+        cls.borrower = Borrower.objects.create(name='Jane Doe', borrower_type='student')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def grow(self, start, size):
+        """Add rows to every table so each goes from ``start`` to ``size`` rows."""
+        count = size - start
+        names = range(start, size)
+        teachers = User.objects.bulk_create([User(username=f'teacher{i}', role='teacher') for i in names])
+        labs = Lab.objects.bulk_create([Lab(lab_number=f'L{i}', capacity=30) for i in names])
+        LabBooking.objects.bulk_create([
+            LabBooking(
+                lab=lab, teacher=teacher, date=date(2026, 11, 2), start_time=time(9), end_time=time(10),
+                requirements='Projector',
+            )
+            for lab, teacher in zip(labs, teachers)
+        ])
+        items = InventoryItem.objects.bulk_create([
+            InventoryItem(
+                name=f'Item {i}', normalized_name=f'item {i}', category='stationery', quantity=1, threshold=5,
+                department='Science', low_stock=True,
+            )
+            for i in names
+        ])
+        StockMovement.objects.bulk_create([
+            StockMovement(item=items[0], kind='consume', change=-1, quantity_after=1) for _ in range(count)
+        ])
+        LowStockEvent.objects.bulk_create([
+            LowStockEvent(item=item, entered=True, quantity=1, threshold=5, department='Science') for item in items
+        ])
+        ResourceRequest.objects.bulk_create([
+            ResourceRequest(teacher=teacher, resource_type='stationery', resource_name=item.name, quantity=1, item=item)
+            for teacher, item in zip(teachers, items)
+        ])
+        books = Book.objects.bulk_create([
+            Book(title=f'Book {i}', author='Author', isbn=f'isbn-{i}', category='fiction', total_copies=1, available_copies=0)
+            for i in names
+        ])
+        BorrowRecord.objects.bulk_create([
+            BorrowRecord(
+                book=book, borrower=self.borrower, borrower_name='Jane Doe', borrower_type='student',
+                due_date=date.today() - timedelta(days=3),
+            )
+            for book in books
+        ])
+        ActivityEvent.objects.bulk_create([
+            ActivityEvent(source='labs.lab', object_id=lab.pk, event='created', action=f'{lab} added') for lab in labs
+        ])
+        self.ids = {
+            'request': ResourceRequest.objects.latest('pk').pk,
+            'booking': LabBooking.objects.latest('pk').pk,
+            'item': items[0].pk,
+            'book': books[0].pk,
+            'borrower': self.borrower.pk,
+        }
+
+    def test_query_counts_do_not_grow_with_rows(self):
+        previous = 0
+        for size in self.SIZES:
+            self.grow(previous, size)
+            previous = size
+            for url, queries in self.ENDPOINTS.items():
+                url = url.format(**self.ids)
+                with self.subTest(size=size, url=url), self.assertNumQueries(queries):
+                    response = self.client.get(url)
+                    self.assertEqual(response.status_code, 200)
+
+
+class PaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin', role='admin')
+        for i in range(25):
+            InventoryItem.objects.create(name=f'Item {i:02}', category='stationery', quantity=i, threshold=0)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_cursor_walks_every_row_once(self):
+        names, url = [], '/api/store/inventory/?page_size=10'
+        while url:
+            response = self.client.get(url)
+            names += [row['name'] for row in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(names, [f'Item {i:02}' for i in range(25)])
+
+    def test_total_count_is_opt_in(self):
+        response = self.client.get('/api/store/inventory/')
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertNotIn('X-Total-Count', response)
+        response = self.client.get('/api/store/inventory/?count=true&page_size=5')
+        self.assertEqual(response['X-Total-Count'], '25')
+
+    def test_stock_at_is_paginated(self):
+        response = self.client.get('/api/store/inventory/stock-at/', {'at': '2030-01-01T00:00:00Z', 'page_size': 10})
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertIn('at', response.data)
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 10)
+
+
+class FastListTests(TestCase):
+    """The values() fast path renders exactly what the serializers do."""
+
+    URLS = [
+        '/api/auth/users/',
+        '/api/labs/',
+        '/api/labs/bookings/',
+        '/api/labs/bookings/?fields=date,teacher&expand=lab',
+        '/api/resources/requests/',
+        '/api/resources/requests/?expand=teacher',
+        '/api/store/inventory/?count=true',
+        '/api/library/books/?page_size=2',
+        '/api/library/borrows/',
+        '/api/library/borrows/active/?fields=due_date,book',
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin', role='admin', first_name='Zoë   "quoted"')
+        lab = Lab.objects.create(lab_number='Lab ½', capacity=30, equipment='Bunsen\nburners')
+        LabBooking.objects.create(
+            lab=lab, teacher=cls.admin, date=date(2026, 11, 2), start_time=time(9, 30), end_time=time(10),
+            requirements='Microscopes  ', attendees=None,
+        )
+        item = InventoryItem.objects.create(name='Pens', category='stationery', quantity=10, threshold=5)
+        ResourceRequest.objects.create(teacher=cls.admin, resource_type='stationery', resource_name='Pens', quantity=2, item=item)
+        ResourceRequest.objects.create(teacher=cls.admin, resource_type='stationery', resource_name='Glue', quantity=1)
+        borrower = Borrower.objects.create(name='Jane Doe', borrower_type='student')
+        for i in range(3):
+            book = Book.objects.create(title=f'Book {i} 🚀', author='Author', isbn=f'isbn-{i}', category='fiction', total_copies=2)
+            BorrowRecord.objects.create(
+                book=book, borrower=borrower, borrower_name='Jane Doe', borrower_type='student',
+                due_date=date(2026, 11, 9),
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_output_is_byte_identical(self):
+        for url in self.URLS:
+            with self.subTest(url=url):
+                fast = self.client.get(url)
+                with mock.patch('srm.fastpath.compile_mapper', return_value=None):
+                    slow = self.client.get(url)
+                self.assertEqual(fast.status_code, 200)
+                self.assertTrue(hasattr(fast, 'row_mapper'))
+                self.assertEqual(fast.content, slow.content)
+                self.assertEqual(fast.get('X-Total-Count'), slow.get('X-Total-Count'))
+
+    def test_datetimes_follow_active_timezone(self):
+        with timezone.override('Africa/Nairobi'):
+            fast = self.client.get('/api/library/books/')
+            with mock.patch('srm.fastpath.compile_mapper', return_value=None):
+                slow = self.client.get('/api/library/books/')
+        self.assertIn(b'+03:00', fast.content)
+        self.assertEqual(fast.content, slow.content)
+
+    def test_unmappable_serializer_falls_back(self):
+        serializer = BookSerializer()
+        serializer.fields['summary'] = serializers.SerializerMethodField()
+        self.assertIsNone(compile_mapper(serializer))
+
+
+class ExportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin', role='admin', first_name='=SUM(A1)')
+        lab = Lab.objects.create(lab_number='101', capacity=30)
+        for day, status in enumerate(['pending', 'approved', 'approved']):
+            LabBooking.objects.create(
+                lab=lab, teacher=cls.admin, date=date(2026, 11, 2 + day), start_time=time(9), end_time=time(10),
+                requirements='Microscopes, slides', status=status,
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def content(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_flattens_relations_and_applies_filters(self):
+        response = self.client.get('/api/labs/bookings/', {'format': 'csv', 'status': 'approved', 'page_size': 1})
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        rows = list(csv.DictReader(io.StringIO(self.content(response))))
+        self.assertEqual([row['date'] for row in rows], ['2026-11-04', '2026-11-03'])
+        self.assertEqual(rows[0]['lab.lab_number'], '101')
+        self.assertEqual(rows[0]['requirements'], 'Microscopes, slides')
+        self.assertEqual(rows[0]['teacher.first_name'], "'=SUM(A1)")
+
+    def test_ndjson_streams_one_object_per_row(self):
+        response = self.client.get('/api/labs/bookings/', {'format': 'ndjson', 'fields': 'date,status'})
+        lines = [json.loads(line) for line in self.content(response).splitlines()]
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(set(lines[0]), {'id', 'date', 'status'})
+
+    def test_csv_header_is_sent_before_the_query(self):
+        response = self.client.get('/api/labs/bookings/', {'format': 'csv', 'status': 'rejected'})
+        chunks = iter(response.streaming_content)
+        with self.assertNumQueries(0):
+            header = next(chunks).decode()
+        self.assertTrue(header.startswith('id,'))
+        self.assertEqual(b''.join(chunks), b'')
+
+    def test_personal_data_exports_need_a_staff_role(self):
+        self.client.force_authenticate(User.objects.create(username='teacher', role='teacher'))
+        for url in ['/api/auth/users/', '/api/library/borrows/', '/api/library/borrowers/']:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url, {'format': 'csv'}).status_code, 403)
+                self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.client.get('/api/labs/bookings/', {'format': 'csv'}).status_code, 200)
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'api': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'api-cache-tests'},
+    'api_stats': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'api-cache-stats-tests'},
+})
+class ResponseCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin', role='admin')
+        cls.item = InventoryItem.objects.create(name='Pens', category='stationery', quantity=10, threshold=5)
+
+    def setUp(self):
+        api_cache.get_cache().clear()
+        caches[api_cache.STATS_ALIAS].clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_repeated_reads_skip_the_database(self):
+        self.client.get('/api/store/inventory/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/store/inventory/')
+        self.assertEqual(response.data['results'][0]['quantity'], 10)
+        # Other parameters are a separate entry
+        with self.assertNumQueries(1):
+            self.client.get('/api/store/inventory/', {'page_size': 5})
+
+    def test_writes_invalidate(self):
+        self.client.get('/api/store/inventory/')
+        self.client.patch(f'/api/store/inventory/{self.item.pk}/consume/', {'amount': 4}, format='json')
+        self.assertEqual(self.client.get('/api/store/inventory/').data['results'][0]['quantity'], 6)
+
+        Lab.objects.create(lab_number='101', capacity=30)
+        self.assertEqual(len(self.client.get('/api/labs/').data['results']), 1)
+        Lab.objects.all().delete()
+        self.assertEqual(self.client.get('/api/labs/').data['results'], [])
+
+    def test_stats_count_hits_and_misses(self):
+        for _ in range(3):
+            self.client.get('/api/labs/')
+        stats = self.client.get('/api/admin/cache/').data
+        self.assertEqual(stats['views']['labs.views.LabListCreateView'], {'hits': 2, 'misses': 1})
+        self.assertEqual(stats['backend'], 'LocMemCache')
+
+    def test_only_cached_models_bump_versions(self):
+        teacher = User.objects.create(username='teacher', role='teacher')
+        with mock.patch.object(api_cache, 'bump_versions') as bump:
+            ResourceRequest.objects.create(teacher=teacher, resource_type='stationery', resource_name='Pens', quantity=1)
+            self.assertFalse(bump.called)
+            Lab.objects.create(lab_number='101', capacity=30)
+            self.assertEqual(bump.call_args_list, [mock.call(Lab)])
+
+    def test_stats_survive_culled_responses(self):
+        self.client.get('/api/labs/')
+        api_cache.get_cache().clear()
+        self.client.get('/api/labs/')
+        stats = self.client.get('/api/admin/cache/').data
+        self.assertEqual(stats['views']['labs.views.LabListCreateView'], {'hits': 0, 'misses': 2})
+
@@ -0,0 +1,70 @@
+from django.db import transaction
+from django_filters.filterset import filterset_factory
+from rest_framework import serializers
+from .signals import bulk_saved
+
+class BulkTransitionSerializer(serializers.Serializer):
+    """Target status plus either explicit ``ids`` or a ``filter`` using the
+    same lookups as the list endpoint."""
+    status = serializers.CharField(max_length=20)
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False, max_length=1000)
+    filter = serializers.DictField(required=False, allow_empty=False)
+
+    def validate(self, attrs):
+        if ('ids' in attrs) == ('filter' in attrs):
+            raise serializers.ValidationError("Give exactly one of ids or filter")
+        return attrs
+
+def check_transition(transitions, current, target):
+    """Raise ValidationError unless ``transitions`` ({target: sources}, as
+    the bulk endpoints use) allows moving one row from ``current`` to ``target``."""
+    if target != current and current not in transitions.get(target, ()):
+        raise serializers.ValidationError({'status': f"Cannot move from {current!r} to {target!r}"})
+
+def transition_targets(model, data, filter_fields):
+    """Rows named by ``data['ids']`` or matched by ``data['filter']``."""
+    queryset = model.objects.all()
+    if 'ids' in data:
+        return queryset.filter(pk__in=data['ids'])
+    filterset = filterset_factory(model, fields=filter_fields)(data=data['filter'], queryset=queryset)
+    # An unknown key would otherwise be ignored and match every row
+    unknown = sorted(set(data['filter']) - set(filterset.filters))
+    if unknown:
+        raise serializers.ValidationError({'filter': f"Unknown filter fields: {', '.join(unknown)}"})
+    if not filterset.is_valid():
+        raise serializers.ValidationError({'filter': filterset.errors})
+    return filterset.qs
+
+def bulk_transition(queryset, target, sources, related=(), **values):
+    """Move the rows of ``queryset`` whose status is in ``sources`` to
+    ``target`` with a single UPDATE of exactly the rows locked and checked.
+
+    Returns (moved ids, {id: status} for matched rows left alone). Extra
+    ``values`` are written by the same UPDATE.
+    """
+    with transaction.atomic():
+        current = dict(queryset.select_for_update().values_list('pk', 'status'))
+        moved = sorted(pk for pk, status in current.items() if status in sources)
+        skipped = {pk: status for pk, status in current.items() if status not in sources}
+        if moved:
+            # Not the queryset again: rows inserted since the read would match
+            # it and change without bulk_saved
+            queryset.model.objects.filter(pk__in=moved).update(status=target, **values)
+            instances = list(queryset.model.objects.filter(pk__in=moved).select_related(*related))
+            bulk_saved.send(
+                sender=queryset.model, instances=instances, created=False, update_fields=['status', *values],
+                previous={pk: {'status': current[pk]} for pk in moved},
+            )
+    return moved, skipped
+
+def transition_response(target, moved, skipped, data):
+    response = {
+        'status': target,
+        'updated': len(moved),
+        'ids': moved,
+        'skipped': [{'id': pk, 'status': status} for pk, status in sorted(skipped.items())],
+    }
+    if 'ids' in data:
+        found = set(moved) | set(skipped)
+        response['not_found'] = [pk for pk in dict.fromkeys(data['ids']) if pk not in found]
+    return response
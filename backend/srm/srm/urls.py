@@ -15,6 +15,8 @@ urlpatterns = [
     path('api/store/', include('store.urls')),
     path('api/library/', include('library.urls')),
     path('api/admin/', include('admin_dashboard.urls')),
+    path('api/reports/', include('reports.urls')),
+    path('api/activities/', include('activities.urls')),
     path('api/token/', TokenObtainPairView.as_view(serializer_class=CustomTokenObtainPairSerializer), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('', api_root, name='api_root'), #welcome screen for the API
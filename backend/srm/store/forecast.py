@@ -0,0 +1,144 @@
+import math
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from sklearn.linear_model import Ridge
+from resources.models import ResourceRequest
+from .models import DailyItemConsumption, ForecastRun, InventoryItem, ReorderSuggestion, StockMovement
+from .stock import COMMIT_LAG
+
+HISTORY_DAYS = 182
+HORIZON_DAYS = 14
+WINDOWS = (7, 28, 91)
+TRAINING_STEP_DAYS = 7
+SERVICE_LEVEL_Z = 1.65  # about 95% of lead times without a stock-out
+
+def roll_up_consumption(since):
+    """Recompute the daily rollup for the days that have consume movements
+    created after ``since``, or every day when it is None.
+
+    Returns the next run's starting point. Movements are stamped before
+    their transaction commits, so it trails now by COMMIT_LAG and the next
+    run looks again at anything that might not have been visible yet.
+    """
+    watermark = timezone.now() - COMMIT_LAG
+    movements = StockMovement.objects.filter(kind='consume')
+    if since is not None:
+        movements = movements.filter(created_at__gt=since)
+    days = set(movements.annotate(day=TruncDate('created_at')).values_list('day', flat=True).distinct())
+    if not days:
+        return watermark
+
+    totals = (
+        StockMovement.objects.filter(kind='consume').annotate(day=TruncDate('created_at'))
+        .filter(day__in=days).values('item_id', 'day').annotate(total=Sum('change'))
+    )
+    with transaction.atomic():
+        DailyItemConsumption.objects.filter(day__in=days).delete()
+        DailyItemConsumption.objects.bulk_create(
+            [DailyItemConsumption(item_id=row['item_id'], day=row['day'], quantity=-row['total']) for row in totals],
+            batch_size=1000,
+        )
+    return watermark
+
+def _consumption_matrix(item_ids, start, days):
+    """Items x days array of consumed quantities, zero where nothing moved."""
+    df = pd.DataFrame.from_records(
+        list(DailyItemConsumption.objects.filter(day__gte=start).values_list('item_id', 'day', 'quantity')),
+        columns=['item_id', 'day', 'quantity'],
+    )
+    matrix = np.zeros((len(item_ids), days))
+    if df.empty:
+        return matrix
+    rows = pd.Index(item_ids).get_indexer(df['item_id'])
+    cols = (pd.to_datetime(df['day']) - pd.Timestamp(start)).dt.days.to_numpy()
+    keep = (rows >= 0) & (cols < days)
+    np.add.at(matrix, (rows[keep], cols[keep]), df['quantity'].to_numpy()[keep])
+    return matrix
+
+def _features(matrix, end, departments):
+    """Mean daily use over each window ending at day ``end``, plus the
+    mean 28-day rate of the item's department."""
+    rates = [matrix[:, max(0, end - window):end].mean(axis=1) for window in WINDOWS]
+    department_rate = pd.Series(rates[1]).groupby(departments).transform('mean').to_numpy()
+    return np.column_stack(rates + [department_rate])
+
+def fit_rates(matrix, departments):
+    """Forecast mean daily use over the next HORIZON_DAYS for every item.
+
+    One ridge regression is fitted across all items on weekly cutoffs of
+    the history, learning how recent, medium and long-run item rates and
+    the department rate predict the following weeks. Too little history
+    falls back to the 28-day rate.
+    """
+    days = matrix.shape[1]
+    cutoffs = range(WINDOWS[1], days - HORIZON_DAYS + 1, TRAINING_STEP_DAYS)
+    current = _features(matrix, days, departments)
+    if len(cutoffs) < 2 or not matrix.any():
+        return current[:, 1], current[:, 3]
+
+    X = np.vstack([_features(matrix, end, departments) for end in cutoffs])
+    y = np.concatenate([matrix[:, end:end + HORIZON_DAYS].mean(axis=1) for end in cutoffs])
+    model = Ridge(alpha=1.0, positive=True, fit_intercept=False).fit(X, y)
+    return np.clip(model.predict(current), 0, None), current[:, 3]
+
+def _pending_demand(item_ids):
+    pending = dict.fromkeys(item_ids, 0)
+    rows = ResourceRequest.objects.filter(status='pending', item__isnull=False).values_list('item').annotate(total=Sum('quantity'))
+    for item_id, total in rows:
+        pending[item_id] = total
+    return pending
+
+def forecast(today=None):
+    """Roll up new ledger movements and rebuild every reorder suggestion.
+
+    Returns the ForecastRun recorded for this pass.
+    """
+    today = today or timezone.localdate()
+    previous = ForecastRun.objects.order_by('-pk').first()
+    rolled_up_until = roll_up_consumption(previous.rolled_up_until if previous else None)
+
+    items = list(InventoryItem.objects.order_by('pk').values_list('pk', 'name', 'department', 'quantity'))
+    item_ids = [item[0] for item in items]
+    start = today - timedelta(days=HISTORY_DAYS)
+    matrix = _consumption_matrix(item_ids, start, HISTORY_DAYS)
+    departments = [item[2] for item in items]
+    rates, department_rates = fit_rates(matrix, departments)
+    spread = matrix[:, -WINDOWS[1]:].std(axis=1)
+    pending = _pending_demand(item_ids)
+
+    lead_days = settings.STORE_REORDER_LEAD_DAYS
+    now = timezone.now()
+    suggestions = []
+    for index, (pk, _name, _department, quantity) in enumerate(items):
+        rate = float(rates[index])
+        safety_stock = math.ceil(SERVICE_LEVEL_Z * spread[index] * math.sqrt(lead_days))
+        reorder_point = math.ceil(rate * lead_days) + safety_stock
+        available = quantity - pending[pk]
+        days_of_cover = max(available, 0) / rate if rate > 0 else None
+        if available <= reorder_point and (rate > 0 or available < 0):
+            reorder_date = today
+        elif rate > 0:
+            reorder_date = today + timedelta(days=math.floor((available - reorder_point) / rate))
+        else:
+            reorder_date = None
+        suggestions.append(ReorderSuggestion(
+            item_id=pk, daily_rate=rate, department_rate=float(department_rates[index]),
+            pending_demand=pending[pk], safety_stock=safety_stock, reorder_point=reorder_point,
+            reorder_date=reorder_date, days_of_cover=days_of_cover, computed_at=now,
+        ))
+
+    with transaction.atomic():
+        ReorderSuggestion.objects.bulk_create(
+            suggestions, batch_size=1000, update_conflicts=True, unique_fields=['item'],
+            update_fields=[
+                'daily_rate', 'department_rate', 'pending_demand', 'safety_stock',
+                'reorder_point', 'reorder_date', 'days_of_cover', 'computed_at',
+            ],
+        )
+        return ForecastRun.objects.create(rolled_up_until=rolled_up_until, items=len(suggestions))
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from store.stock import take_snapshot
+
+class Command(BaseCommand):
+    help = 'Snapshot every inventory quantity for point-in-time stock queries; run nightly'
+
+    def handle(self, *args, **options):
+        snapshots = take_snapshot()
+        self.stdout.write(self.style.SUCCESS(f'Snapshotted {len(snapshots)} inventory items'))
@@ -0,0 +1,29 @@
+import difflib
+from .models import InventoryItem, normalize_name
+
+MATCH_CUTOFF = 0.75
+
+def match_item(name):
+    """The inventory item a free-text resource name most likely means.
+
+    Returns (item id, score) with score 1.0 for an exact match of the
+    normalized name, or (None, None) when nothing is close enough. Both
+    lookups use the normalized_name index: fuzzy candidates are limited to
+    names with the same first letter.
+    """
+    normalized = normalize_name(name)
+    if not normalized:
+        return None, None
+    exact = InventoryItem.objects.filter(normalized_name=normalized).order_by('pk').values_list('pk', flat=True).first()
+    if exact is not None:
+        return exact, 1.0
+
+    candidates = dict(
+        InventoryItem.objects.filter(normalized_name__startswith=normalized[0])
+        .order_by('-pk').values_list('normalized_name', 'pk')
+    )
+    matches = difflib.get_close_matches(normalized, candidates, n=1, cutoff=MATCH_CUTOFF)
+    if not matches:
+        return None, None
+    score = difflib.SequenceMatcher(None, normalized, matches[0]).ratio()
+    return candidates[matches[0]], round(score, 3)
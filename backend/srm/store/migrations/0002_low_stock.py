@@ -0,0 +1,58 @@
+# Generated by Django 5.1.7 on 2026-10-18 13:39
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Case, F, Value, When
+
+
+def set_low_stock(apps, schema_editor):
+    InventoryItem = apps.get_model('store', 'InventoryItem')
+    InventoryItem.objects.update(
+        low_stock=Case(When(threshold__gte=F('quantity'), then=Value(True)), default=Value(False))
+    )
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LowStockEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entered', models.BooleanField()),
+                ('quantity', models.PositiveIntegerField()),
+                ('threshold', models.PositiveIntegerField()),
+                ('department', models.CharField(max_length=100)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='inventoryitem',
+            name='low_stock',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(condition=models.Q(('low_stock', True)), fields=['department'], name='inventory_low_stock_idx'),
+        ),
+        migrations.AddField(
+            model_name='lowstockevent',
+            name='item',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='low_stock_events', to='store.inventoryitem'),
+        ),
+        migrations.AddIndex(
+            model_name='lowstockevent',
+            index=models.Index(fields=['created_at', 'id'], name='low_stock_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lowstockevent',
+            index=models.Index(fields=['department', 'created_at'], name='low_stock_department_idx'),
+        ),
+        migrations.RunPython(set_low_stock, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.1.7 on 2026-10-18 13:41
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def seed_snapshot(apps, schema_editor):
+    # Quantities before the ledger existed become its starting point
+    InventoryItem = apps.get_model('store', 'InventoryItem')
+    StockSnapshot = apps.get_model('store', 'StockSnapshot')
+    taken_at = timezone.now()
+    StockSnapshot.objects.bulk_create(
+        [StockSnapshot(item_id=pk, quantity=quantity, taken_at=taken_at)
+         for pk, quantity in InventoryItem.objects.values_list('pk', 'quantity').iterator()],
+        batch_size=1000,
+    )
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0002_low_stock'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('opening', 'Opening'), ('restock', 'Restock'), ('consume', 'Consume'), ('adjust', 'Adjust')], max_length=20)),
+                ('change', models.IntegerField()),
+                ('quantity_after', models.PositiveIntegerField()),
+                ('note', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movements', to='store.inventoryitem')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['item', 'created_at', 'id'], name='stock_movement_item_idx'), models.Index(fields=['created_at', 'id'], name='stock_movement_feed_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField()),
+                ('taken_at', models.DateTimeField()),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='store.inventoryitem')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('item', 'taken_at'), name='unique_stock_snapshot')],
+            },
+        ),
+        migrations.RunPython(seed_snapshot, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.1.7 on 2026-10-18 13:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0003_stock_ledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForecastRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rolled_up_until', models.DateTimeField(null=True)),
+                ('items', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyItemConsumption',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('quantity', models.PositiveIntegerField()),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_consumption', to='store.inventoryitem')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day'], name='daily_consumption_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('item', 'day'), name='unique_daily_item_consumption')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReorderSuggestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('daily_rate', models.FloatField()),
+                ('department_rate', models.FloatField()),
+                ('pending_demand', models.PositiveIntegerField()),
+                ('safety_stock', models.PositiveIntegerField()),
+                ('reorder_point', models.PositiveIntegerField()),
+                ('reorder_date', models.DateField(blank=True, null=True)),
+                ('days_of_cover', models.FloatField(blank=True, null=True)),
+                ('computed_at', models.DateTimeField()),
+                ('item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='reorder', to='store.inventoryitem')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['reorder_date'], name='reorder_date_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.7 on 2026-10-18 13:48
+
+from django.db import migrations, models
+
+
+def normalize_names(apps, schema_editor):
+    InventoryItem = apps.get_model('store', 'InventoryItem')
+    items = list(InventoryItem.objects.only('pk', 'name'))
+    for item in items:
+        item.normalized_name = ' '.join(item.name.split()).casefold()
+    InventoryItem.objects.bulk_update(items, ['normalized_name'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0004_reorder_forecast'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventoryitem',
+            name='normalized_name',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255),
+            preserve_default=False,
+        ),
+        migrations.RunPython(normalize_names, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,9 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
+
+def normalize_name(name):
+    return ' '.join((name or '').split()).casefold()
 
 class InventoryItem(models.Model):
     CATEGORIES = (
@@ -8,11 +13,139 @@ class InventoryItem(models.Model):
         ('other', 'Other'),
     )
     name = models.CharField(max_length=255)
+    normalized_name = models.CharField(max_length=255, editable=False, db_index=True)
     category = models.CharField(max_length=20, choices=CATEGORIES)
     quantity = models.PositiveIntegerField()
     threshold = models.PositiveIntegerField()
     department = models.CharField(max_length=100)
     last_restocked = models.DateTimeField(auto_now=True)
+    # quantity <= threshold, kept in step by save() and every stock UPDATE
+    low_stock = models.BooleanField(default=False, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['department'], condition=models.Q(low_stock=True), name='inventory_low_stock_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.low_stock = self.quantity <= self.threshold
+        self.normalized_name = normalize_name(self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if {'quantity', 'threshold'} & update_fields:
+                update_fields.add('low_stock')
+            if 'name' in update_fields:
+                update_fields.add('normalized_name')
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.name} ({self.category})"
+
+class LowStockEvent(models.Model):
+    """Append-only record of an item entering or leaving low stock."""
+    item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE, related_name='low_stock_events')
+    entered = models.BooleanField()
+    quantity = models.PositiveIntegerField()
+    threshold = models.PositiveIntegerField()
+    department = models.CharField(max_length=100)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='low_stock_feed_idx'),
+            models.Index(fields=['department', 'created_at'], name='low_stock_department_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.pk:
+            raise ValueError("Low stock events are append-only")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.item_id} {'entered' if self.entered else 'left'} low stock ({self.created_at})"
+
+class StockMovement(models.Model):
+    """Append-only ledger of every change to an item's quantity."""
+    KINDS = (
+        ('opening', 'Opening'),
+        ('restock', 'Restock'),
+        ('consume', 'Consume'),
+        ('adjust', 'Adjust'),
+    )
+    item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE, related_name='movements')
+    kind = models.CharField(max_length=20, choices=KINDS)
+    change = models.IntegerField()
+    quantity_after = models.PositiveIntegerField()
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    note = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['item', 'created_at', 'id'], name='stock_movement_item_idx'),
+            models.Index(fields=['created_at', 'id'], name='stock_movement_feed_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.pk:
+            raise ValueError("Stock movements are append-only")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.kind} {self.change:+} {self.item_id} ({self.created_at})"
+
+class StockSnapshot(models.Model):
+    """Every item's quantity at ``taken_at``; point-in-time stock starts here."""
+    item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE, related_name='snapshots')
+    quantity = models.PositiveIntegerField()
+    taken_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['item', 'taken_at'], name='unique_stock_snapshot'),
+        ]
+
+    def __str__(self):
+        return f"{self.item_id}: {self.quantity} at {self.taken_at}"
+
+class DailyItemConsumption(models.Model):
+    """Consumed quantity per item and day, rolled up from the ledger for forecasting."""
+    item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE, related_name='daily_consumption')
+    day = models.DateField()
+    quantity = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['item', 'day'], name='unique_daily_item_consumption'),
+        ]
+        indexes = [
+            models.Index(fields=['day'], name='daily_consumption_day_idx'),
+        ]
+
+class ForecastRun(models.Model):
+    # Consume movements created up to here are in DailyItemConsumption
+    rolled_up_until = models.DateTimeField(null=True)
+    items = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+class ReorderSuggestion(models.Model):
+    """Forecast reorder point and date for an item, rebuilt by forecast_stock."""
+    item = models.OneToOneField(InventoryItem, on_delete=models.CASCADE, related_name='reorder')
+    daily_rate = models.FloatField()
+    department_rate = models.FloatField()
+    pending_demand = models.PositiveIntegerField()
+    safety_stock = models.PositiveIntegerField()
+    reorder_point = models.PositiveIntegerField()
+    reorder_date = models.DateField(null=True, blank=True)
+    days_of_cover = models.FloatField(null=True, blank=True)
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['reorder_date'], name='reorder_date_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.name} ({self.category})"
\ No newline at end of file
+        return f"{self.item_id}: reorder at {self.reorder_point} by {self.reorder_date}"
@@ -1,7 +1,61 @@
 from rest_framework import serializers
-from .models import InventoryItem
+from .models import InventoryItem, LowStockEvent, StockMovement, ReorderSuggestion
 
 class InventoryItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = InventoryItem
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+class LowStockEventSerializer(serializers.ModelSerializer):
+    item_name = serializers.CharField(source='item.name', read_only=True)
+
+    class Meta:
+        model = LowStockEvent
+        fields = '__all__'
+
+class StockMovementSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = StockMovement
+        fields = '__all__'
+
+class StockChangeSerializer(serializers.Serializer):
+    amount = serializers.IntegerField(min_value=1)
+    note = serializers.CharField(max_length=255, required=False, allow_blank=True, default='')
+
+class BulkStockMovementSerializer(serializers.Serializer):
+    class MovementSerializer(serializers.Serializer):
+        item_id = serializers.IntegerField()
+        kind = serializers.ChoiceField(choices=['restock', 'consume'])
+        amount = serializers.IntegerField(min_value=1)
+        note = serializers.CharField(max_length=255, required=False, allow_blank=True, default='')
+
+    movements = MovementSerializer(many=True)
+
+    MAX_MOVEMENTS = 500
+
+    def validate_movements(self, movements):
+        if not movements:
+            raise serializers.ValidationError("No movements to apply")
+        if len(movements) > self.MAX_MOVEMENTS:
+            raise serializers.ValidationError(f"At most {self.MAX_MOVEMENTS} movements per request")
+        for movement in movements:
+            movement['change'] = movement['amount'] if movement['kind'] == 'restock' else -movement['amount']
+        return movements
+
+class StockAtQuerySerializer(serializers.Serializer):
+    at = serializers.DateTimeField()
+    department = serializers.CharField(max_length=100, required=False)
+
+class ReorderSuggestionSerializer(serializers.ModelSerializer):
+    item_name = serializers.CharField(source='item.name', read_only=True)
+    department = serializers.CharField(source='item.department', read_only=True)
+    quantity = serializers.IntegerField(source='item.quantity', read_only=True)
+    threshold = serializers.IntegerField(source='item.threshold', read_only=True)
+
+    class Meta:
+        model = ReorderSuggestion
+        fields = '__all__'
+
+class ReorderQuerySerializer(serializers.Serializer):
+    due_by = serializers.DateField(required=False)
+    department = serializers.CharField(max_length=100, required=False)
@@ -0,0 +1,23 @@
+from django.db.models.signals import pre_save, post_save
+from .models import InventoryItem, StockMovement
+from .stock import crossing_event
+
+def _remember_low_stock(sender, instance, **kwargs):
+    if instance.pk:
+        instance._was_low_stock = sender.objects.filter(pk=instance.pk).values_list('low_stock', flat=True).first()
+
+def _record_crossing(sender, instance, created, **kwargs):
+    was_low = False if created else getattr(instance, '_was_low_stock', None)
+    if was_low is not None and was_low != instance.low_stock:
+        crossing_event(instance).save()
+
+def _record_opening(sender, instance, created, **kwargs):
+    if created:
+        StockMovement.objects.create(
+            item=instance, kind='opening', change=instance.quantity, quantity_after=instance.quantity,
+        )
+
+def connect_signals():
+    pre_save.connect(_remember_low_stock, sender=InventoryItem, dispatch_uid='store_low_stock_pre_save')
+    post_save.connect(_record_crossing, sender=InventoryItem, dispatch_uid='store_low_stock_save')
+    post_save.connect(_record_opening, sender=InventoryItem, dispatch_uid='store_opening_stock')
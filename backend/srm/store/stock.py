@@ -0,0 +1,160 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.db import transaction
+from django.db.models import Case, DateTimeField, Exists, F, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from srm.signals import bulk_saved
+from .models import InventoryItem, LowStockEvent, StockMovement, StockSnapshot
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+# Longest a stock movement's transaction is expected to stay open. Movements
+# are stamped before they commit, so readers that remember how far they got
+# stay this far behind the clock.
+COMMIT_LAG = timedelta(minutes=10)
+
+def low_stock_after(delta=0):
+    """UPDATE expression for low_stock once ``delta`` is added to quantity.
+
+    SQL evaluates every SET expression against the old row, so a statement
+    that moves quantity has to fold the same delta into the flag.
+    """
+    return Case(When(threshold__gte=F('quantity') + delta, then=Value(True)), default=Value(False))
+
+def crossing_event(item):
+    return LowStockEvent(
+        item_id=item.pk, entered=item.low_stock, quantity=item.quantity,
+        threshold=item.threshold, department=item.department,
+    )
+
+def record_crossings(before):
+    """Log an event for every item whose flag differs from ``before``.
+
+    ``before`` maps item ids to their low_stock flag ahead of a bulk UPDATE.
+    """
+    items = InventoryItem.objects.filter(pk__in=before).only('pk', 'low_stock', 'quantity', 'threshold', 'department')
+    return LowStockEvent.objects.bulk_create([
+        crossing_event(item) for item in items if item.low_stock != before[item.pk]
+    ])
+
+def stock_changed(items, before):
+    """``before`` maps item ids to their (quantity, low_stock) ahead of the change."""
+    previous = {pk: {'quantity': quantity, 'low_stock': low_stock} for pk, (quantity, low_stock) in before.items()}
+    bulk_saved.send(
+        sender=InventoryItem, instances=items, created=False, update_fields=['quantity', 'low_stock'], previous=previous,
+    )
+
+# Quantities only move through move_stock() and apply_movements(), which
+# write the item and its ledger rows in the same transaction.
+
+def move_stock(item_id, kind, change, user=None, note=''):
+    """Add ``change`` to an item with one conditional F() UPDATE.
+
+    Returns the refreshed item, or None when the item does not exist or
+    the change would take its quantity below zero.
+    """
+    with transaction.atomic():
+        items = InventoryItem.objects.filter(pk=item_id)
+        if change < 0:
+            items = items.filter(quantity__gte=-change)
+        values = {'quantity': F('quantity') + change, 'low_stock': low_stock_after(change)}
+        if kind == 'restock':
+            values['last_restocked'] = timezone.now()
+        if not items.update(**values):
+            return None
+
+        item = InventoryItem.objects.get(pk=item_id)
+        StockMovement.objects.create(
+            item=item, kind=kind, change=change, quantity_after=item.quantity, user=user, note=note,
+        )
+        was_low = item.quantity - change <= item.threshold
+        if item.low_stock != was_low:
+            crossing_event(item).save()
+        stock_changed([item], {item.pk: (item.quantity - change, was_low)})
+    return item
+
+def _per_row(counts):
+    return Case(*[When(pk=pk, then=Value(amount)) for pk, amount in counts.items()], default=Value(0))
+
+def apply_movements(movements, user=None):
+    """Apply many movements in one transaction, all or nothing.
+
+    ``movements`` are dicts with item_id, kind, change and optional note,
+    applied in order. Returns (ledger rows, errors); nothing is written
+    when any movement fails.
+    """
+    with transaction.atomic():
+        items = InventoryItem.objects.select_for_update().in_bulk({movement['item_id'] for movement in movements})
+        quantities = {pk: item.quantity for pk, item in items.items()}
+        now = timezone.now()
+        ledger, errors = [], []
+        for index, movement in enumerate(movements):
+            item = items.get(movement['item_id'])
+            if item is None:
+                errors.append({'index': index, 'item_id': movement['item_id'], 'error': "Unknown inventory item"})
+                continue
+            after = quantities[item.pk] + movement['change']
+            if after < 0:
+                errors.append({'index': index, 'item_id': item.pk, 'error': "Not enough stock"})
+                continue
+            quantities[item.pk] = after
+            ledger.append(StockMovement(
+                item=item, kind=movement['kind'], change=movement['change'], quantity_after=after,
+                user=user, note=movement.get('note', ''), created_at=now,
+            ))
+        if errors or not ledger:
+            return [], errors
+
+        deltas = {pk: quantities[pk] - items[pk].quantity for pk in {row.item_id for row in ledger}}
+        restocked = {row.item_id for row in ledger if row.kind == 'restock'}
+        before = {pk: items[pk].low_stock for pk in deltas}
+        InventoryItem.objects.filter(pk__in=deltas).update(
+            quantity=F('quantity') + _per_row(deltas),
+            low_stock=low_stock_after(_per_row(deltas)),
+            last_restocked=Case(When(pk__in=restocked, then=Value(now)), default=F('last_restocked')),
+        )
+        StockMovement.objects.bulk_create(ledger)
+        bulk_saved.send(sender=StockMovement, instances=ledger, created=True)
+        record_crossings(before)
+        previous = {pk: (items[pk].quantity, items[pk].low_stock) for pk in deltas}
+        for pk in deltas:
+            items[pk].quantity = quantities[pk]
+            items[pk].low_stock = items[pk].threshold >= quantities[pk]
+        stock_changed([items[pk] for pk in deltas], previous)
+    return ledger, []
+
+def stock_at(when, items=None):
+    """Items that existed at ``when``, annotated with their quantity_at then.
+
+    Each quantity is the item's latest snapshot at or before ``when`` plus
+    the ledger movements after it, so the cost is bounded by the snapshot
+    interval rather than the age of the ledger.
+    """
+    items = InventoryItem.objects.all() if items is None else items
+    snapshots = StockSnapshot.objects.filter(item=OuterRef('pk'), taken_at__lte=when).order_by('-taken_at')
+    items = items.annotate(
+        snapshot_quantity=Subquery(snapshots.values('quantity')[:1]),
+        snapshot_at=Subquery(snapshots.values('taken_at')[:1]),
+    )
+    since_snapshot = StockMovement.objects.filter(
+        item=OuterRef('pk'), created_at__lte=when,
+        created_at__gt=Coalesce(OuterRef('snapshot_at'), Value(EPOCH, output_field=DateTimeField())),
+    )
+    moved = since_snapshot.order_by().values('item').annotate(total=Sum('change')).values('total')
+    existed = Q(snapshot_at__isnull=False) | Exists(StockMovement.objects.filter(item=OuterRef('pk'), created_at__lte=when))
+    return items.filter(existed).annotate(
+        quantity_at=Coalesce(F('snapshot_quantity'), 0) + Coalesce(Subquery(moved), 0),
+    )
+
+def take_snapshot(taken_at=None):
+    """Snapshot every item's quantity as the ledger computes it at ``taken_at``.
+
+    Never later than COMMIT_LAG ago: a movement still committing would be
+    missing from the snapshot, and reads starting from it would never count it.
+    """
+    latest = timezone.now() - COMMIT_LAG
+    taken_at = min(taken_at or latest, latest)
+    rows = stock_at(taken_at).values_list('pk', 'quantity_at')
+    return StockSnapshot.objects.bulk_create(
+        [StockSnapshot(item_id=pk, quantity=quantity, taken_at=taken_at) for pk, quantity in rows.iterator()],
+        batch_size=1000, ignore_conflicts=True,
+    )
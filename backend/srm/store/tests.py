@@ -1,3 +1,180 @@
-from django.test import TestCase
+import threading
+import time
+from datetime import timedelta
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from users.models import User
+from .models import DailyItemConsumption, InventoryItem, LowStockEvent, ReorderSuggestion, StockMovement
+from .forecast import forecast
+from .stock import take_snapshot, stock_at
 
-# Create your tests here.
+
+class ConcurrentStockTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='storekeeper', role='storekeeper')
+        self.item = InventoryItem.objects.create(
+            name='Pens', category='stationery', quantity=10, threshold=5, department='Science',
+        )
+
+    def test_parallel_restock_and_consume_never_lose_updates(self):
+        workers = 20
+        barrier = threading.Barrier(workers)
+        statuses = []
+
+        def worker(index):
+            client = APIClient()
+            client.force_authenticate(self.user)
+            barrier.wait()
+            try:
+                action = 'restock' if index % 2 else 'consume'
+                response = client.patch(f'/api/store/inventory/{self.item.pk}/{action}/', {'amount': 1}, format='json')
+                statuses.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.item.refresh_from_db()
+        self.assertEqual(statuses.count(200), workers)
+        self.assertEqual(self.item.quantity, 10)
+        self.assertEqual(StockMovement.objects.filter(item=self.item).count(), workers + 1)
+
+
+class StockLedgerTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='storekeeper', role='storekeeper'))
+        self.pens = InventoryItem.objects.create(
+            name='Pens', category='stationery', quantity=10, threshold=5, department='Science',
+        )
+        self.desks = InventoryItem.objects.create(
+            name='Desks', category='furniture', quantity=3, threshold=1, department='Art',
+        )
+
+    def move(self, item, action, amount):
+        return self.client.patch(f'/api/store/inventory/{item.pk}/{action}/', {'amount': amount}, format='json')
+
+    def test_consume_below_zero_is_refused(self):
+        self.assertEqual(self.move(self.pens, 'consume', 11).status_code, 400)
+        self.pens.refresh_from_db()
+        self.assertEqual(self.pens.quantity, 10)
+
+    def test_low_stock_crossings_are_logged(self):
+        self.move(self.pens, 'consume', 6)
+        self.move(self.pens, 'restock', 1)
+        self.move(self.pens, 'restock', 5)
+
+        self.assertEqual(list(LowStockEvent.objects.order_by('id').values_list('entered', flat=True)), [True, False])
+        self.assertEqual(self.client.get('/api/store/low-stock/').data['results'], [])
+
+    def test_bulk_movements_are_all_or_nothing(self):
+        url = '/api/store/inventory/movements/'
+        response = self.client.post(url, {'movements': [
+            {'item_id': self.pens.pk, 'kind': 'consume', 'amount': 2},
+            {'item_id': self.desks.pk, 'kind': 'consume', 'amount': 4},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['movements'][0]['index'], 1)
+
+        response = self.client.post(url, {'movements': [
+            {'item_id': self.pens.pk, 'kind': 'consume', 'amount': 2},
+            {'item_id': self.desks.pk, 'kind': 'consume', 'amount': 3},
+            {'item_id': self.desks.pk, 'kind': 'restock', 'amount': 1},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([row['quantity_after'] for row in response.data], [8, 0, 1])
+        self.assertEqual(
+            list(InventoryItem.objects.order_by('id').values_list('quantity', 'low_stock')), [(8, False), (1, True)],
+        )
+
+    def test_stock_at_point_in_time(self):
+        self.move(self.pens, 'consume', 4)
+        take_snapshot()
+        time.sleep(0.001)
+        middle = timezone.now()
+        time.sleep(0.001)
+        self.move(self.pens, 'restock', 7)
+
+        quantities = dict(stock_at(middle).values_list('pk', 'quantity_at'))
+        self.assertEqual(quantities, {self.pens.pk: 6, self.desks.pk: 3})
+        quantities = dict(stock_at(timezone.now()).values_list('pk', 'quantity_at'))
+        self.assertEqual(quantities[self.pens.pk], 13)
+
+    def test_snapshot_leaves_room_for_late_commits(self):
+        take_snapshot()
+        # Stamped before the snapshot, but only committed after it
+        StockMovement.objects.bulk_create([StockMovement(
+            item=self.pens, kind='consume', change=-2, quantity_after=8,
+            created_at=timezone.now() - timedelta(minutes=1),
+        )])
+        self.assertEqual(dict(stock_at(timezone.now()).values_list('pk', 'quantity_at'))[self.pens.pk], 8)
+
+
+class ForecastTests(TestCase):
+    def test_steady_consumption_sets_reorder_point(self):
+        item = InventoryItem.objects.create(
+            name='Paper', category='stationery', quantity=100, threshold=5, department='Science',
+        )
+        idle = InventoryItem.objects.create(
+            name='Stapler', category='stationery', quantity=4, threshold=1, department='Art',
+        )
+        today = timezone.localdate()
+        DailyItemConsumption.objects.bulk_create([
+            DailyItemConsumption(item=item, day=today - timedelta(days=day), quantity=2) for day in range(1, 120)
+        ])
+
+        run = forecast(today)
+
+        self.assertEqual(run.items, 2)
+        suggestion = ReorderSuggestion.objects.get(item=item)
+        self.assertAlmostEqual(suggestion.daily_rate, 2, places=1)
+        self.assertIn(suggestion.reorder_point, (14, 15))
+        self.assertAlmostEqual((suggestion.reorder_date - today).days, 43, delta=1)
+        self.assertIsNone(ReorderSuggestion.objects.get(item=idle).reorder_date)
+
+    def test_rollup_picks_up_movements_committed_after_a_run(self):
+        item = InventoryItem.objects.create(
+            name='Paper', category='stationery', quantity=100, threshold=5, department='Science',
+        )
+        now = timezone.now()
+        StockMovement.objects.bulk_create([
+            StockMovement(pk=1001, item=item, kind='consume', change=-3, quantity_after=97, created_at=now),
+        ])
+        forecast()
+
+        # Stamped and numbered before the run, but only committed after it
+        StockMovement.objects.bulk_create([
+            StockMovement(
+                pk=1000, item=item, kind='consume', change=-4, quantity_after=96, created_at=now - timedelta(minutes=1),
+            ),
+        ])
+        forecast()
+
+        self.assertEqual(DailyItemConsumption.objects.get(item=item, day=timezone.localdate(now)).quantity, 7)
+
+    def test_reorder_list_pages_through_items_without_a_date(self):
+        today = timezone.localdate()
+        now = timezone.now()
+        for index, reorder_date in enumerate([today + timedelta(days=5), None, today + timedelta(days=1), None]):
+            item = InventoryItem.objects.create(
+                name=f'Item {index}', category='stationery', quantity=10, threshold=1, department='Science',
+            )
+            ReorderSuggestion.objects.create(
+                item=item, daily_rate=0, department_rate=0, pending_demand=0, safety_stock=0, reorder_point=1,
+                reorder_date=reorder_date, computed_at=now,
+            )
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username='storekeeper', role='storekeeper'))
+
+        names, url, params = [], '/api/store/inventory/reorder/', {'page_size': 1}
+        while url:
+            response = client.get(url, params)
+            names += [row['item_name'] for row in response.data['results']]
+            url, params = response.data['next'], None
+        self.assertEqual(names, ['Item 2', 'Item 0', 'Item 1', 'Item 3'])
@@ -2,11 +2,27 @@ from django.urls import path
 from .views import (
     InventoryListCreateView,
     InventoryRetrieveUpdateDestroyView,
-    LowStockItemsView
+    LowStockItemsView,
+    LowStockEventFeedView,
+    RestockView,
+    ConsumeView,
+    BulkStockMovementView,
+    StockMovementListView,
+    StockAtView,
+    ReorderSuggestionListView
 )
 
 urlpatterns = [
     path('', InventoryListCreateView.as_view(), name='inventory-list'),
     path('<int:pk>/', InventoryRetrieveUpdateDestroyView.as_view(), name='inventory-detail'),
     path('low-stock/', LowStockItemsView.as_view(), name='low-stock-items'),
+    path('low-stock/events/', LowStockEventFeedView.as_view(), name='low-stock-events'),
+    path('inventory/', InventoryListCreateView.as_view()),
+    path('inventory/<int:pk>/', InventoryRetrieveUpdateDestroyView.as_view()),
+    path('inventory/<int:pk>/restock/', RestockView.as_view(), name='inventory-restock'),
+    path('inventory/<int:pk>/consume/', ConsumeView.as_view(), name='inventory-consume'),
+    path('inventory/<int:pk>/movements/', StockMovementListView.as_view(), name='inventory-movements'),
+    path('inventory/movements/', BulkStockMovementView.as_view(), name='inventory-bulk-movements'),
+    path('inventory/stock-at/', StockAtView.as_view(), name='inventory-stock-at'),
+    path('inventory/reorder/', ReorderSuggestionListView.as_view(), name='inventory-reorder'),
 ]
\ No newline at end of file
@@ -1,12 +1,27 @@
-from rest_framework import generics, permissions
-from .models import InventoryItem
-from .serializers import InventoryItemSerializer
+from datetime import date
+from django.db import transaction
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from rest_framework import generics, permissions, serializers, status
+from rest_framework.response import Response
+from srm.cache import CachedResponseMixin
+from srm.export import ExportMixin
+from srm.fastpath import FastListMixin
+from .models import InventoryItem, LowStockEvent, StockMovement, ReorderSuggestion
+from .serializers import (
+    InventoryItemSerializer, LowStockEventSerializer, StockMovementSerializer,
+    StockChangeSerializer, BulkStockMovementSerializer, StockAtQuerySerializer,
+    ReorderSuggestionSerializer, ReorderQuerySerializer,
+)
+from .stock import move_stock, apply_movements, stock_at
 from django_filters.rest_framework import DjangoFilterBackend
 
-class InventoryListCreateView(generics.ListCreateAPIView):
+class InventoryListCreateView(ExportMixin, CachedResponseMixin, FastListMixin, generics.ListCreateAPIView):
     queryset = InventoryItem.objects.all()
     serializer_class = InventoryItemSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cache_models = (InventoryItem,)
+    keyset_ordering = ('normalized_name', 'id')
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['category', 'department']
 
@@ -15,9 +30,123 @@ class InventoryRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = InventoryItemSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-class LowStockItemsView(generics.ListAPIView):
+    def perform_update(self, serializer):
+        # A new quantity is booked as an adjustment against the locked row
+        # rather than written over whatever other storekeepers have moved
+        quantity = serializer.validated_data.pop('quantity', None)
+        with transaction.atomic():
+            item = InventoryItem.objects.select_for_update().get(pk=serializer.instance.pk)
+            serializer.instance = item
+            serializer.save()
+            if quantity is not None and quantity != item.quantity:
+                move_stock(item.pk, 'adjust', quantity - item.quantity, user=self.request.user)
+                item.refresh_from_db()
+
+class StockChangeView(generics.GenericAPIView):
+    queryset = InventoryItem.objects.all()
+    serializer_class = StockChangeSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    kind = None
+
+    def patch(self, request, pk):
+        params = self.get_serializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        item = self.get_object()
+        amount = params.validated_data['amount']
+        change = amount if self.kind == 'restock' else -amount
+        item = move_stock(item.pk, self.kind, change, user=request.user, note=params.validated_data['note'])
+        if item is None:
+            raise serializers.ValidationError("Not enough stock")
+        return Response(InventoryItemSerializer(item).data)
+
+class RestockView(StockChangeView):
+    kind = 'restock'
+
+class ConsumeView(StockChangeView):
+    kind = 'consume'
+
+class BulkStockMovementView(generics.GenericAPIView):
+    serializer_class = BulkStockMovementSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ledger, errors = apply_movements(serializer.validated_data['movements'], user=request.user)
+        if errors:
+            return Response({'movements': errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(StockMovementSerializer(ledger, many=True).data, status=status.HTTP_201_CREATED)
+
+class StockMovementListView(ExportMixin, generics.ListAPIView):
+    serializer_class = StockMovementSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['kind']
+
+    def get_queryset(self):
+        return StockMovement.objects.filter(item_id=self.kwargs['pk'])
+
+class StockAtView(generics.GenericAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+    keyset_ordering = ('id',)
+
+    def get(self, request):
+        params = StockAtQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        items = InventoryItem.objects.all()
+        if 'department' in params.validated_data:
+            items = items.filter(department=params.validated_data['department'])
+        rows = stock_at(params.validated_data['at'], items).values('id', 'name', 'department', 'quantity_at')
+        page = self.paginate_queryset(rows)
+        response = self.get_paginated_response(page)
+        response.data['at'] = params.validated_data['at']
+        return response
+
+class LowStockItemsView(ExportMixin, CachedResponseMixin, generics.ListAPIView):
     serializer_class = InventoryItemSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cache_models = (InventoryItem,)
+    keyset_ordering = ('normalized_name', 'id')
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['category', 'department']
+
+    def get_queryset(self):
+        # Served by the partial inventory_low_stock_idx
+        return InventoryItem.objects.filter(low_stock=True)
+
+class LowStockEventFeedView(ExportMixin, generics.ListAPIView):
+    """Items entering (entered=true) or leaving low stock, newest first.
+
+    Dashboards poll with ``?after=<last seen id>`` to fetch only new events.
+    """
+    serializer_class = LowStockEventSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['department', 'entered', 'item']
+
+    def get_queryset(self):
+        queryset = LowStockEvent.objects.select_related('item')
+        after = self.request.query_params.get('after')
+        if after and after.isdigit():
+            queryset = queryset.filter(pk__gt=int(after))
+        return queryset
+
+class ReorderSuggestionListView(ExportMixin, generics.ListAPIView):
+    """Precomputed reorder points, soonest reorder date first. Items with
+    no forecast use have no reorder date and come last."""
+    serializer_class = ReorderSuggestionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    # The cursor needs a sort key that is never NULL
+    keyset_ordering = ('reorder_sort', 'id')
 
     def get_queryset(self):
-        return InventoryItem.objects.filter(quantity__lte=models.F('threshold'))
\ No newline at end of file
+        params = ReorderQuerySerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        queryset = ReorderSuggestion.objects.select_related('item').annotate(
+            reorder_sort=Coalesce('reorder_date', Value(date.max)),
+        )
+        if 'due_by' in params.validated_data:
+            queryset = queryset.filter(reorder_date__lte=params.validated_data['due_by'])
+        if 'department' in params.validated_data:
+            queryset = queryset.filter(item__department=params.validated_data['department'])
+        return queryset
@@ -1,11 +1,17 @@
 from rest_framework import generics, permissions
+from srm.cache import CachedResponseMixin
+from srm.export import ExportMixin
+from srm.fastpath import FastListMixin
 from .models import User
 from .serializers import UserSerializer
 
-class UserListView(generics.ListAPIView):
+class UserListView(ExportMixin, CachedResponseMixin, FastListMixin, generics.ListAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cache_models = (User,)
+    keyset_ordering = ('username', 'id')
+    export_roles = ('admin',)
 
 class UserDetailView(generics.RetrieveAPIView):
     queryset = User.objects.all()
@@ -24,15 +24,12 @@ const AdminDashboard: React.FC = () => {
 
   const fetchDashboardData = async () => {
     try {
-      const [statsRes, bookingsRes, requestsRes] = await Promise.all([
-        axios.get('/api/admin/stats/'),
-        axios.get('/api/labs/bookings/recent/'),
-        axios.get('/api/resources/requests/recent/')
-      ]);
-      
-      setStats(statsRes.data);
-      setRecentBookings(bookingsRes.data);
-      setRecentRequests(requestsRes.data);
+      // One composite call; the browser revalidates it with If-None-Match
+      const response = await axios.get('/api/admin/dashboard/');
+
+      setStats(response.data.stats);
+      setRecentBookings(response.data.recent_bookings);
+      setRecentRequests(response.data.recent_requests);
       setLoading(false);
     } catch (err) {
       setError('Failed to fetch dashboard data');
@@ -32,8 +32,8 @@ const Reports: React.FC = () => {
           api.get('/reports/summary/'),
           api.get('/activities/recent/')
         ]);
-        setReportData(reportRes.data);
-        setActivities(activitiesRes.data);
+        setReportData(reportRes.data.requests);
+        setActivities(activitiesRes.data.results);
         setError(''); // Clear error after successful fetch
       } catch (err) {
         setError('Failed to fetch report data');
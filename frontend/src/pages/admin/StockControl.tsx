@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { Card, Container, Table, Form, Button, Alert, Badge, Spinner } from 'react-bootstrap';
 import { motion } from 'framer-motion';
-import api from '../../services/api';
+import api, { fetchPage } from '../../services/api';
 // import { useAuth } from '../../context/AuthContext';
 
 interface InventoryItem {
@@ -18,6 +18,7 @@ const StockControl: React.FC = () => {
   // Remove unused user variable or add eslint-disable if you'll need it later
    //const { user } = useAuth();
   const [items, setItems] = useState<InventoryItem[]>([]);
+  const [nextPage, setNextPage] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [showForm, setShowForm] = useState(false);
@@ -35,8 +36,9 @@ const StockControl: React.FC = () => {
     const fetchInventory = async () => {
       try {
         setLoading(true);
-        const response = await api.get('/store/inventory/');
-        setItems(response.data);
+        const page = await fetchPage<InventoryItem>(api, '/store/inventory/');
+        setItems(page.rows);
+        setNextPage(page.next);
       } catch (err) {
         setError('Failed to fetch inventory');
         console.error(err);
@@ -48,6 +50,18 @@ const StockControl: React.FC = () => {
     fetchInventory();
   }, []);
 
+  const loadMoreItems = async () => {
+    if (!nextPage) return;
+    try {
+      const page = await fetchPage<InventoryItem>(api, nextPage);
+      setItems(prev => [...prev, ...page.rows]);
+      setNextPage(page.next);
+    } catch (err) {
+      setError('Failed to fetch inventory');
+      console.error(err);
+    }
+  };
+
   // Update the type to include HTMLTextAreaElement
   const handleInputChange = (e: React.ChangeEvent<HTMLInputElement | HTMLTextAreaElement | HTMLSelectElement>) => {
     const { name, value } = e.target;
@@ -234,6 +248,13 @@ const StockControl: React.FC = () => {
             ))}
           </tbody>
         </Table>
+        {nextPage && (
+          <div className="text-center">
+            <Button variant="outline-secondary" onClick={loadMoreItems}>
+              Load more
+            </Button>
+          </div>
+        )}
       </motion.div>
     </Container>
   );
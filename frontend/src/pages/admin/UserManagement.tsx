@@ -2,7 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { Card, Container, Table, Form, Button, Alert, Badge, Modal, Spinner } from 'react-bootstrap';
 import { motion } from 'framer-motion';
 import { FaEdit, FaTrash, FaUserPlus } from 'react-icons/fa';
-import api from '../../services/api';
+import api, { fetchPage } from '../../services/api';
 import { useAuth } from '../../context/AuthContext';
 
 interface User {
@@ -17,6 +17,7 @@ interface User {
 
 const UserManagement: React.FC = () => {
   const [users, setUsers] = useState<User[]>([]);
+  const [nextPage, setNextPage] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [showModal, setShowModal] = useState(false);
@@ -34,8 +35,9 @@ const UserManagement: React.FC = () => {
     const fetchUsers = async () => {
       try {
         setLoading(true);
-        const response = await api.get('/users/');
-        setUsers(response.data);
+        const page = await fetchPage<User>(api, '/users/');
+        setUsers(page.rows);
+        setNextPage(page.next);
       } catch (err) {
         setError('Failed to fetch users');
         console.error(err);
@@ -47,6 +49,18 @@ const UserManagement: React.FC = () => {
     fetchUsers();
   }, []);
 
+  const loadMoreUsers = async () => {
+    if (!nextPage) return;
+    try {
+      const page = await fetchPage<User>(api, nextPage);
+      setUsers(prev => [...prev, ...page.rows]);
+      setNextPage(page.next);
+    } catch (err) {
+      setError('Failed to fetch users');
+      console.error(err);
+    }
+  };
+
   // Updated to handle all FormControlElement types
   const handleInputChange = (e: React.ChangeEvent<HTMLInputElement | HTMLTextAreaElement | HTMLSelectElement>) => {
     const { name, value } = e.target;
@@ -181,6 +195,13 @@ const UserManagement: React.FC = () => {
                 ))}
               </tbody>
             </Table>
+            {nextPage && (
+              <div className="text-center">
+                <Button variant="outline-secondary" onClick={loadMoreUsers}>
+                  Load more
+                </Button>
+              </div>
+            )}
           </Card.Body>
         </Card>
 
@@ -3,6 +3,7 @@ import { motion } from 'framer-motion';
 import { Button, Card, Container, Table, Badge, Modal, Form, Alert, Spinner } from 'react-bootstrap';
 import { FaCheck, FaTimes, FaInfoCircle } from 'react-icons/fa'; // Removed unused FaTools
 import axios from 'axios';
+import { fetchPage } from '../../services/api';
 
 interface LabBooking {
   id: number;
@@ -18,6 +19,7 @@ interface LabBooking {
 
 const LabManagement: React.FC = () => {
   const [bookings, setBookings] = useState<LabBooking[]>([]);
+  const [nextPage, setNextPage] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [showModal, setShowModal] = useState(false);
@@ -28,10 +30,11 @@ const LabManagement: React.FC = () => {
     fetchBookings();
   }, []);
 
-  const fetchBookings = async () => {
+  const fetchBookings = async (next?: string) => {
     try {
-      const response = await axios.get('/api/labs/bookings/');
-      setBookings(response.data);
+      const page = await fetchPage<LabBooking>(axios, next || '/api/labs/bookings/');
+      setBookings(prev => (next ? [...prev, ...page.rows] : page.rows));
+      setNextPage(page.next);
       setLoading(false);
     } catch (err) {
       setError('Failed to fetch lab bookings');
@@ -92,7 +95,7 @@ const LabManagement: React.FC = () => {
           <Card.Header className="bg-primary text-white d-flex justify-content-between align-items-center">
             <h3 className="mb-0">Lab Management</h3>
             <Badge bg="light" text="primary" pill>
-              {bookings.length} Bookings
+              {bookings.length}{nextPage ? '+' : ''} Bookings
             </Badge>
           </Card.Header>
           <Card.Body>
@@ -180,6 +183,13 @@ const LabManagement: React.FC = () => {
                     ))}
                   </tbody>
                 </Table>
+                {nextPage && (
+                  <div className="text-center">
+                    <Button variant="outline-secondary" onClick={() => fetchBookings(nextPage)}>
+                      Load more
+                    </Button>
+                  </div>
+                )}
               </div>
             )}
           </Card.Body>
@@ -3,6 +3,7 @@ import { motion } from 'framer-motion';
 import { Button, Card, Container, Table, Badge, Modal, Form, Alert, Tab, Tabs } from 'react-bootstrap';
 import { FaBook, FaUser, FaSearch, FaExchangeAlt } from 'react-icons/fa';
 import axios from 'axios';
+import { fetchPage } from '../../services/api';
 
 interface Book {
   id: number;
@@ -25,7 +26,9 @@ interface BorrowRecord {
 
 const LibraryManagement: React.FC = () => {
   const [books, setBooks] = useState<Book[]>([]);
+  const [booksNext, setBooksNext] = useState<string | null>(null);
   const [borrowRecords, setBorrowRecords] = useState<BorrowRecord[]>([]);
+  const [recordsNext, setRecordsNext] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [showAddModal, setShowAddModal] = useState(false);
@@ -52,10 +55,11 @@ const LibraryManagement: React.FC = () => {
     fetchBorrowRecords();
   }, []);
 
-  const fetchBooks = async () => {
+  const fetchBooks = async (next?: string) => {
     try {
-      const response = await axios.get('/api/library/books/');
-      setBooks(response.data);
+      const page = await fetchPage<Book>(axios, next || '/api/library/books/');
+      setBooks(prev => (next ? [...prev, ...page.rows] : page.rows));
+      setBooksNext(page.next);
       setLoading(false);
     } catch (err) {
       setError('Failed to fetch books');
@@ -63,10 +67,11 @@ const LibraryManagement: React.FC = () => {
     }
   };
 
-  const fetchBorrowRecords = async () => {
+  const fetchBorrowRecords = async (next?: string) => {
     try {
-      const response = await axios.get('/api/library/borrow-records/');
-      setBorrowRecords(response.data);
+      const page = await fetchPage<BorrowRecord>(axios, next || '/api/library/borrow-records/');
+      setBorrowRecords(prev => (next ? [...prev, ...page.rows] : page.rows));
+      setRecordsNext(page.next);
     } catch (err) {
       setError('Failed to fetch borrow records');
     }
@@ -242,6 +247,13 @@ const LibraryManagement: React.FC = () => {
                     ))}
                   </tbody>
                 </Table>
+                {booksNext && (
+                  <div className="text-center">
+                    <Button variant="outline-secondary" onClick={() => fetchBooks(booksNext)}>
+                      Load more
+                    </Button>
+                  </div>
+                )}
               </div>
             )}
           </Card.Body>
@@ -333,6 +345,13 @@ const LibraryManagement: React.FC = () => {
                 </div>
               </Tab>
             </Tabs>
+            {recordsNext && (
+              <div className="text-center">
+                <Button variant="outline-secondary" onClick={() => fetchBorrowRecords(recordsNext)}>
+                  Load more
+                </Button>
+              </div>
+            )}
           </Card.Body>
         </Card>
         
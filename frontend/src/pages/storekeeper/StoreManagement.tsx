@@ -3,6 +3,7 @@ import { motion } from 'framer-motion';
 import { Button, Card, Container, Table, Badge, Modal, Form, Alert } from 'react-bootstrap';
 import { FaBoxOpen, FaPlus, FaEdit, FaTrash, FaCheck } from 'react-icons/fa';
 import axios from 'axios';
+import { fetchPage } from '../../services/api';
 
 interface InventoryItem {
   id: number;
@@ -26,7 +27,9 @@ interface ResourceRequest {
 
 const StoreManagement: React.FC = () => {
   const [inventory, setInventory] = useState<InventoryItem[]>([]);
+  const [inventoryNext, setInventoryNext] = useState<string | null>(null);
   const [requests, setRequests] = useState<ResourceRequest[]>([]);
+  const [requestsNext, setRequestsNext] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [showAddModal, setShowAddModal] = useState(false);
@@ -48,10 +51,11 @@ const StoreManagement: React.FC = () => {
     fetchRequests();
   }, []);
 
-  const fetchInventory = async () => {
+  const fetchInventory = async (next?: string) => {
     try {
-      const response = await axios.get('/api/store/inventory/');
-      setInventory(response.data);
+      const page = await fetchPage<InventoryItem>(axios, next || '/api/store/inventory/');
+      setInventory(prev => (next ? [...prev, ...page.rows] : page.rows));
+      setInventoryNext(page.next);
       setLoading(false);
     } catch (err) {
       setError('Failed to fetch inventory');
@@ -59,10 +63,14 @@ const StoreManagement: React.FC = () => {
     }
   };
 
-  const fetchRequests = async () => {
+  const fetchRequests = async (next?: string) => {
     try {
-      const response = await axios.get('/api/resources/requests/');
-      setRequests(response.data);
+      // Only pending requests are shown, so only those are paged in
+      const page = next
+        ? await fetchPage<ResourceRequest>(axios, next)
+        : await fetchPage<ResourceRequest>(axios, '/api/resources/requests/', { params: { status: 'pending' } });
+      setRequests(prev => (next ? [...prev, ...page.rows] : page.rows));
+      setRequestsNext(page.next);
     } catch (err) {
       setError('Failed to fetch resource requests');
     }
@@ -191,6 +199,13 @@ const StoreManagement: React.FC = () => {
                         ))}
                       </tbody>
                     </Table>
+                    {inventoryNext && (
+                      <div className="text-center">
+                        <Button variant="outline-secondary" onClick={() => fetchInventory(inventoryNext)}>
+                          Load more
+                        </Button>
+                      </div>
+                    )}
                   </div>
                 )}
               </Card.Body>
@@ -260,6 +275,13 @@ const StoreManagement: React.FC = () => {
                     ))}
                   </div>
                 )}
+                {requestsNext && (
+                  <div className="text-center mt-3">
+                    <Button variant="outline-secondary" size="sm" onClick={() => fetchRequests(requestsNext)}>
+                      Load more
+                    </Button>
+                  </div>
+                )}
               </Card.Body>
             </Card>
           </div>
@@ -3,6 +3,7 @@ import { motion } from 'framer-motion';
 import { Form, Button, Alert, Card, Container, Table, Badge } from 'react-bootstrap';
 import { FaCalendarAlt, FaCheck, FaTimes } from 'react-icons/fa';
 import axios from 'axios';
+import { fetchPage } from '../../services/api';
 import { useAuth } from '../../context/AuthContext';
 
 interface LabBookingData {
@@ -25,28 +26,35 @@ const LabBooking: React.FC = () => {
     requirements: ''
   });
   const [bookings, setBookings] = useState<LabBookingData[]>([]);
+  const [bookingsNext, setBookingsNext] = useState<string | null>(null);
   const [error, setError] = useState('');
   const [success, setSuccess] = useState('');
   const [availableLabs, setAvailableLabs] = useState<string[]>([]);
+  const [labsNext, setLabsNext] = useState<string | null>(null);
 
   useEffect(() => {
     fetchBookings();
     fetchAvailableLabs();
   }, []);
 
-  const fetchBookings = async () => {
+  const fetchBookings = async (next?: string) => {
     try {
-      const response = await axios.get('/api/labs/bookings/');
-      setBookings(response.data);
+      const page = await fetchPage<LabBookingData>(axios, next || '/api/labs/bookings/');
+      setBookings(prev => (next ? [...prev, ...page.rows] : page.rows));
+      setBookingsNext(page.next);
     } catch (err) {
       setError('Failed to fetch bookings');
     }
   };
 
-  const fetchAvailableLabs = async () => {
+  const fetchAvailableLabs = async (next?: string) => {
     try {
-      const response = await axios.get('/api/labs/available/');
-      setAvailableLabs(response.data);
+      // One full page covers the labs of most schools
+      const page = next
+        ? await fetchPage<string>(axios, next)
+        : await fetchPage<string>(axios, '/api/labs/available/', { params: { page_size: 100 } });
+      setAvailableLabs(prev => (next ? [...prev, ...page.rows] : page.rows));
+      setLabsNext(page.next);
     } catch (err) {
       setError('Failed to fetch available labs');
     }
@@ -131,6 +139,11 @@ const LabBooking: React.FC = () => {
                         <option key={lab} value={lab}>{lab}</option>
                       ))}
                     </Form.Select>
+                    {labsNext && (
+                      <Button variant="link" size="sm" className="px-0" onClick={() => fetchAvailableLabs(labsNext)}>
+                        Show more labs
+                      </Button>
+                    )}
                   </Form.Group>
                   
                   <Form.Group className="mb-3">
@@ -256,6 +269,13 @@ const LabBooking: React.FC = () => {
                         ))}
                       </tbody>
                     </Table>
+                    {bookingsNext && (
+                      <div className="text-center">
+                        <Button variant="outline-secondary" onClick={() => fetchBookings(bookingsNext)}>
+                          Load more
+                        </Button>
+                      </div>
+                    )}
                   </div>
                 )}
               </Card.Body>
@@ -1,4 +1,4 @@
-import axios from 'axios';
+import axios, { AxiosInstance, AxiosRequestConfig, AxiosStatic } from 'axios';
 
 const API_BASE_URL = 'http://localhost:8000/api'; // Update with your Django backend URL
 
@@ -18,4 +18,21 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
+export interface Page<T> {
+  rows: T[];
+  next: string | null;
+}
+
+// List endpoints return one page at a time. Views show the first page and
+// request `next` only when the user asks for more; a whole table is read
+// through the view's ?format=csv export instead.
+export const fetchPage = async <T>(
+  client: AxiosInstance | AxiosStatic,
+  url: string,
+  config: AxiosRequestConfig = {},
+): Promise<Page<T>> => {
+  const response = await client.get(url, config);
+  return { rows: response.data.results, next: response.data.next };
+};
+
 export default api;
\ No newline at end of file